@@ -1,4 +1,3 @@
-import os
 import logging
 from datetime import datetime
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
@@ -11,10 +10,9 @@ from telegram.ext import (
     filters,
     ConversationHandler
 )
-from supabase import create_client
-from dotenv import load_dotenv
 
-load_dotenv()
+from services import callbacks, config, db, keyboards, notifications, pagination, resilience, runner, stats, tasks, user_cache
+from services.router import ADMIN, CallbackRouter
 
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -22,41 +20,18 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-supabase = create_client(
-    os.getenv('VITE_SUPABASE_URL'),
-    os.getenv('VITE_SUPABASE_ANON_KEY')
-)
-
 REGISTER_NAME, REGISTER_STUDENT_ID, REGISTER_MAJOR, REGISTER_YEAR = range(4)
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user = update.effective_user
     telegram_id = user.id
 
-    existing_user = supabase.table('users').select('*').eq('telegram_id', telegram_id).execute()
+    user_data = await user_cache.get_user(telegram_id)
 
-    if existing_user.data:
-        user_data = existing_user.data[0]
+    if user_data:
         if user_data['is_verified']:
-            keyboard = [
-                [InlineKeyboardButton("اعلان‌ها", callback_data='announcements'),
-                 InlineKeyboardButton("رویدادها", callback_data='events')],
-                [InlineKeyboardButton("منابع", callback_data='resources'),
-                 InlineKeyboardButton("پرسش و پاسخ", callback_data='qa')],
-                [InlineKeyboardButton("پروفایل من", callback_data='profile')]
-            ]
-
-            if user_data['role'] in ['admin', 'superadmin']:
-                keyboard.append([InlineKeyboardButton("پنل مدیریت", callback_data='admin_panel')])
-
-            reply_markup = InlineKeyboardMarkup(keyboard)
-
-            await update.message.reply_text(
-                f"سلام {user_data['first_name']}!\n\n"
-                "به ربات انجمن مهندسی شیمی خوش آمدید.\n"
-                "لطفا یکی از گزینه‌های زیر را انتخاب کنید:",
-                reply_markup=reply_markup
-            )
+            text, reply_markup = keyboards.main_menu_for(user_data)
+            await update.message.reply_text(text, reply_markup=reply_markup)
         else:
             await update.message.reply_text(
                 "حساب کاربری شما در انتظار تایید است.\n"
@@ -105,7 +80,7 @@ async def register_year(update: Update, context: ContextTypes.DEFAULT_TYPE):
     last_name = name_parts[1] if len(name_parts) > 1 else ''
 
     try:
-        supabase.table('users').insert({
+        result = await db.execute(db.table('users').insert({
             'telegram_id': user.id,
             'username': user.username,
             'first_name': first_name,
@@ -115,7 +90,10 @@ async def register_year(update: Update, context: ContextTypes.DEFAULT_TYPE):
             'year': context.user_data['year'],
             'is_verified': False,
             'is_active': True
-        }).execute()
+        }))
+        user_cache.invalidate(user.id)
+        stats.invalidate()
+        notifications.registration(result.data[0])
 
         await update.message.reply_text(
             "ثبت‌نام شما با موفقیت انجام شد!\n\n"
@@ -123,21 +101,6 @@ async def register_year(update: Update, context: ContextTypes.DEFAULT_TYPE):
             "پس از تایید، به شما اطلاع داده خواهد شد."
         )
 
-        admins = supabase.table('users').select('telegram_id').in_('role', ['admin', 'superadmin']).execute()
-        for admin in admins.data:
-            try:
-                await context.bot.send_message(
-                    chat_id=admin['telegram_id'],
-                    text=f"درخواست عضویت جدید:\n\n"
-                         f"نام: {context.user_data['name']}\n"
-                         f"شماره دانشجویی: {context.user_data['student_id']}\n"
-                         f"رشته: {context.user_data['major']}\n"
-                         f"سال ورودی: {context.user_data['year']}\n"
-                         f"تلگرام: @{user.username or 'ندارد'}"
-                )
-            except:
-                pass
-
     except Exception as e:
         logger.error(f"Registration error: {e}")
         await update.message.reply_text(
@@ -150,59 +113,34 @@ async def register_cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text("ثبت‌نام لغو شد.")
     return ConversationHandler.END
 
-async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    query = update.callback_query
-    await query.answer()
+router = CallbackRouter()
 
-    user = update.effective_user
-    user_data = supabase.table('users').select('*').eq('telegram_id', user.id).execute()
-
-    if not user_data.data or not user_data.data[0]['is_verified']:
-        await query.edit_message_text("شما دسترسی ندارید.")
-        return
-
-    current_user = user_data.data[0]
-
-    if query.data == 'announcements':
-        await show_announcements(query, context)
-    elif query.data == 'events':
-        await show_events(query, context, current_user)
-    elif query.data == 'resources':
-        await show_resources(query, context)
-    elif query.data == 'qa':
-        await show_qa(query, context)
-    elif query.data == 'profile':
-        await show_profile(query, context, current_user)
-    elif query.data == 'admin_panel':
-        if current_user['role'] in ['admin', 'superadmin']:
-            await show_admin_panel(query, context, current_user)
-        else:
-            await query.edit_message_text("شما دسترسی به پنل مدیریت ندارید.")
-    elif query.data.startswith('back_'):
-        await handle_back(query, context, current_user)
+async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await router.dispatch(update, context)
 
 async def show_announcements(query, context):
-    announcements = supabase.table('announcements').select('*').eq('is_published', True).order('created_at', desc=True).limit(10).execute()
+    _, direction, cursor = pagination.split(query.data)
+    page = await pagination.fetch_page(
+        db.table('announcements').select('id, title, priority, created_at').eq('is_published', True),
+        'created_at', direction=direction, cursor=cursor
+    )
 
-    if not announcements.data:
+    if not page.rows:
         await query.edit_message_text("اعلانی موجود نیست.")
         return
 
     keyboard = []
-    for ann in announcements.data:
-        priority_icon = {
-            'urgent': '🔴',
-            'high': '🟠',
-            'medium': '🟡',
-            'low': '🟢'
-        }.get(ann['priority'], '⚪')
-
+    for ann in page.rows:
+        priority_icon = keyboards.PRIORITY_ICONS.get(ann['priority'], '⚪')
         keyboard.append([InlineKeyboardButton(
             f"{priority_icon} {ann['title'][:40]}...",
-            callback_data=f"ann_{ann['id']}"
+            callback_data=callbacks.ANNOUNCEMENT.data(ann['id'])
         )])
 
-    keyboard.append([InlineKeyboardButton("🔙 بازگشت", callback_data='back_main')])
+    nav = pagination.nav_row(page, 'announcements')
+    if nav:
+        keyboard.append(nav)
+    keyboard.append([keyboards.back_button('back_main')])
     reply_markup = InlineKeyboardMarkup(keyboard)
 
     await query.edit_message_text(
@@ -210,24 +148,29 @@ async def show_announcements(query, context):
         reply_markup=reply_markup
     )
 
-async def show_events(query, context, user):
-    events = supabase.table('events').select('*').eq('is_active', True).order('event_date').execute()
+async def show_events(query, context):
+    _, direction, cursor = pagination.split(query.data)
+    page = await pagination.fetch_page(
+        db.table('events').select('id, title, event_date').eq('is_active', True),
+        'event_date', descending=False, direction=direction, cursor=cursor
+    )
 
-    if not events.data:
-        keyboard = [[InlineKeyboardButton("🔙 بازگشت", callback_data='back_main')]]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        await query.edit_message_text("رویدادی موجود نیست.", reply_markup=reply_markup)
+    if not page.rows:
+        await query.edit_message_text("رویدادی موجود نیست.", reply_markup=keyboards.back('back_main'))
         return
 
     keyboard = []
-    for event in events.data:
+    for event in page.rows:
         event_date = datetime.fromisoformat(event['event_date'].replace('Z', '+00:00'))
         keyboard.append([InlineKeyboardButton(
             f"{event['title']} - {event_date.strftime('%Y/%m/%d')}",
-            callback_data=f"event_{event['id']}"
+            callback_data=callbacks.EVENT.data(event['id'])
         )])
 
-    keyboard.append([InlineKeyboardButton("🔙 بازگشت", callback_data='back_main')])
+    nav = pagination.nav_row(page, 'events')
+    if nav:
+        keyboard.append(nav)
+    keyboard.append([keyboards.back_button('back_main')])
     reply_markup = InlineKeyboardMarkup(keyboard)
 
     await query.edit_message_text(
@@ -236,41 +179,20 @@ async def show_events(query, context, user):
     )
 
 async def show_resources(query, context):
-    keyboard = [
-        [InlineKeyboardButton("کتاب‌ها", callback_data='res_book'),
-         InlineKeyboardButton("مقالات", callback_data='res_paper')],
-        [InlineKeyboardButton("ویدیوها", callback_data='res_video'),
-         InlineKeyboardButton("ابزارها", callback_data='res_tool')],
-        [InlineKeyboardButton("🔙 بازگشت", callback_data='back_main')]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
     await query.edit_message_text(
         "منابع آموزشی:\n\nدسته مورد نظر را انتخاب کنید:",
-        reply_markup=reply_markup
+        reply_markup=keyboards.RESOURCES_MENU
     )
 
 async def show_qa(query, context):
-    keyboard = [
-        [InlineKeyboardButton("سوالات اخیر", callback_data='qa_recent')],
-        [InlineKeyboardButton("پرسش سوال جدید", callback_data='qa_ask')],
-        [InlineKeyboardButton("سوالات من", callback_data='qa_mine')],
-        [InlineKeyboardButton("🔙 بازگشت", callback_data='back_main')]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
     await query.edit_message_text(
         "بخش پرسش و پاسخ:",
-        reply_markup=reply_markup
+        reply_markup=keyboards.QA_MENU
     )
 
 async def show_profile(query, context, user):
     status = "تایید شده ✅" if user['is_verified'] else "در انتظار تایید ⏳"
-    role_name = {
-        'member': 'عضو',
-        'admin': 'مدیر',
-        'superadmin': 'مدیر ارشد'
-    }.get(user['role'], 'عضو')
+    role_name = keyboards.ROLE_NAMES.get(user['role'], 'عضو')
 
     profile_text = f"پروفایل شما:\n\n" \
                    f"نام: {user['first_name']} {user['last_name']}\n" \
@@ -281,59 +203,47 @@ async def show_profile(query, context, user):
                    f"وضعیت: {status}\n" \
                    f"تاریخ عضویت: {datetime.fromisoformat(user['joined_at'].replace('Z', '+00:00')).strftime('%Y/%m/%d')}"
 
-    keyboard = [[InlineKeyboardButton("🔙 بازگشت", callback_data='back_main')]]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
-    await query.edit_message_text(profile_text, reply_markup=reply_markup)
+    await query.edit_message_text(profile_text, reply_markup=keyboards.back('back_main'))
 
 async def show_admin_panel(query, context, user):
-    pending_users = supabase.table('users').select('id').eq('is_verified', False).execute()
-    pending_count = len(pending_users.data)
-
-    keyboard = [
-        [InlineKeyboardButton(f"تایید اعضا ({pending_count})", callback_data='admin_verify')],
-        [InlineKeyboardButton("ارسال اعلان", callback_data='admin_announce')],
-        [InlineKeyboardButton("مدیریت رویدادها", callback_data='admin_events')],
-        [InlineKeyboardButton("آمار ربات", callback_data='admin_stats')],
-        [InlineKeyboardButton("🔙 بازگشت", callback_data='back_main')]
-    ]
-
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    counters = await stats.get_stats()
 
     await query.edit_message_text(
         "پنل مدیریت:",
-        reply_markup=reply_markup
+        reply_markup=keyboards.admin_panel(counters['pending_users'])
     )
 
 async def handle_back(query, context, user):
-    if query.data == 'back_main':
-        keyboard = [
-            [InlineKeyboardButton("اعلان‌ها", callback_data='announcements'),
-             InlineKeyboardButton("رویدادها", callback_data='events')],
-            [InlineKeyboardButton("منابع", callback_data='resources'),
-             InlineKeyboardButton("پرسش و پاسخ", callback_data='qa')],
-            [InlineKeyboardButton("پروفایل من", callback_data='profile')]
-        ]
-
-        if user['role'] in ['admin', 'superadmin']:
-            keyboard.append([InlineKeyboardButton("پنل مدیریت", callback_data='admin_panel')])
-
-        reply_markup = InlineKeyboardMarkup(keyboard)
-
-        await query.edit_message_text(
-            f"سلام {user['first_name']}!\n\n"
-            "به ربات انجمن مهندسی شیمی خوش آمدید.\n"
-            "لطفا یکی از گزینه‌های زیر را انتخاب کنید:",
-            reply_markup=reply_markup
-        )
+    text, reply_markup = keyboards.main_menu_for(user)
+    await query.edit_message_text(text, reply_markup=reply_markup)
+
+router.add('announcements', show_announcements)
+router.add('events', show_events)
+router.add('resources', show_resources)
+router.add('qa', show_qa)
+router.add('profile', show_profile, with_user=True)
+router.add('admin_panel', show_admin_panel, auth=ADMIN, with_user=True)
+router.add('back_main', handle_back, with_user=True)
+
+async def post_init(application: Application):
+    notifications.start(application)
+
+async def post_stop(application: Application):
+    await tasks.cancel_all()
+    await notifications.flush()
 
 def main():
-    token = os.getenv('TELEGRAM_BOT_TOKEN')
+    token = config.TELEGRAM_BOT_TOKEN
     if not token:
         logger.error("TELEGRAM_BOT_TOKEN not found in environment variables")
         return
 
-    application = Application.builder().token(token).build()
+    application = runner.configure(
+        Application.builder()
+        .token(token)
+        .post_init(post_init)
+        .post_stop(post_stop)
+    ).build()
 
     application.add_handler(CommandHandler("start", start))
 
@@ -345,14 +255,18 @@ def main():
             REGISTER_MAJOR: [MessageHandler(filters.TEXT & ~filters.COMMAND, register_major)],
             REGISTER_YEAR: [MessageHandler(filters.TEXT & ~filters.COMMAND, register_year)],
         },
-        fallbacks=[CommandHandler('cancel', register_cancel)]
+        fallbacks=[CommandHandler('cancel', register_cancel)],
+        name='register',
+        persistent=runner.PERSISTENT
     )
 
     application.add_handler(register_handler)
     application.add_handler(CallbackQueryHandler(button_handler))
+    application.add_error_handler(resilience.handle_error)
 
     logger.info("Bot started successfully")
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    runner.run(application)
+    db.shutdown()
 
 if __name__ == '__main__':
     main()
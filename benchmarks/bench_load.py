@@ -0,0 +1,348 @@
+import os
+import sys
+import time
+import random
+import asyncio
+import logging
+import argparse
+import tempfile
+import multiprocessing
+import contextvars
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FAKE_API_PORT = 8081
+FAKE_DB_PORT = 8082
+
+os.environ.update({
+    'BOT_MODE': 'polling',
+    'TELEGRAM_API_BASE_URL': f"http://127.0.0.1:{FAKE_API_PORT}",
+    'VITE_SUPABASE_URL': f"http://127.0.0.1:{FAKE_DB_PORT}",
+    'VITE_SUPABASE_ANON_KEY': 'bench.anon.key',
+    'PERSISTENCE_BACKEND': 'sqlite',
+    'PERSISTENCE_PATH': os.path.join(tempfile.mkdtemp(prefix='bench_load_'), 'state.sqlite3')
+})
+
+import httpx
+import uvicorn
+from telegram import Update
+
+import main_bot
+from fake_postgrest import FakePostgrest
+from fake_telegram import BOT_USER, FILE_SIZE, FakeTelegram
+from services import callbacks, db, search_index, user_cache
+
+ADMIN_TELEGRAM_ID = 1000
+MEMBER_BASE_ID = 100000
+NEWCOMER_BASE_ID = 200000
+
+_step = contextvars.ContextVar('bench_step', default=None)
+
+
+class Step:
+    __slots__ = ('db_calls', 'failed')
+
+    def __init__(self):
+        self.db_calls = 0
+        self.failed = False
+
+
+class Traffic:
+    def __init__(self):
+        self.update_id = 0
+
+    def _next_id(self):
+        self.update_id += 1
+        return self.update_id
+
+    def _user(self, telegram_id):
+        return {'id': telegram_id, 'is_bot': False, 'first_name': f"user{telegram_id}", 'username': f"user{telegram_id}"}
+
+    def message(self, telegram_id, text):
+        update_id = self._next_id()
+        message = {
+            'message_id': update_id,
+            'date': int(time.time()),
+            'chat': {'id': telegram_id, 'type': 'private'},
+            'from': self._user(telegram_id),
+            'text': text
+        }
+        if text.startswith('/'):
+            message['entities'] = [{'type': 'bot_command', 'offset': 0, 'length': len(text.split()[0])}]
+        return {'update_id': update_id, 'message': message}
+
+    def inline(self, telegram_id, text):
+        update_id = self._next_id()
+        return {'update_id': update_id, 'inline_query': {
+            'id': str(update_id), 'from': self._user(telegram_id), 'query': text, 'offset': ''
+        }}
+
+    def document(self, telegram_id, file_name):
+        update_id = self._next_id()
+        return {'update_id': update_id, 'message': {
+            'message_id': update_id,
+            'date': int(time.time()),
+            'chat': {'id': telegram_id, 'type': 'private'},
+            'from': self._user(telegram_id),
+            'document': {
+                'file_id': f"doc{update_id}", 'file_unique_id': f"udoc{update_id}", 'file_name': file_name,
+                'mime_type': 'application/pdf', 'file_size': FILE_SIZE
+            }
+        }}
+
+    def callback(self, telegram_id, data):
+        update_id = self._next_id()
+        return {
+            'update_id': update_id,
+            'callback_query': {
+                'id': str(update_id),
+                'from': self._user(telegram_id),
+                'chat_instance': str(telegram_id),
+                'data': data,
+                'message': {
+                    'message_id': 1,
+                    'date': int(time.time()),
+                    'chat': {'id': telegram_id, 'type': 'private'},
+                    'from': BOT_USER,
+                    'text': 'menu'
+                }
+            }
+        }
+
+
+def seed(fake, members, rows):
+    started = datetime.now(timezone.utc) - timedelta(days=30)
+    admin = fake.insert('users', {
+        'telegram_id': ADMIN_TELEGRAM_ID, 'first_name': 'admin', 'last_name': 'bench',
+        'role': 'admin', 'is_verified': True
+    })
+    authors = [admin] + [fake.insert('users', {
+        'telegram_id': MEMBER_BASE_ID + i, 'first_name': f"member{i}", 'last_name': 'bench',
+        'student_id': str(40000000 + i), 'major': 'مهندسی شیمی', 'year': 1400, 'is_verified': True
+    }) for i in range(members)]
+
+    content = {'announcements': [], 'events': [], 'resources': [], 'questions': []}
+    for i in range(rows):
+        created_at = (started + timedelta(minutes=i)).isoformat()
+        author = authors[i % len(authors)]
+        content['announcements'].append(fake.insert('announcements', {
+            'title': f"اعلان شماره {i}", 'content': 'متن اعلان', 'priority': 'medium',
+            'created_by': admin['id'], 'is_published': True, 'created_at': created_at
+        }))
+        content['events'].append(fake.insert('events', {
+            'title': f"رویداد {i}", 'description': 'سمینار انتقال حرارت',
+            'event_date': (datetime.now(timezone.utc) + timedelta(days=1, hours=i)).isoformat(),
+            'location': 'دانشکده', 'capacity': 5, 'created_by': admin['id'], 'created_at': created_at
+        }))
+        content['resources'].append(fake.insert('resources', {
+            'title': f"جزوه انتقال حرارت {i}", 'description': 'جزوه کامل درس',
+            'category': 'book', 'file_type': 'pdf', 'media_type': 'document', 'file_id': f"seed{i}",
+            'file_unique_id': f"useed{i}", 'file_size': FILE_SIZE, 'mime_type': 'application/pdf',
+            'uploaded_by': author['id'], 'created_at': created_at, 'tags': ['heat']
+        }))
+        question = fake.insert('questions', {
+            'user_id': author['id'], 'title': f"سوال ترمودینامیک {i}", 'content': 'معادله حالت چیست؟',
+            'category': 'concept', 'created_at': created_at
+        })
+        content['questions'].append(question)
+        fake.insert('answers', {'question_id': question['id'], 'user_id': admin['id'], 'content': 'پاسخ نمونه'})
+    return content
+
+
+def newcomer_script(traffic, telegram_id):
+    return [
+        ('start', traffic.message(telegram_id, '/start')),
+        ('register_start', traffic.message(telegram_id, '/register')),
+        ('register_name', traffic.message(telegram_id, 'کاربر آزمایشی')),
+        ('register_student_id', traffic.message(telegram_id, str(telegram_id))),
+        ('register_major', traffic.message(telegram_id, 'مهندسی شیمی')),
+        ('register_year', traffic.message(telegram_id, '1402'))
+    ]
+
+
+def member_script(traffic, telegram_id, content, rng, asks):
+    event = rng.choice(content['events'])
+    resource = rng.choice(content['resources'])
+    question = rng.choice(content['questions'])
+    script = [
+        ('start', traffic.message(telegram_id, '/start')),
+        ('show_announcements', traffic.callback(telegram_id, 'announcements')),
+        ('show_events', traffic.callback(telegram_id, 'events')),
+        ('show_event_detail', traffic.callback(telegram_id, callbacks.EVENT.data(event['id']))),
+        ('register_event', traffic.callback(telegram_id, callbacks.EVENT_REGISTER.data(event['id']))),
+        ('show_resources', traffic.callback(telegram_id, 'resources')),
+        ('show_resources_by_category', traffic.callback(telegram_id, callbacks.RESOURCE_CATEGORY.data('book'))),
+        ('show_resource_detail', traffic.callback(telegram_id, callbacks.RESOURCE.data(resource['id']))),
+        ('send_resource_file', traffic.callback(telegram_id, callbacks.RESOURCE_FILE.data(resource['id']))),
+        ('show_qa', traffic.callback(telegram_id, 'qa')),
+        ('show_recent_questions', traffic.callback(telegram_id, 'qa_recent')),
+        ('show_question_detail', traffic.callback(telegram_id, callbacks.QUESTION.data(question['id']))),
+        ('search_command', traffic.message(telegram_id, '/search انتقال حرارت')),
+        ('inline_search', traffic.inline(telegram_id, 'جزوه انتقال'))
+    ]
+    if asks:
+        script += [
+            ('ask_question_start', traffic.message(telegram_id, '/ask')),
+            ('ask_title', traffic.message(telegram_id, 'سوال درباره ضریب انتقال حرارت')),
+            ('ask_content', traffic.message(telegram_id, 'ضریب انتقال حرارت جابجایی چگونه محاسبه می‌شود؟')),
+            ('ask_category', traffic.callback(telegram_id, 'qcat_concept'))
+        ]
+    else:
+        script += [
+            ('upload_resource_start', traffic.message(telegram_id, '/upload')),
+            ('upload_title', traffic.message(telegram_id, 'جزوه کنترل فرآیند')),
+            ('upload_desc', traffic.message(telegram_id, 'خلاصه فصل اول تا پنجم')),
+            ('upload_category', traffic.callback(telegram_id, 'ucat_book')),
+            ('upload_file', traffic.document(telegram_id, 'control.pdf'))
+        ]
+    return script
+
+
+async def wait_for_index():
+    for _ in range(200):
+        if search_index.ready():
+            return
+        await asyncio.sleep(0.05)
+
+
+def percentile(samples, q):
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+def serve_fakes(fake_api, fake_db):
+    servers = [
+        uvicorn.Server(uvicorn.Config(fake.create_app(), host='127.0.0.1', port=port, log_level='warning'))
+        for fake, port in ((fake_api, FAKE_API_PORT), (fake_db, FAKE_DB_PORT))
+    ]
+
+    async def serve():
+        await asyncio.gather(*(server.serve() for server in servers))
+
+    asyncio.run(serve())
+
+
+def fake_calls():
+    return [
+        sum(count for name, count in httpx.get(f"http://127.0.0.1:{port}/stats").json().items() if name != 'file_bytes')
+        for port in (FAKE_API_PORT, FAKE_DB_PORT)
+    ]
+
+
+def wait_until_up():
+    for _ in range(200):
+        try:
+            return fake_calls()
+        except httpx.TransportError:
+            time.sleep(0.05)
+    raise RuntimeError("fake servers did not come up")
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    fake_api = FakeTelegram(args.api_latency)
+    fake_db = FakePostgrest(args.db_latency)
+    content = seed(fake_db, args.users, args.rows)
+    fakes = multiprocessing.Process(target=serve_fakes, args=(fake_api, fake_db), daemon=True)
+    fakes.start()
+    wait_until_up()
+
+    real_execute = db.execute
+
+    async def counted_execute(query, **kwargs):
+        step = _step.get()
+        if step is not None:
+            step.db_calls += 1
+        return await real_execute(query, **kwargs)
+
+    db.execute = counted_execute
+    user_cache.clear()
+
+    application = main_bot.build_application('123456:bench')
+
+    async def record_error(update, context):
+        step = _step.get()
+        if step is not None:
+            step.failed = True
+
+    application.add_error_handler(record_error)
+    await application.initialize()
+    await application.post_init(application)
+    await wait_for_index()
+
+    traffic = Traffic()
+    scripts = []
+    for i in range(args.users):
+        if rng.random() < args.newcomers:
+            scripts.append(newcomer_script(traffic, NEWCOMER_BASE_ID + i))
+        else:
+            scripts.append(member_script(traffic, MEMBER_BASE_ID + i, content, rng, asks=i % 2 == 0))
+
+    samples = defaultdict(list)
+    db_calls = Counter()
+    failures = Counter()
+    api_before, db_before = fake_calls()
+
+    async def play(script):
+        for label, payload in script:
+            update = Update.de_json(payload, application.bot)
+            step = Step()
+            token = _step.set(step)
+            started = time.perf_counter()
+            try:
+                await application.update_processor.process_update(update, application.process_update(update))
+            finally:
+                samples[label].append(time.perf_counter() - started)
+                _step.reset(token)
+            db_calls[label] += step.db_calls
+            if step.failed:
+                failures[label] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(play(script) for script in scripts))
+    elapsed = time.perf_counter() - started
+
+    api_after, db_after = fake_calls()
+    await application.post_stop(application)
+    await application.shutdown()
+    db.execute = real_execute
+    fakes.kill()
+    fakes.join()
+
+    updates = sum(len(values) for values in samples.values())
+    total_db_calls = sum(db_calls.values())
+
+    print(f"{'handler':<28}{'updates':>9}{'p50 ms':>10}{'p99 ms':>10}{'db/update':>11}{'errors':>8}")
+    for label, values in sorted(samples.items(), key=lambda item: -sum(item[1])):
+        values.sort()
+        print(
+            f"{label:<28}{len(values):>9}{percentile(values, 0.5) * 1000:>10.1f}"
+            f"{percentile(values, 0.99) * 1000:>10.1f}{db_calls[label] / len(values):>11.2f}{failures[label]:>8}"
+        )
+    print()
+    print(f"{args.users} users, {updates} updates in {elapsed:.2f} s: {updates / elapsed:.0f} updates/s")
+    print(f"database: {total_db_calls} calls, {total_db_calls / updates:.2f} per update "
+          f"({db_after - db_before} PostgREST requests incl. background work)")
+    print(f"Bot API: {api_after - api_before} calls, {(api_after - api_before) / updates:.2f} per update")
+    print(f"failed updates: {sum(failures.values())}")
+
+
+def main():
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+
+    parser = argparse.ArgumentParser(description='Drive the main_bot handlers with synthetic users against local fakes')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--newcomers', type=float, default=0.25, help='share of users that go through /register')
+    parser.add_argument('--rows', type=int, default=100, help='seeded rows per content table')
+    parser.add_argument('--db-latency', type=float, default=0.005, help='simulated PostgREST round-trip in seconds')
+    parser.add_argument('--api-latency', type=float, default=0.02, help='simulated Bot API round-trip in seconds')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+    db.shutdown()
+
+
+if __name__ == '__main__':
+    main()
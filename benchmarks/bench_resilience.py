@@ -0,0 +1,176 @@
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import threading
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.update({
+    'METRICS_ENABLED': 'false',
+    'USER_CACHE_TTL': '0.5',
+    'SUPABASE_DEADLINE': '1',
+    'SUPABASE_BREAKER_RESET': '2'
+})
+
+import httpx
+
+import Bot
+from services import config, db, metrics, resilience, user_cache
+
+HEALTHY = 'healthy'
+FLAKY = 'flaky'
+HUNG = 'hung'
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+        self.count = len(data)
+
+
+class FakeQuery:
+    http_method = 'GET'
+
+    def __init__(self, backend, path):
+        self.backend = backend
+        self.path = path
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        return self.backend.execute()
+
+
+class FakeBackend:
+    def __init__(self, latency, failure_rate, hang):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.hang = hang
+        self.mode = HEALTHY
+        self.recovered = threading.Event()
+
+    def table(self, name):
+        return FakeQuery(self, f"/{name}")
+
+    def execute(self):
+        if self.mode == HUNG:
+            self.recovered.wait(self.hang)
+            raise httpx.ReadTimeout("read timed out")
+        time.sleep(self.latency)
+        if self.mode == FLAKY and random.random() < self.failure_rate:
+            raise httpx.ConnectError("connection reset")
+        return FakeResponse([{'first_name': 'bench', 'is_verified': True, 'role': 'member'}])
+
+    def set_mode(self, mode):
+        self.mode = mode
+        if mode == HUNG:
+            self.recovered.clear()
+        else:
+            self.recovered.set()
+
+
+class FakeMessage:
+    async def reply_text(self, text, **kwargs):
+        pass
+
+
+async def unprotected_execute(query, **kwargs):
+    return await asyncio.get_running_loop().run_in_executor(db.get_executor(), query.execute)
+
+
+async def wave(user_ids):
+    latencies = []
+    outcomes = {'served': 0, 'unavailable': 0, 'failed': 0}
+
+    async def one(user_id):
+        started = time.perf_counter()
+        update = SimpleNamespace(effective_user=SimpleNamespace(id=user_id, username=None), message=FakeMessage())
+        try:
+            await Bot.start(update, None)
+            outcomes['served'] += 1
+        except resilience.Unavailable:
+            outcomes['unavailable'] += 1
+        except Exception:
+            outcomes['failed'] += 1
+        latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one(user_id) for user_id in user_ids))
+    latencies.sort()
+    return outcomes, latencies[len(latencies) // 2], latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+
+
+def report(label, result):
+    outcomes, p50, p99 = result
+    state = resilience.STATE_NAMES[db.breaker.state]
+    print(f"{label:<34}{outcomes['served']:>8}{outcomes['unavailable']:>13}{outcomes['failed']:>8}"
+          f"{p50 * 1000:>10.0f}{p99 * 1000:>10.0f}  {state}")
+
+
+async def run(args):
+    backend = FakeBackend(args.latency, args.failure_rate, args.hang)
+    db.set_client(backend)
+    known = list(range(args.users))
+    unknown = list(range(args.users, args.users * 2))
+    ttl = user_cache._cache.ttl
+
+    print(f"{'phase':<34}{'served':>8}{'unavailable':>13}{'failed':>8}{'p50 ms':>10}{'p99 ms':>10}  breaker")
+
+    report('healthy, cold cache', await wave(known))
+    await asyncio.sleep(ttl)
+
+    backend.set_mode(FLAKY)
+    retries_before = metrics.SUPABASE_RETRIES.value('users')
+    report(f"{args.failure_rate:.0%} connection errors", await wave(known))
+    retried = metrics.SUPABASE_RETRIES.value('users') - retries_before
+    await asyncio.sleep(ttl)
+
+    original_execute = db.execute
+    db.execute = unprotected_execute
+    backend.set_mode(FLAKY)
+    report(f"{args.failure_rate:.0%} errors, no resilience layer", await wave(known))
+    await asyncio.sleep(ttl)
+
+    backend.set_mode(HUNG)
+    report('outage, no resilience layer', await wave(known[:config.DB_MAX_WORKERS]))
+    backend.set_mode(HEALTHY)
+    db.execute = original_execute
+    report('healthy again', await wave(known))
+    await asyncio.sleep(ttl)
+
+    backend.set_mode(HUNG)
+    report('outage, first wave (stale cache)', await wave(known))
+    report('outage, second wave (stale cache)', await wave(known))
+    report('outage, users not in cache', await wave(unknown))
+
+    backend.set_mode(HEALTHY)
+    await asyncio.sleep(db.breaker.reset_timeout)
+    report('recovered, half-open probe', await wave(known[:1]))
+    report('recovered', await wave(known))
+
+    print()
+    print(f"retried reads during the flaky phase: {retried}")
+    print(f"requests rejected by the open breaker: {metrics.SUPABASE_CALLS.value('users', 'rejected')}")
+    db.set_client(None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Handler behaviour during flaky and hung PostgREST, with and without the resilience layer')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.02, help='simulated PostgREST round-trip in seconds')
+    parser.add_argument('--failure-rate', type=float, default=0.3, help='share of requests failing in the flaky phase')
+    parser.add_argument('--hang', type=float, default=5, help='how long a hung request blocks before the HTTP timeout fires')
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run(args))
+    finally:
+        db.shutdown()
+
+
+if __name__ == '__main__':
+    main()
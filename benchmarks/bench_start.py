@@ -0,0 +1,102 @@
+import os
+import sys
+import time
+import asyncio
+import argparse
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Bot
+from services import db, user_cache
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+        self.count = len(data)
+
+
+class FakeQuery:
+    def __init__(self, latency, path=''):
+        self.latency = latency
+        self.path = path
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        time.sleep(self.latency)
+        return FakeResponse([{
+            'first_name': 'bench',
+            'is_verified': True,
+            'role': 'member'
+        }])
+
+
+class FakeClient:
+    def __init__(self, latency):
+        self.latency = latency
+
+    def table(self, name):
+        return FakeQuery(self.latency, f"/{name}")
+
+
+class FakeMessage:
+    async def reply_text(self, text, **kwargs):
+        pass
+
+
+async def blocking_execute(query, **kwargs):
+    return query.execute()
+
+
+async def run_updates(concurrency):
+    user_cache.clear()
+    latencies = []
+    started = time.perf_counter()
+
+    async def one(i):
+        update = SimpleNamespace(
+            effective_user=SimpleNamespace(id=i, username=None),
+            message=FakeMessage()
+        )
+        await Bot.start(update, None)
+        latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return concurrency / elapsed, latencies[len(latencies) // 2], p99
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent /start throughput, blocking vs executor data layer')
+    parser.add_argument('--latency', type=float, default=0.02, help='simulated PostgREST round-trip in seconds')
+    parser.add_argument('--budget', type=float, default=1.0, help='p99 latency budget in seconds')
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 10, 50, 100, 200, 500])
+    args = parser.parse_args()
+
+    db.set_client(FakeClient(args.latency))
+    real_execute = db.execute
+
+    print(f"{'mode':<10}{'updates':>10}{'upd/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for mode, execute in (('blocking', blocking_execute), ('executor', real_execute)):
+        db.execute = execute
+        capacity = 0
+        for level in args.levels:
+            throughput, p50, p99 = asyncio.run(run_updates(level))
+            if p99 <= args.budget:
+                capacity = level
+            print(f"{mode:<10}{level:>10}{throughput:>10.0f}{p50 * 1000:>10.1f}{p99 * 1000:>10.1f}")
+        print(f"{mode}: {capacity} concurrent /start updates within p99 <= {args.budget * 1000:.0f} ms\n")
+
+    db.execute = real_execute
+    db.set_client(None)
+    db.shutdown()
+
+
+if __name__ == '__main__':
+    main()
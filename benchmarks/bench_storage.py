@@ -0,0 +1,187 @@
+import os
+import sys
+import time
+import shutil
+import asyncio
+import hashlib
+import logging
+import argparse
+import tempfile
+import tracemalloc
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FAKE_API_PORT = 8081
+FAKE_DB_PORT = 8082
+TOKEN = '123456:bench'
+
+os.environ.update({
+    'BOT_MODE': 'polling',
+    'TELEGRAM_API_BASE_URL': f"http://127.0.0.1:{FAKE_API_PORT}",
+    'VITE_SUPABASE_URL': f"http://127.0.0.1:{FAKE_DB_PORT}",
+    'VITE_SUPABASE_ANON_KEY': 'bench.anon.key',
+    'PERSISTENCE_BACKEND': 'sqlite',
+    'PERSISTENCE_PATH': os.path.join(tempfile.mkdtemp(prefix='bench_storage_state_'), 'state.sqlite3'),
+    'METRICS_ENABLED': 'false',
+    'STORAGE_ENABLED': 'true',
+    'STORAGE_SWEEP_INTERVAL': '3600',
+    'STORAGE_SOURCE_HOSTS': '127.0.0.1'
+})
+
+import httpx
+import uvicorn
+
+import main_bot
+from fake_postgrest import FakePostgrest
+from fake_storage import FakeStorage
+from fake_telegram import FakeTelegram, file_content
+from services import db, storage, tasks
+
+
+def serve_fakes(fake_api, fake_db, fake_storage):
+    servers = [
+        uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning'))
+        for app, port in (
+            (fake_api.create_app(), FAKE_API_PORT),
+            (fake_db.create_app(fake_storage.routes()), FAKE_DB_PORT)
+        )
+    ]
+
+    async def serve():
+        await asyncio.gather(*(server.serve() for server in servers))
+
+    asyncio.run(serve())
+
+
+def stats(path, port):
+    return httpx.get(f"http://127.0.0.1:{port}{path}").json()
+
+
+def wait_until_up():
+    for _ in range(200):
+        try:
+            stats('/stats', FAKE_API_PORT)
+            return stats('/storage/v1/stats', FAKE_DB_PORT)
+        except httpx.TransportError:
+            time.sleep(0.05)
+    raise RuntimeError("fake servers did not come up")
+
+
+def resource_source(size, i):
+    name = f"size{size}_{i}"
+    if size <= storage.BOT_API_DOWNLOAD_LIMIT:
+        return name, {'file_id': name, 'file_unique_id': f"u{name}", 'file_url': None}
+    return name, {'file_id': None, 'file_url': f"http://127.0.0.1:{FAKE_API_PORT}/file/bot{TOKEN}/documents/{name}"}
+
+
+def expected_hash(file_id):
+    digest = hashlib.sha256()
+    for piece in file_content(file_id):
+        digest.update(piece)
+    return digest.hexdigest()
+
+
+def stored_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as stored:
+        for piece in iter(lambda: stored.read(1024 * 1024), b''):
+            digest.update(piece)
+    return digest.hexdigest()
+
+
+async def wait_for(condition, timeout=600):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if await condition():
+            return True
+        await asyncio.sleep(0.1)
+    return False
+
+
+async def run(args, root):
+    size = int(args.size * 1024 * 1024)
+    fake_db = FakePostgrest()
+    sources = [resource_source(size, i) for i in range(args.files)]
+    resources = [fake_db.insert('resources', {
+        'title': f"ویدیوی جلسه {i}", 'category': 'video', 'file_type': 'mp4', 'mime_type': 'video/mp4',
+        'media_type': 'video', 'file_size': size, 'storage_status': storage.PENDING, **columns
+    }) for i, (_, columns) in enumerate(sources)]
+
+    fakes = multiprocessing.Process(target=serve_fakes, args=(FakeTelegram(), fake_db, FakeStorage(root)), daemon=True)
+    fakes.start()
+    wait_until_up()
+
+    application = main_bot.build_application(TOKEN)
+    await application.initialize()
+
+    async def statuses():
+        result = await db.execute(db.table('resources').select('id, storage_status, storage_path'))
+        return result.data
+
+    async def all_stored():
+        return all(row['storage_status'] == storage.STORED for row in await statuses())
+
+    async def interrupted():
+        return stats('/storage/v1/stats', FAKE_DB_PORT).get('bytes', 0) >= size * args.files * args.interrupt_at
+
+    tracemalloc.start()
+    started = time.perf_counter()
+
+    storage.start(application)
+    if args.interrupt_at:
+        await wait_for(interrupted)
+        await tasks.cancel_all()
+        before_restart = stats('/storage/v1/stats', FAKE_DB_PORT).get('bytes', 0)
+        storage.start(application)
+
+    finished = await wait_for(all_stored)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    await tasks.cancel_all()
+    await storage.close()
+    await application.shutdown()
+
+    source = stats('/stats', FAKE_API_PORT)
+    uploaded = stats('/storage/v1/stats', FAKE_DB_PORT)
+    fakes.kill()
+    fakes.join()
+
+    total = size * args.files
+    print(f"{args.files} file(s) of {args.size:.0f} MB, chunk {int(os.environ.get('STORAGE_CHUNK_SIZE', 6 * 1024 * 1024)) // 1024} KB")
+    print(f"finished: {finished} in {elapsed:.2f} s ({total / elapsed / 1024 / 1024:.1f} MB/s)")
+    if args.interrupt_at:
+        print(f"interrupted after {before_restart / 1024 / 1024:.1f} MB; "
+              f"source bytes requested: {source.get('file_bytes', 0) / 1024 / 1024:.1f} MB for {total / 1024 / 1024:.1f} MB of files")
+    print(f"PATCH requests: {uploaded.get('patch', 0)}, largest chunk {uploaded.get('largest_chunk', 0) // 1024} KB")
+    print(f"peak Python heap during transfer: {peak / 1024 / 1024:.1f} MB")
+
+    mismatched = 0
+    for resource, (name, _) in zip(resources, sources):
+        path = os.path.join(root, 'resources', storage.object_path(resource))
+        if not os.path.exists(path) or stored_hash(path) != expected_hash(name):
+            mismatched += 1
+    print(f"objects matching the source: {args.files - mismatched}/{args.files}")
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING)
+
+    parser = argparse.ArgumentParser(description='Offload resource files to a fake Supabase Storage with resumable chunked uploads; files above the 20 MB Bot API download limit are served as legacy external links')
+    parser.add_argument('--files', type=int, default=3)
+    parser.add_argument('--size', type=float, default=200, help='size of each file in MB')
+    parser.add_argument('--interrupt-at', type=float, default=0.5, help='share of bytes after which the transfer is cancelled and restarted (0 to disable)')
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='bench_storage_')
+    try:
+        asyncio.run(run(args, root))
+    finally:
+        db.shutdown()
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+import os
+import sys
+import time
+import asyncio
+import logging
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FAKE_API_PORT = 8081
+WEBHOOK_PORT = 8443
+SECRET = 'bench-secret'
+
+os.environ.update({
+    'BOT_MODE': 'webhook',
+    'TELEGRAM_API_BASE_URL': f"http://127.0.0.1:{FAKE_API_PORT}",
+    'WEBHOOK_LISTEN': '127.0.0.1',
+    'WEBHOOK_PORT': str(WEBHOOK_PORT),
+    'WEBHOOK_SECRET': SECRET,
+    'WEBHOOK_URL': '',
+    'PERSISTENCE_BACKEND': 'none'
+})
+
+import httpx
+import uvicorn
+from telegram.ext import Application, CommandHandler
+
+import Bot
+from bench_start import FakeClient
+from fake_telegram import FakeTelegram
+from services import config, db, runner, user_cache, webhook
+
+
+def start_update(update_id, user_id):
+    return {
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': int(time.time()),
+            'chat': {'id': user_id, 'type': 'private'},
+            'from': {'id': user_id, 'is_bot': False, 'first_name': f"user{user_id}"},
+            'text': '/start',
+            'entities': [{'type': 'bot_command', 'offset': 0, 'length': 6}]
+        }
+    }
+
+
+async def wait_until_up(client, url):
+    for _ in range(100):
+        try:
+            await client.get(url)
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.05)
+    raise RuntimeError(f"{url} did not come up")
+
+
+async def run(updates, concurrency, latency):
+    db.set_client(FakeClient(latency))
+    user_cache.clear()
+
+    fake = FakeTelegram()
+    fake_server = uvicorn.Server(uvicorn.Config(fake.create_app(), host='127.0.0.1', port=FAKE_API_PORT, log_level='warning'))
+    fake_task = asyncio.create_task(fake_server.serve())
+
+    application = runner.configure(Application.builder().token('123456:bench')).build()
+    application.add_handler(CommandHandler('start', Bot.start))
+    bot_server = webhook.create_server(application, SECRET)
+    bot_task = asyncio.create_task(webhook.serve(application, bot_server))
+
+    webhook_url = f"http://127.0.0.1:{WEBHOOK_PORT}{config.WEBHOOK_PATH}"
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        await wait_until_up(client, f"http://127.0.0.1:{WEBHOOK_PORT}/healthz")
+
+        rejected = await client.post(webhook_url, json=start_update(0, 1))
+        semaphore = asyncio.Semaphore(concurrency)
+        statuses = []
+
+        async def post(i):
+            async with semaphore:
+                response = await client.post(
+                    webhook_url,
+                    json=start_update(i, 1000 + i),
+                    headers={webhook.SECRET_HEADER: SECRET}
+                )
+                statuses.append(response.status_code)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(post(i) for i in range(1, updates + 1)))
+        ingested = time.perf_counter() - started
+
+        while fake.calls['sendMessage'] < statuses.count(200):
+            await asyncio.sleep(0.01)
+        processed = time.perf_counter() - started
+
+    bot_server.should_exit = True
+    await bot_task
+    fake_server.should_exit = True
+    await fake_task
+    db.set_client(None)
+
+    print(f"request without secret token: HTTP {rejected.status_code}")
+    print(f"accepted {statuses.count(200)}/{updates} updates, {statuses.count(503)} shed with 503")
+    print(f"ingestion: {updates / ingested:.0f} updates/s ({ingested * 1000:.0f} ms)")
+    print(f"end-to-end: {statuses.count(200) / processed:.0f} replies/s ({processed * 1000:.0f} ms)")
+
+
+def main():
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+
+    parser = argparse.ArgumentParser(description='Webhook ingestion throughput against a local fake Bot API')
+    parser.add_argument('--updates', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=config.WEBHOOK_MAX_CONNECTIONS)
+    parser.add_argument('--latency', type=float, default=0.0, help='simulated PostgREST round-trip in seconds')
+    args = parser.parse_args()
+
+    asyncio.run(run(args.updates, args.concurrency, args.latency))
+    db.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,486 @@
+import os
+import re
+import sys
+import uuid
+import asyncio
+import argparse
+import operator
+from collections import Counter
+from datetime import datetime, timezone
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.pagination import parse_timestamp
+
+TABLES = {
+    'users': {
+        'username': None, 'first_name': None, 'last_name': None, 'role': 'member', 'student_id': None,
+        'major': None, 'year': None, 'is_verified': False, 'is_active': True
+    },
+    'announcements': {
+        'category': 'general', 'priority': 'medium', 'created_by': None, 'scheduled_for': None,
+        'is_published': False, 'views_count': 0
+    },
+    'events': {
+        'description': None, 'location': None, 'capacity': None, 'registered_count': 0,
+        'created_by': None, 'is_active': True
+    },
+    'event_registrations': {'status': 'registered'},
+    'resources': {
+        'description': None, 'category': 'book', 'file_url': None, 'file_type': None,
+        'media_type': None, 'file_id': None, 'file_unique_id': None, 'file_size': None,
+        'mime_type': None, 'content_hash': None, 'storage_status': None, 'storage_path': None,
+        'storage_upload_url': None, 'uploaded_by': None, 'downloads_count': 0, 'tags': None
+    },
+    'questions': {'category': 'concept', 'is_answered': False, 'views_count': 0},
+    'answers': {'is_accepted': False},
+    'broadcasts': {
+        'announcement_id': None, 'notify_chat_id': None, 'status': 'pending', 'total_count': 0,
+        'sent_count': 0, 'failed_count': 0, 'finished_at': None
+    },
+    'broadcast_deliveries': {'status': 'pending', 'attempts': 0, 'error': None}
+}
+
+TIMESTAMPS = {
+    'users': ('joined_at', 'last_activity'),
+    'event_registrations': ('registered_at',),
+    'broadcast_deliveries': ('updated_at',)
+}
+
+WITHOUT_ID = {'broadcast_deliveries'}
+
+RELATIONS = {
+    ('questions', 'users'): ('user_id', 'id', False),
+    ('questions', 'answers'): ('id', 'question_id', True),
+    ('answers', 'users'): ('user_id', 'id', False),
+    ('resources', 'users'): ('uploaded_by', 'id', False),
+    ('announcements', 'users'): ('created_by', 'id', False),
+    ('events', 'event_registrations'): ('id', 'event_id', True),
+    ('event_registrations', 'users'): ('user_id', 'id', False)
+}
+
+RESERVED = {'select', 'order', 'limit', 'offset', 'on_conflict', 'columns'}
+
+OPERATORS = {
+    'eq': operator.eq,
+    'neq': operator.ne,
+    'lt': operator.lt,
+    'lte': operator.le,
+    'gt': operator.gt,
+    'gte': operator.ge
+}
+
+_TIMESTAMP = re.compile(r'^\d{4}-\d{2}-\d{2}[T ]\d{2}:')
+
+
+class QueryError(Exception):
+    pass
+
+
+def now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def split_top_level(text):
+    parts, current, depth, quoted = [], '', 0, False
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == '(':
+            depth += 1
+        elif not quoted and char == ')':
+            depth -= 1
+        elif not quoted and depth == 0 and char == ',':
+            parts.append(current.strip())
+            current = ''
+            continue
+        current += char
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+def _unquote(raw):
+    if len(raw) > 1 and raw[0] == raw[-1] == '"':
+        return raw[1:-1]
+    return raw
+
+
+def _comparable(value):
+    if isinstance(value, str) and _TIMESTAMP.match(value):
+        return parse_timestamp(value)
+    return value
+
+
+def _coerce(current, raw):
+    raw = _unquote(raw)
+    if isinstance(current, bool):
+        return raw == 'true'
+    if isinstance(current, int):
+        return int(raw)
+    if isinstance(current, float):
+        return float(raw)
+    return _comparable(raw)
+
+
+def _sort_key(value):
+    value = _comparable(value)
+    return (value is None, value if value is not None else 0)
+
+
+def condition(column, expression):
+    op, _, raw = expression.partition('.')
+    if op == 'not':
+        inner = condition(column, raw)
+        return lambda row: not inner(row)
+    if op == 'is':
+        expected = {'null': None, 'true': True, 'false': False}[raw]
+        return lambda row: row.get(column) is expected
+    if op == 'in':
+        values = [_unquote(value) for value in split_top_level(raw[1:-1])]
+        return lambda row: row.get(column) is not None and _comparable(row[column]) in [_coerce(row[column], v) for v in values]
+    if op not in OPERATORS:
+        raise QueryError(f"unsupported operator {op}")
+    compare = OPERATORS[op]
+    return lambda row: row.get(column) is not None and compare(_comparable(row[column]), _coerce(row[column], raw))
+
+
+def logic(kind, body):
+    predicates = []
+    for part in split_top_level(body[1:-1]):
+        if part.startswith(('and(', 'or(')):
+            name, _, rest = part.partition('(')
+            predicates.append(logic(name, f"({rest}"))
+        else:
+            column, _, expression = part.partition('.')
+            predicates.append(condition(column, expression))
+    combine = all if kind == 'and' else any
+    return lambda row: combine(predicate(row) for predicate in predicates)
+
+
+def parse_select(text):
+    columns, embeds = [], []
+    for part in split_top_level(text or '*'):
+        if '(' in part:
+            name, _, rest = part.partition('(')
+            embeds.append((name.split(':')[-1].split('!')[0], rest[:-1]))
+        else:
+            columns.append(part)
+    return columns, embeds
+
+
+def order_rows(rows, spec):
+    for term in reversed(spec.split(',')):
+        column, *modifiers = term.split('.')
+        rows.sort(key=lambda row: _sort_key(row.get(column)), reverse='desc' in modifiers)
+    return rows
+
+
+class FakePostgrest:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = Counter()
+        self.tables = {name: [] for name in TABLES}
+
+    def _table(self, name):
+        if name not in self.tables:
+            raise QueryError(f"relation {name} does not exist")
+        return self.tables[name]
+
+    def insert(self, table, row):
+        rows = self._table(table)
+        full = dict(TABLES[table])
+        if table not in WITHOUT_ID:
+            full['id'] = str(uuid.uuid4())
+        for column in TIMESTAMPS.get(table, ('created_at',)):
+            full[column] = now()
+        full.update(row)
+        rows.append(full)
+        return full
+
+    def _filters(self, params):
+        predicates = []
+        for key, value in params:
+            if key in RESERVED or '.' in key:
+                continue
+            if key in ('or', 'and'):
+                predicates.append(logic(key, value))
+            else:
+                predicates.append(condition(key, value))
+        return predicates
+
+    def _project(self, table, row, columns, embeds, params):
+        if '*' in columns:
+            result = dict(row)
+        else:
+            result = {column: row.get(column) for column in columns}
+        for name, select in embeds:
+            relation = RELATIONS.get((table, name))
+            if relation is None:
+                raise QueryError(f"no relationship between {table} and {name}")
+            local, remote, many = relation
+            nested = [(key[len(name) + 1:], value) for key, value in params if key.startswith(f"{name}.")]
+            related = self._read(name, nested, select, lambda candidate: candidate.get(remote) == row.get(local))
+            result[name] = related if many else (related[0] if related else None)
+        return result
+
+    def _read(self, table, params, select, scope=None):
+        predicates = self._filters(params)
+        rows = [row for row in self._table(table) if (scope is None or scope(row)) and all(p(row) for p in predicates)]
+        options = dict((key, value) for key, value in params if key in RESERVED)
+        if 'order' in options:
+            rows = order_rows(rows, options['order'])
+        offset = int(options.get('offset', 0))
+        if 'limit' in options:
+            rows = rows[offset:offset + int(options['limit'])]
+        elif offset:
+            rows = rows[offset:]
+        columns, embeds = parse_select(options.get('select', select))
+        return [self._project(table, row, columns, embeds, params) for row in rows]
+
+    def select(self, table, params):
+        return self._read(table, params, '*')
+
+    def _matching(self, table, params):
+        predicates = self._filters(params)
+        return [row for row in self._table(table) if all(p(row) for p in predicates)]
+
+    def update(self, table, params, values):
+        rows = self._matching(table, params)
+        for row in rows:
+            row.update(values)
+        return rows
+
+    def delete(self, table, params):
+        rows = self._matching(table, params)
+        remaining = [row for row in self._table(table) if row not in rows]
+        self.tables[table] = remaining
+        return rows
+
+    def rpc_search_content(self, params):
+        words = params['search_query'].lower().split()
+        results = []
+        for kind, table, body in (('question', 'questions', 'content'), ('resource', 'resources', 'description')):
+            for row in self.tables[table]:
+                text = f"{row['title']} {row.get(body) or ''}".lower()
+                rank = sum(text.count(word) for word in words)
+                if rank:
+                    results.append({
+                        'kind': kind,
+                        'id': row['id'],
+                        'title': row['title'],
+                        'category': row['category'],
+                        'description': row.get(body),
+                        'file_url': row.get('file_url'),
+                        'file_id': row.get('file_id'),
+                        'media_type': row.get('media_type'),
+                        'rank': float(rank)
+                    })
+        results.sort(key=lambda result: (-result['rank'], result['id']))
+        offset = params.get('result_offset', 0)
+        return results[offset:offset + params.get('result_limit', 10)]
+
+    def rpc_bot_stats(self, params):
+        users = self.tables['users']
+        verified = sum(1 for user in users if user['is_verified'])
+        return {
+            'total_users': len(users),
+            'verified_users': verified,
+            'pending_users': len(users) - verified,
+            'announcements': len(self.tables['announcements']),
+            'events': len(self.tables['events']),
+            'questions': len(self.tables['questions']),
+            'resources': len(self.tables['resources'])
+        }
+
+    def rpc_pending_registrations_by_year(self, params):
+        pending = Counter(user['year'] for user in self.tables['users'] if not user['is_verified'] and user.get('year') is not None)
+        return [{'year': year, 'pending': count} for year, count in sorted(pending.items(), reverse=True)]
+
+    def rpc_apply_counter_deltas(self, params):
+        for kind, table, column in (
+            ('question_views', 'questions', 'views_count'),
+            ('resource_downloads', 'resources', 'downloads_count')
+        ):
+            deltas = params.get(kind) or {}
+            for row in self.tables[table]:
+                row[column] += deltas.get(row['id'], 0)
+        activity = params.get('user_activity') or {}
+        for user in self.tables['users']:
+            seen = activity.get(str(user['telegram_id']))
+            if seen is not None:
+                user['last_activity'] = datetime.fromtimestamp(seen, timezone.utc).isoformat()
+        return None
+
+    def _registration(self, event_id, user_id):
+        for registration in self.tables['event_registrations']:
+            if registration['event_id'] == event_id and registration['user_id'] == user_id:
+                return registration
+        return None
+
+    def rpc_register_for_event(self, params):
+        event = next((e for e in self.tables['events'] if e['id'] == params['target_event'] and e['is_active']), None)
+        if event is None:
+            return {'status': 'not_found'}
+
+        registration = self._registration(event['id'], params['member_id'])
+        if registration and registration['status'] in ('registered', 'waitlisted', 'attended'):
+            return {
+                'status': f"already_{registration['status']}",
+                'registered_count': event['registered_count'],
+                'capacity': event['capacity']
+            }
+
+        if event['capacity'] is None or event['registered_count'] < event['capacity']:
+            status = 'registered'
+            event['registered_count'] += 1
+        else:
+            status = 'waitlisted'
+
+        if registration is None:
+            self.insert('event_registrations', {'event_id': event['id'], 'user_id': params['member_id'], 'status': status})
+        else:
+            registration.update({'status': status, 'registered_at': now()})
+
+        position = None
+        if status == 'waitlisted':
+            position = sum(
+                1 for r in self.tables['event_registrations']
+                if r['event_id'] == event['id'] and r['status'] == 'waitlisted'
+            )
+        return {
+            'status': status,
+            'registered_count': event['registered_count'],
+            'capacity': event['capacity'],
+            'position': position
+        }
+
+    def rpc_cancel_event_registration(self, params):
+        event = next((e for e in self.tables['events'] if e['id'] == params['target_event']), None)
+        if event is None:
+            return {'status': 'not_found'}
+
+        registration = self._registration(event['id'], params['member_id'])
+        if registration is None or registration['status'] not in ('registered', 'waitlisted'):
+            return {'status': 'not_registered'}
+
+        previous, registration['status'] = registration['status'], 'cancelled'
+        promoted_telegram_id = None
+        if previous == 'registered':
+            waitlist = order_rows([
+                r for r in self.tables['event_registrations']
+                if r['event_id'] == event['id'] and r['status'] == 'waitlisted'
+            ], 'registered_at')
+            if waitlist:
+                waitlist[0]['status'] = 'registered'
+                promoted = next(u for u in self.tables['users'] if u['id'] == waitlist[0]['user_id'])
+                promoted_telegram_id = promoted['telegram_id']
+            else:
+                event['registered_count'] = max(event['registered_count'] - 1, 0)
+
+        return {
+            'status': 'cancelled',
+            'registered_count': event['registered_count'],
+            'capacity': event['capacity'],
+            'promoted_telegram_id': promoted_telegram_id
+        }
+
+    def rpc_claim_due_announcements(self, params):
+        current = datetime.now(timezone.utc)
+        pending = [
+            a for a in self.tables['announcements']
+            if not a['is_published'] and a['scheduled_for'] is not None and a.get('broadcast_text') is not None
+        ]
+        due = order_rows([a for a in pending if parse_timestamp(a['scheduled_for']) <= current], 'scheduled_for')
+        recipients = [u['telegram_id'] for u in self.tables['users'] if u['is_verified']]
+        claimed = []
+        for announcement in due[:params.get('batch_size', 20)]:
+            announcement['is_published'] = True
+            author = next((u for u in self.tables['users'] if u['id'] == announcement['created_by']), None)
+            broadcast = self.insert('broadcasts', {
+                'announcement_id': announcement['id'],
+                'text': announcement['broadcast_text'],
+                'notify_chat_id': author['telegram_id'] if author else None,
+                'status': 'pending',
+                'total_count': len(recipients)
+            })
+            for telegram_id in recipients:
+                self.insert('broadcast_deliveries', {'broadcast_id': broadcast['id'], 'telegram_id': telegram_id})
+            claimed.append(broadcast)
+        remaining = [a['scheduled_for'] for a in pending if not a['is_published']]
+        next_due = min(remaining, key=parse_timestamp) if remaining else None
+        return {'broadcasts': claimed, 'next_due': next_due}
+
+    def _respond(self, request, rows):
+        prefer = request.headers.get('prefer', '')
+        if request.method != 'GET' and 'return=representation' not in prefer:
+            return Response(status_code=204)
+        headers = {}
+        if 'count=' in prefer:
+            headers['content-range'] = f"0-{max(len(rows) - 1, 0)}/{len(rows)}"
+        return JSONResponse(rows, status_code=201 if request.method == 'POST' else 200, headers=headers)
+
+    async def handle_table(self, request: Request):
+        table = request.path_params['table']
+        params = list(request.query_params.multi_items())
+        self.calls[f"{request.method} {table}"] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        try:
+            if request.method == 'GET':
+                return self._respond(request, self.select(table, params))
+            if request.method == 'POST':
+                body = await request.json()
+                rows = [self.insert(table, row) for row in (body if isinstance(body, list) else [body])]
+                return self._respond(request, rows)
+            if request.method == 'PATCH':
+                return self._respond(request, self.update(table, params, await request.json()))
+            return self._respond(request, self.delete(table, params))
+        except (QueryError, KeyError, ValueError) as e:
+            return JSONResponse({'message': str(e), 'code': 'PGRST100', 'hint': None, 'details': None}, status_code=400)
+
+    async def handle_rpc(self, request: Request):
+        fn = request.path_params['fn']
+        self.calls[f"RPC {fn}"] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        implementation = getattr(self, f"rpc_{fn}", None)
+        if implementation is None:
+            return JSONResponse({'message': f"function {fn} does not exist", 'code': 'PGRST202'}, status_code=404)
+        body = await request.body()
+        return JSONResponse(implementation(await request.json() if body else {}))
+
+    async def stats(self, request: Request):
+        return JSONResponse(dict(self.calls))
+
+    def create_app(self, extra_routes=()):
+        return Starlette(routes=[
+            *extra_routes,
+            Route('/rest/v1/rpc/{fn}', self.handle_rpc, methods=['GET', 'POST']),
+            Route('/rest/v1/{table}', self.handle_table, methods=['GET', 'POST', 'PATCH', 'DELETE']),
+            Route('/stats', self.stats, methods=['GET'])
+        ])
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description='In-memory PostgREST stand-in for the bot tables and functions')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8082)
+    parser.add_argument('--latency', type=float, default=0.0, help='simulated round-trip in seconds')
+    args = parser.parse_args()
+
+    print(f"Fake PostgREST on http://{args.host}:{args.port} (set VITE_SUPABASE_URL to this address)")
+    uvicorn.run(FakePostgrest(args.latency).create_app(), host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
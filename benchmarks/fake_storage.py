@@ -0,0 +1,125 @@
+import os
+import uuid
+import base64
+import asyncio
+import argparse
+from collections import Counter
+
+from starlette.applications import Starlette
+from starlette.requests import ClientDisconnect, Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+
+def parse_metadata(header):
+    metadata = {}
+    for pair in filter(None, header.split(',')):
+        key, _, value = pair.strip().partition(' ')
+        metadata[key] = base64.b64decode(value).decode() if value else ''
+    return metadata
+
+
+class FakeStorage:
+    def __init__(self, root, latency=0.0):
+        self.root = root
+        self.latency = latency
+        self.calls = Counter()
+        self.uploads = {}
+
+    def object_file(self, bucket, name):
+        return os.path.join(self.root, bucket, name)
+
+    async def create_upload(self, request: Request):
+        self.calls['create'] += 1
+        metadata = parse_metadata(request.headers.get('upload-metadata', ''))
+        upload_id = uuid.uuid4().hex
+        self.uploads[upload_id] = {
+            'length': int(request.headers['upload-length']),
+            'offset': 0,
+            'target': self.object_file(metadata['bucketName'], metadata['objectName']),
+            'part': os.path.join(self.root, f"{upload_id}.part")
+        }
+        open(self.uploads[upload_id]['part'], 'wb').close()
+        return Response(status_code=201, headers={
+            'Location': f"/storage/v1/upload/resumable/{upload_id}",
+            'Tus-Resumable': '1.0.0'
+        })
+
+    def _progress(self, upload, status_code):
+        return Response(status_code=status_code, headers={
+            'Upload-Offset': str(upload['offset']),
+            'Upload-Length': str(upload['length']),
+            'Tus-Resumable': '1.0.0'
+        })
+
+    async def upload_status(self, request: Request):
+        self.calls['head'] += 1
+        upload = self.uploads.get(request.path_params['upload_id'])
+        if upload is None:
+            return Response(status_code=404)
+        return self._progress(upload, 200)
+
+    async def write_chunk(self, request: Request):
+        upload = self.uploads.get(request.path_params['upload_id'])
+        if upload is None:
+            return Response(status_code=404)
+        if int(request.headers['upload-offset']) != upload['offset']:
+            return Response(status_code=409)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        try:
+            body = await request.body()
+        except ClientDisconnect:
+            return Response(status_code=400)
+        self.calls['patch'] += 1
+        self.calls['bytes'] += len(body)
+        self.calls['largest_chunk'] = max(self.calls['largest_chunk'], len(body))
+        with open(upload['part'], 'ab') as part:
+            part.write(body)
+        upload['offset'] += len(body)
+
+        if upload['offset'] >= upload['length']:
+            os.makedirs(os.path.dirname(upload['target']), exist_ok=True)
+            os.replace(upload['part'], upload['target'])
+        return self._progress(upload, 204)
+
+    async def sign(self, request: Request):
+        self.calls['sign'] += 1
+        bucket, path = request.path_params['bucket'], request.path_params['path']
+        if not os.path.exists(self.object_file(bucket, path)):
+            return JSONResponse({'message': 'Object not found'}, status_code=404)
+        return JSONResponse({'signedURL': f"/object/sign/{bucket}/{path}?token={uuid.uuid4().hex}"})
+
+    async def stats(self, request: Request):
+        return JSONResponse(dict(self.calls))
+
+    def routes(self):
+        return [
+            Route('/storage/v1/upload/resumable', self.create_upload, methods=['POST']),
+            Route('/storage/v1/upload/resumable/{upload_id}', self.upload_status, methods=['HEAD']),
+            Route('/storage/v1/upload/resumable/{upload_id}', self.write_chunk, methods=['PATCH']),
+            Route('/storage/v1/object/sign/{bucket}/{path:path}', self.sign, methods=['POST']),
+            Route('/storage/v1/stats', self.stats, methods=['GET'])
+        ]
+
+    def create_app(self):
+        return Starlette(routes=self.routes())
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description='Local stand-in for Supabase Storage resumable uploads and signed URLs')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8083)
+    parser.add_argument('--root', default='fake_storage')
+    parser.add_argument('--latency', type=float, default=0.0, help='simulated round-trip per chunk in seconds')
+    args = parser.parse_args()
+
+    print(f"Fake Storage on http://{args.host}:{args.port}, objects under {args.root}")
+    uvicorn.run(FakeStorage(args.root, args.latency).create_app(), host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+import time
+import asyncio
+import argparse
+from collections import Counter
+from urllib.parse import parse_qsl
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+BOT_USER = {'id': 1, 'is_bot': True, 'first_name': 'Fake', 'username': 'fake_bot'}
+FILE_SIZE = 256 * 1024
+FILE_HEADER = 256
+FILE_BLOCK = 64 * 1024
+_PATTERN = bytes(range(256)) * (FILE_BLOCK // 256 + 1)
+
+
+def file_size(file_id):
+    if file_id.startswith('size') and '_' in file_id:
+        return int(file_id[4:].split('_', 1)[0])
+    return FILE_SIZE
+
+
+def file_content(file_id, start=0):
+    size = file_size(file_id)
+    header = file_id.encode()[:FILE_HEADER].ljust(FILE_HEADER, b'\0')
+    position = start
+    if position < FILE_HEADER:
+        yield header[position:min(size, FILE_HEADER)]
+        position = FILE_HEADER
+    while position < size:
+        length = min(FILE_BLOCK, size - position)
+        yield _PATTERN[position % 256:position % 256 + length]
+        position += length
+
+
+class FakeTelegram:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = Counter()
+        self.messages = []
+        self._message_id = 0
+
+    def _message(self, params):
+        self._message_id += 1
+        chat_id = int(params.get('chat_id') or 0)
+        return {
+            'message_id': int(params.get('message_id') or self._message_id),
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'from': BOT_USER,
+            'text': params.get('text', '')
+        }
+
+    def result(self, method, params):
+        if method == 'getMe':
+            return BOT_USER
+        if method == 'getFile':
+            file_id = params.get('file_id', '')
+            return {'file_id': file_id, 'file_unique_id': f"u{file_id}", 'file_size': file_size(file_id), 'file_path': f"documents/{file_id}"}
+        if method in ('sendMessage', 'editMessageText', 'sendDocument', 'sendPhoto', 'sendVideo'):
+            message = self._message(params)
+            self.messages.append(message)
+            return message
+        return True
+
+    async def handle(self, request: Request):
+        method = request.path_params['method']
+        if request.headers.get('content-type', '').startswith('application/json'):
+            params = await request.json()
+        else:
+            params = dict(parse_qsl((await request.body()).decode()))
+        self.calls[method] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return JSONResponse({'ok': True, 'result': self.result(method, params)})
+
+    async def download(self, request: Request):
+        file_id = request.path_params['path'].rsplit('/', 1)[-1]
+        size = file_size(file_id)
+        start = 0
+        if request.headers.get('range', '').startswith('bytes='):
+            start = int(request.headers['range'][6:].split('-', 1)[0])
+        self.calls['file'] += 1
+        self.calls['file_bytes'] += size - start
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        headers = {'Content-Length': str(size - start), 'Accept-Ranges': 'bytes'}
+        if start:
+            headers['Content-Range'] = f"bytes {start}-{size - 1}/{size}"
+        return StreamingResponse(file_content(file_id, start), status_code=206 if start else 200, headers=headers)
+
+    async def stats(self, request: Request):
+        return JSONResponse(dict(self.calls))
+
+    def create_app(self):
+        return Starlette(routes=[
+            Route('/bot{token}/{method}', self.handle, methods=['GET', 'POST']),
+            Route('/file/bot{token}/{path:path}', self.download, methods=['GET']),
+            Route('/stats', self.stats, methods=['GET'])
+        ])
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description='Local stand-in for the Telegram Bot API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--latency', type=float, default=0.0, help='simulated round-trip in seconds')
+    args = parser.parse_args()
+
+    print(f"Fake Bot API on http://{args.host}:{args.port} (set TELEGRAM_API_BASE_URL to this address)")
+    uvicorn.run(FakeTelegram(args.latency).create_app(), host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
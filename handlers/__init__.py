@@ -1 +1,19 @@
+import importlib
 
+_handlers = {}
+
+
+def resolve(path):
+    handler = _handlers.get(path)
+    if handler is None:
+        module, name = path.split(':')
+        handler = _handlers[path] = getattr(importlib.import_module(f"handlers.{module}"), name)
+    return handler
+
+
+def lazy(path):
+    async def handler(*args, **kwargs):
+        return await resolve(path)(*args, **kwargs)
+
+    handler.__name__ = handler.__qualname__ = path.split(':')[1]
+    return handler
@@ -1,47 +1,104 @@
-import os
-from datetime import datetime
+import logging
+from datetime import datetime, timezone
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, ConversationHandler, MessageHandler, filters
-from supabase import create_client
-from dotenv import load_dotenv
 
-load_dotenv()
-
-supabase = create_client(
-    os.getenv('VITE_SUPABASE_URL'),
-    os.getenv('VITE_SUPABASE_ANON_KEY')
+from services import broadcast, callbacks, db, keyboards, notifications, pagination, resilience, scheduler, stats, tasks, user_cache
+from handlers.states import (
+    ANNOUNCE_TITLE, ANNOUNCE_CONTENT, ANNOUNCE_CATEGORY, ANNOUNCE_PRIORITY, ANNOUNCE_SCHEDULE,
+    EVENT_TITLE, EVENT_DESC, EVENT_DATE, EVENT_LOCATION, EVENT_CAPACITY
 )
 
-ANNOUNCE_TITLE, ANNOUNCE_CONTENT, ANNOUNCE_CATEGORY, ANNOUNCE_PRIORITY = range(4)
-EVENT_TITLE, EVENT_DESC, EVENT_DATE, EVENT_LOCATION, EVENT_CAPACITY = range(5)
+logger = logging.getLogger(__name__)
+
+APPROVED_TEXT = "سلام {first_name}!\n\n" \
+                "حساب کاربری شما توسط مدیران تایید شد.\n" \
+                "اکنون می‌توانید از تمام امکانات ربات استفاده کنید.\n\n" \
+                "از دستور /start استفاده کنید."
+
+REJECTED_TEXT = "سلام {first_name}!\n\n" \
+                "متاسفانه درخواست عضویت شما توسط مدیران رد شد.\n" \
+                "در صورت نیاز می‌توانید مجددا ثبت‌نام کنید."
 
 async def verify_users_list(query, context):
-    pending = supabase.table('users').select('*').eq('is_verified', False).execute()
+    await _show_pending_page(query, context, query.data)
+
+async def _show_pending_page(query, context, page_data):
+    context.user_data['verify_page'] = page_data
+    selection = context.user_data.setdefault('verify_selection', set())
+
+    _, direction, cursor = pagination.split(page_data)
+    page = await pagination.fetch_page(
+        db.table('users').select('id, first_name, last_name, student_id, joined_at').eq('is_verified', False),
+        'joined_at', descending=False, direction=direction, cursor=cursor
+    )
 
-    if not pending.data:
-        keyboard = [[InlineKeyboardButton("🔙 بازگشت", callback_data='admin_panel')]]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        await query.edit_message_text("کاربری در انتظار تایید نیست.", reply_markup=reply_markup)
+    if not page.rows:
+        selection.clear()
+        await query.edit_message_text("کاربری در انتظار تایید نیست.", reply_markup=keyboards.back('admin_panel'))
         return
 
-    keyboard = []
-    for user in pending.data:
-        keyboard.append([InlineKeyboardButton(
-            f"{user['first_name']} {user['last_name']} - {user['student_id']}",
-            callback_data=f"verify_{user['id']}"
-        )])
+    context.user_data['verify_page_ids'] = [user['id'] for user in page.rows]
 
-    keyboard.append([InlineKeyboardButton("🔙 بازگشت", callback_data='admin_panel')])
+    keyboard = []
+    for user in page.rows:
+        mark = "☑️" if user['id'] in selection else "⬜"
+        keyboard.append([
+            InlineKeyboardButton(
+                f"{mark} {user['first_name']} {user['last_name']} - {user['student_id']}",
+                callback_data=callbacks.VERIFY_TOGGLE.data(user['id'])
+            ),
+            InlineKeyboardButton("ℹ️", callback_data=callbacks.VERIFY_USER.data(user['id']))
+        ])
+
+    nav = pagination.nav_row(page, 'admin_verify')
+    if nav:
+        keyboard.append(nav)
+    keyboard.append([
+        InlineKeyboardButton("انتخاب این صفحه", callback_data='bulk_page'),
+        InlineKeyboardButton("تایید بر اساس ورودی", callback_data='bulk_years')
+    ])
+    if selection:
+        keyboard.append([
+            InlineKeyboardButton(f"✅ تایید ({len(selection)})", callback_data='bulk_approve'),
+            InlineKeyboardButton(f"❌ رد ({len(selection)})", callback_data='bulk_reject'),
+            InlineKeyboardButton("لغو انتخاب", callback_data='bulk_clear')
+        ])
+    keyboard.append([keyboards.back_button('admin_panel')])
     reply_markup = InlineKeyboardMarkup(keyboard)
 
     await query.edit_message_text(
-        "کاربران در انتظار تایید:",
+        "کاربران در انتظار تایید:\n\n"
+        "برای انتخاب گروهی روی نام‌ها بزنید. دکمه ℹ️ جزئیات هر کاربر را نشان می‌دهد.",
         reply_markup=reply_markup
     )
 
-async def verify_user_detail(query, context):
-    user_id = query.data.replace('verify_', '')
-    user = supabase.table('users').select('*').eq('id', user_id).execute()
+async def _refresh_pending_page(query, context):
+    await _show_pending_page(query, context, context.user_data.get('verify_page', 'admin_verify'))
+
+async def toggle_pending_user(query, context, user_id):
+    selection = context.user_data.setdefault('verify_selection', set())
+    if user_id in selection:
+        selection.discard(user_id)
+    else:
+        selection.add(user_id)
+    await _refresh_pending_page(query, context)
+
+async def select_pending_page(query, context):
+    selection = context.user_data.setdefault('verify_selection', set())
+    page_ids = set(context.user_data.get('verify_page_ids', []))
+    if page_ids <= selection:
+        selection -= page_ids
+    else:
+        selection |= page_ids
+    await _refresh_pending_page(query, context)
+
+async def clear_pending_selection(query, context):
+    context.user_data.setdefault('verify_selection', set()).clear()
+    await _refresh_pending_page(query, context)
+
+async def verify_user_detail(query, context, user_id):
+    user = await db.execute(db.table('users').select('*').eq('id', user_id))
 
     if not user.data:
         await query.answer("کاربر یافت نشد!")
@@ -58,93 +115,181 @@ async def verify_user_detail(query, context):
                 f"تاریخ ثبت‌نام: {datetime.fromisoformat(user_data['joined_at'].replace('Z', '+00:00')).strftime('%Y/%m/%d %H:%M')}"
 
     keyboard = [
-        [InlineKeyboardButton("✅ تایید", callback_data=f"approve_{user_id}"),
-         InlineKeyboardButton("❌ رد", callback_data=f"reject_{user_id}")],
-        [InlineKeyboardButton("🔙 بازگشت", callback_data='admin_verify')]
+        [InlineKeyboardButton("✅ تایید", callback_data=callbacks.APPROVE_USER.data(user_id)),
+         InlineKeyboardButton("❌ رد", callback_data=callbacks.REJECT_USER.data(user_id))],
+        [keyboards.back_button('admin_verify')]
     ]
     reply_markup = InlineKeyboardMarkup(keyboard)
 
+    await query.answer()
     await query.edit_message_text(user_info, reply_markup=reply_markup)
 
-async def approve_user(query, context):
-    user_id = query.data.replace('approve_', '')
+def _pending(builder, user_ids=None, year=None):
+    builder = builder.eq('is_verified', False)
+    if user_ids is not None:
+        builder = builder.in_('id', list(user_ids))
+    if year is not None:
+        builder = builder.eq('year', year)
+    return builder
+
+def _after_moderation(context, members, template):
+    stats.invalidate()
+    if not members:
+        return
 
-    try:
-        supabase.table('users').update({
-            'is_verified': True
-        }).eq('id', user_id).execute()
-
-        user = supabase.table('users').select('telegram_id, first_name').eq('id', user_id).execute()
-
-        if user.data:
-            try:
-                await context.bot.send_message(
-                    chat_id=user.data[0]['telegram_id'],
-                    text=f"سلام {user.data[0]['first_name']}!\n\n"
-                         "حساب کاربری شما توسط مدیران تایید شد.\n"
-                         "اکنون می‌توانید از تمام امکانات ربات استفاده کنید.\n\n"
-                         "از دستور /start استفاده کنید."
-                )
-            except:
-                pass
+    for member in members:
+        user_cache.invalidate(member['telegram_id'])
+    tasks.spawn(
+        broadcast.fan_out(context.bot, [
+            (member['telegram_id'], template.format(first_name=member['first_name']))
+            for member in members
+        ]),
+        name=f"moderation_notices_{len(members)}"
+    )
+
+async def _approve(context, user_ids=None, year=None):
+    result = await db.execute(_pending(db.table('users').update({'is_verified': True}), user_ids, year))
+    _after_moderation(context, result.data, APPROVED_TEXT)
+    return result.data
+
+async def _reject(context, user_ids):
+    result = await db.execute(_pending(db.table('users').delete(), user_ids))
+    _after_moderation(context, result.data, REJECTED_TEXT)
+    return result.data
 
+async def approve_user(query, context, user_id):
+
+    try:
+        await _approve(context, [user_id])
+        context.user_data.setdefault('verify_selection', set()).discard(user_id)
         await query.answer("کاربر تایید شد!")
-        await verify_users_list(query, context)
+        await _refresh_pending_page(query, context)
 
     except Exception as e:
-        await query.answer(f"خطا: {str(e)}")
+        logger.error(f"Approving user {user_id} failed: {e}")
+        await query.answer(resilience.error_text(e, "خطا در تایید کاربر."))
 
-async def reject_user(query, context):
-    user_id = query.data.replace('reject_', '')
+async def reject_user(query, context, user_id):
 
     try:
-        user = supabase.table('users').select('telegram_id, first_name').eq('id', user_id).execute()
+        await _reject(context, [user_id])
+        context.user_data.setdefault('verify_selection', set()).discard(user_id)
+        await query.answer("کاربر رد شد!")
+        await _refresh_pending_page(query, context)
 
-        supabase.table('users').delete().eq('id', user_id).execute()
+    except Exception as e:
+        logger.error(f"Rejecting user {user_id} failed: {e}")
+        await query.answer(resilience.error_text(e, "خطا در رد کاربر."))
 
-        if user.data:
-            try:
-                await context.bot.send_message(
-                    chat_id=user.data[0]['telegram_id'],
-                    text=f"سلام {user.data[0]['first_name']}!\n\n"
-                         "متاسفانه درخواست عضویت شما توسط مدیران رد شد.\n"
-                         "در صورت نیاز می‌توانید مجددا ثبت‌نام کنید."
-                )
-            except:
-                pass
+async def _moderate_selection(query, context, action, done_text):
+    selection = context.user_data.setdefault('verify_selection', set())
+    if not selection:
+        await query.answer("کاربری انتخاب نشده است.")
+        return
 
-        await query.answer("کاربر رد شد!")
-        await verify_users_list(query, context)
+    try:
+        members = await action(context, selection)
+    except Exception as e:
+        logger.error(f"Moderating {len(selection)} selected user(s) failed: {e}")
+        await query.answer(resilience.error_text(e, "خطا در بررسی کاربران انتخاب‌شده."))
+        return
+
+    selection.clear()
+    await query.answer(done_text.format(count=len(members)), show_alert=True)
+    await _show_pending_page(query, context, 'admin_verify')
+
+async def approve_selected(query, context):
+    await _moderate_selection(query, context, _approve, "{count} کاربر تایید شدند.")
+
+async def reject_selected(query, context):
+    await _moderate_selection(query, context, _reject, "{count} کاربر رد شدند.")
+
+async def show_pending_years(query, context):
+    result = await db.execute(db.rpc('pending_registrations_by_year'), idempotent=True)
+
+    if not result.data:
+        await query.edit_message_text("کاربری در انتظار تایید نیست.", reply_markup=keyboards.back('admin_verify'))
+        return
+
+    keyboard = [
+        [InlineKeyboardButton(f"ورودی {row['year']} ({row['pending']} نفر)", callback_data=callbacks.BULK_YEAR.data(row['year']))]
+        for row in result.data
+    ]
+    keyboard.append([keyboards.back_button('admin_verify')])
+
+    await query.edit_message_text(
+        "تایید گروهی بر اساس سال ورودی:",
+        reply_markup=InlineKeyboardMarkup(keyboard)
+    )
+
+async def confirm_year_approval(query, context, year):
+    keyboard = [
+        [InlineKeyboardButton("✅ بله، همه تایید شوند", callback_data=callbacks.BULK_YEAR_APPROVE.data(year))],
+        [keyboards.back_button('bulk_years')]
+    ]
+    await query.edit_message_text(
+        f"همه کاربران در انتظار تایید ورودی {year} تایید شوند؟",
+        reply_markup=InlineKeyboardMarkup(keyboard)
+    )
+
+async def approve_year(query, context, year):
+    try:
+        members = await _approve(context, year=year)
+    except Exception as e:
+        logger.error(f"Approving pending users of year {year} failed: {e}")
+        await query.answer(resilience.error_text(e, "خطا در تایید گروهی."))
+        return
+
+    context.user_data.setdefault('verify_selection', set()).difference_update(member['id'] for member in members)
+    await query.answer(f"{len(members)} کاربر ورودی {year} تایید شدند.", show_alert=True)
+    await show_pending_years(query, context)
 
+async def _resolve_from_digest(query, context, user_id, action, done_text):
+    try:
+        found = await action(context, [user_id])
     except Exception as e:
-        await query.answer(f"خطا: {str(e)}")
+        logger.error(f"Moderating user {user_id} from the digest failed: {e}")
+        await query.answer(resilience.error_text(e, "خطا در بررسی درخواست."))
+        return
+
+    await query.answer(done_text if found else "این درخواست قبلا بررسی شده است.")
+    await query.edit_message_reply_markup(
+        reply_markup=notifications.without_user(query.message.reply_markup, user_id)
+    )
+
+async def approve_from_digest(query, context, user_id):
+    await _resolve_from_digest(query, context, user_id, _approve, "کاربر تایید شد!")
+
+async def reject_from_digest(query, context, user_id):
+    await _resolve_from_digest(query, context, user_id, _reject, "کاربر رد شد!")
 
 async def show_stats(query, context):
-    total_users = supabase.table('users').select('id', count='exact').execute()
-    verified_users = supabase.table('users').select('id', count='exact').eq('is_verified', True).execute()
-    total_announcements = supabase.table('announcements').select('id', count='exact').execute()
-    total_events = supabase.table('events').select('id', count='exact').execute()
-    total_questions = supabase.table('questions').select('id', count='exact').execute()
-    total_resources = supabase.table('resources').select('id', count='exact').execute()
+    counters = await stats.get_stats()
+    cache_stats = user_cache.stats()
+    processor = context.application.update_processor
 
     stats_text = f"آمار ربات:\n\n" \
-                 f"👥 کل کاربران: {total_users.count}\n" \
-                 f"✅ کاربران تایید شده: {verified_users.count}\n" \
-                 f"📢 اعلان‌ها: {total_announcements.count}\n" \
-                 f"📅 رویدادها: {total_events.count}\n" \
-                 f"❓ سوالات: {total_questions.count}\n" \
-                 f"📚 منابع: {total_resources.count}"
-
-    keyboard = [[InlineKeyboardButton("🔙 بازگشت", callback_data='admin_panel')]]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
-    await query.edit_message_text(stats_text, reply_markup=reply_markup)
+                 f"👥 کل کاربران: {counters['total_users']}\n" \
+                 f"✅ کاربران تایید شده: {counters['verified_users']}\n" \
+                 f"📢 اعلان‌ها: {counters['announcements']}\n" \
+                 f"📅 رویدادها: {counters['events']}\n" \
+                 f"❓ سوالات: {counters['questions']}\n" \
+                 f"📚 منابع: {counters['resources']}\n\n" \
+                 f"🗂 کش کاربران: {cache_stats['hits']} hit / {cache_stats['misses']} miss " \
+                 f"({cache_stats['size']}/{cache_stats['maxsize']})"
+
+    if hasattr(processor, 'stats'):
+        queue_stats = processor.stats()
+        stats_text += f"\n⚙️ صف پردازش: {queue_stats['waiting']} در انتظار، {queue_stats['active']} در حال اجرا " \
+                      f"(میانگین انتظار {queue_stats['avg_wait_ms']:.0f} ms)"
+
+    await query.edit_message_text(stats_text, reply_markup=keyboards.back('admin_panel'))
 
 async def announce_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user = update.effective_user
-    user_data = supabase.table('users').select('role').eq('telegram_id', user.id).execute()
+    user_data = await user_cache.get_user(user.id)
 
-    if not user_data.data or user_data.data[0]['role'] not in ['admin', 'superadmin']:
+    if not user_data or user_data['role'] not in ['admin', 'superadmin']:
         await update.message.reply_text("شما دسترسی ندارید.")
         return ConversationHandler.END
 
@@ -159,18 +304,9 @@ async def announce_title(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def announce_content(update: Update, context: ContextTypes.DEFAULT_TYPE):
     context.user_data['announce_content'] = update.message.text
 
-    keyboard = [
-        [InlineKeyboardButton("خبر", callback_data='cat_news'),
-         InlineKeyboardButton("رویداد", callback_data='cat_event')],
-        [InlineKeyboardButton("امتحان", callback_data='cat_exam'),
-         InlineKeyboardButton("پروژه", callback_data='cat_project')],
-        [InlineKeyboardButton("عمومی", callback_data='cat_general')]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
     await update.message.reply_text(
         "دسته‌بندی اعلان را انتخاب کنید:",
-        reply_markup=reply_markup
+        reply_markup=keyboards.ANNOUNCE_CATEGORIES.markup
     )
     return ANNOUNCE_CATEGORY
 
@@ -178,27 +314,11 @@ async def announce_category(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
 
-    category_map = {
-        'cat_news': 'news',
-        'cat_event': 'event',
-        'cat_exam': 'exam',
-        'cat_project': 'project',
-        'cat_general': 'general'
-    }
-
-    context.user_data['announce_category'] = category_map.get(query.data, 'general')
-
-    keyboard = [
-        [InlineKeyboardButton("🔴 فوری", callback_data='pri_urgent'),
-         InlineKeyboardButton("🟠 بالا", callback_data='pri_high')],
-        [InlineKeyboardButton("🟡 متوسط", callback_data='pri_medium'),
-         InlineKeyboardButton("🟢 پایین", callback_data='pri_low')]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    context.user_data['announce_category'] = keyboards.ANNOUNCE_CATEGORIES.value(query.data, 'general')
 
     await query.edit_message_text(
         "اولویت اعلان را انتخاب کنید:",
-        reply_markup=reply_markup
+        reply_markup=keyboards.ANNOUNCE_PRIORITIES.markup
     )
     return ANNOUNCE_PRIORITY
 
@@ -206,57 +326,83 @@ async def announce_priority(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
 
-    priority_map = {
-        'pri_urgent': 'urgent',
-        'pri_high': 'high',
-        'pri_medium': 'medium',
-        'pri_low': 'low'
-    }
+    context.user_data['announce_priority'] = keyboards.ANNOUNCE_PRIORITIES.value(query.data, 'medium')
 
-    priority = priority_map.get(query.data, 'medium')
+    await query.edit_message_text(
+        "زمان انتشار اعلان را انتخاب کنید.\n\n"
+        "برای زمان‌بندی، تاریخ و ساعت را به شکل زیر بفرستید:\n"
+        "2025/12/20 08:00",
+        reply_markup=keyboards.ANNOUNCE_SCHEDULE
+    )
+    return ANNOUNCE_SCHEDULE
+
+async def _save_announcement(context, telegram_id, scheduled_for=None):
+    user_data = await user_cache.get_user(telegram_id)
+    announcement = {
+        'title': context.user_data['announce_title'],
+        'content': context.user_data['announce_content'],
+        'category': context.user_data['announce_category'],
+        'priority': context.user_data['announce_priority']
+    }
+    result = await db.execute(db.table('announcements').insert({
+        **announcement,
+        'broadcast_text': scheduler.announcement_text(announcement),
+        'created_by': user_data['id'],
+        'scheduled_for': scheduled_for.isoformat() if scheduled_for else None,
+        'is_published': scheduled_for is None
+    }))
+    return result.data[0]
+
+async def announce_publish_now(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    await query.answer()
 
     user = update.effective_user
-    user_data = supabase.table('users').select('id').eq('telegram_id', user.id).execute()
 
     try:
-        result = supabase.table('announcements').insert({
-            'title': context.user_data['announce_title'],
-            'content': context.user_data['announce_content'],
-            'category': context.user_data['announce_category'],
-            'priority': priority,
-            'created_by': user_data.data[0]['id'],
-            'is_published': True
-        }).execute()
+        announcement = await _save_announcement(context, user.id)
 
         await query.edit_message_text(
             "اعلان با موفقیت منتشر شد!\n\n"
-            f"عنوان: {context.user_data['announce_title']}\n"
-            f"دسته: {context.user_data['announce_category']}\n"
-            f"اولویت: {priority}"
+            f"عنوان: {announcement['title']}\n"
+            f"دسته: {announcement['category']}\n"
+            f"اولویت: {announcement['priority']}"
         )
 
-        verified_users = supabase.table('users').select('telegram_id').eq('is_verified', True).execute()
-
-        priority_icon = {
-            'urgent': '🔴',
-            'high': '🟠',
-            'medium': '🟡',
-            'low': '🟢'
-        }.get(priority, '⚪')
-
-        for user_info in verified_users.data:
-            try:
-                await context.bot.send_message(
-                    chat_id=user_info['telegram_id'],
-                    text=f"{priority_icon} اعلان جدید\n\n"
-                         f"📌 {context.user_data['announce_title']}\n\n"
-                         f"{context.user_data['announce_content']}"
-                )
-            except:
-                pass
+        await scheduler.publish(context.application, announcement, notify_chat_id=user.id)
 
     except Exception as e:
-        await query.edit_message_text(f"خطا در انتشار اعلان: {str(e)}")
+        logger.error(f"Publishing announcement failed: {e}")
+        await query.edit_message_text(resilience.error_text(e, "خطا در انتشار اعلان. لطفا دوباره تلاش کنید."))
+
+    return ConversationHandler.END
+
+async def announce_schedule(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    try:
+        scheduled_for = scheduler.parse_time(update.message.text)
+    except ValueError:
+        await update.message.reply_text(
+            "قالب تاریخ نادرست است. دوباره وارد کنید (مثال: 2025/12/20 08:00):"
+        )
+        return ANNOUNCE_SCHEDULE
+
+    if scheduled_for <= datetime.now(timezone.utc):
+        await update.message.reply_text("زمان انتشار باید در آینده باشد. دوباره وارد کنید:")
+        return ANNOUNCE_SCHEDULE
+
+    try:
+        announcement = await _save_announcement(context, update.effective_user.id, scheduled_for)
+        scheduler.wake()
+
+        await update.message.reply_text(
+            "اعلان زمان‌بندی شد!\n\n"
+            f"عنوان: {announcement['title']}\n"
+            f"زمان انتشار: {scheduler.format_time(scheduled_for)}"
+        )
+
+    except Exception as e:
+        logger.error(f"Scheduling announcement failed: {e}")
+        await update.message.reply_text(resilience.error_text(e, "خطا در ثبت اعلان. لطفا دوباره تلاش کنید."))
 
     return ConversationHandler.END
 
@@ -266,9 +412,9 @@ async def announce_cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def create_event_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user = update.effective_user
-    user_data = supabase.table('users').select('role').eq('telegram_id', user.id).execute()
+    user_data = await user_cache.get_user(user.id)
 
-    if not user_data.data or user_data.data[0]['role'] not in ['admin', 'superadmin']:
+    if not user_data or user_data['role'] not in ['admin', 'superadmin']:
         await update.message.reply_text("شما دسترسی ندارید.")
         return ConversationHandler.END
 
@@ -299,20 +445,18 @@ async def event_capacity(update: Update, context: ContextTypes.DEFAULT_TYPE):
     context.user_data['event_capacity'] = int(update.message.text)
 
     user = update.effective_user
-    user_data = supabase.table('users').select('id').eq('telegram_id', user.id).execute()
+    user_data = await user_cache.get_user(user.id)
 
     try:
-        from datetime import datetime
-
-        result = supabase.table('events').insert({
+        await db.execute(db.table('events').insert({
             'title': context.user_data['event_title'],
             'description': context.user_data['event_desc'],
             'event_date': context.user_data['event_date'],
             'location': context.user_data['event_location'],
             'capacity': context.user_data['event_capacity'],
-            'created_by': user_data.data[0]['id'],
+            'created_by': user_data['id'],
             'is_active': True
-        }).execute()
+        }))
 
         await update.message.reply_text(
             "رویداد با موفقیت ایجاد شد!\n\n"
@@ -323,7 +467,8 @@ async def event_capacity(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
 
     except Exception as e:
-        await update.message.reply_text(f"خطا در ایجاد رویداد: {str(e)}")
+        logger.error(f"Creating event failed: {e}")
+        await update.message.reply_text(resilience.error_text(e, "خطا در ایجاد رویداد. لطفا دوباره تلاش کنید."))
 
     return ConversationHandler.END
 
@@ -0,0 +1,94 @@
+from datetime import datetime
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from services import broadcast, callbacks, db, keyboards, tasks
+
+REGISTRATION_STATUS = {
+    'registered': "ثبت‌نام شده ✅",
+    'waitlisted': "در لیست انتظار ⏳",
+    'attended': "شرکت کرده ✅"
+}
+
+async def show_event_detail(query, context, user, event_id):
+    event = await db.execute(
+        db.table('events')
+        .select('*, event_registrations(status)')
+        .eq('id', event_id)
+        .eq('event_registrations.user_id', user['id'])
+    )
+
+    if not event.data:
+        await query.edit_message_text("رویداد یافت نشد.", reply_markup=keyboards.back('events'))
+        return
+
+    event = event.data[0]
+    registration = event['event_registrations'][0]['status'] if event['event_registrations'] else None
+    event_date = datetime.fromisoformat(event['event_date'].replace('Z', '+00:00'))
+    capacity = event['capacity'] if event['capacity'] is not None else '∞'
+
+    event_text = f"📅 {event['title']}\n\n"
+    if event['description']:
+        event_text += f"{event['description']}\n\n"
+    event_text += f"تاریخ: {event_date.strftime('%Y/%m/%d %H:%M')}\n" \
+                  f"محل: {event['location'] or '-'}\n" \
+                  f"ظرفیت: {event['registered_count']}/{capacity}"
+
+    keyboard = []
+    if registration in REGISTRATION_STATUS:
+        event_text += f"\n\nوضعیت شما: {REGISTRATION_STATUS[registration]}"
+        if registration != 'attended':
+            keyboard.append([InlineKeyboardButton("❌ لغو ثبت‌نام", callback_data=callbacks.EVENT_CANCEL.data(event_id))])
+    elif event['is_active']:
+        keyboard.append([InlineKeyboardButton("✅ ثبت‌نام", callback_data=callbacks.EVENT_REGISTER.data(event_id))])
+
+    keyboard.append([keyboards.back_button('events')])
+    reply_markup = InlineKeyboardMarkup(keyboard)
+
+    await query.edit_message_text(event_text, reply_markup=reply_markup)
+
+async def register_event(query, context, user, event_id):
+    result = await db.execute(db.rpc('register_for_event', {
+        'target_event': event_id,
+        'member_id': user['id']
+    }))
+    outcome = result.data
+
+    if outcome['status'] == 'registered':
+        await query.answer("ثبت‌نام شما انجام شد!", show_alert=True)
+    elif outcome['status'] == 'waitlisted':
+        await query.answer(
+            f"ظرفیت تکمیل است. شما نفر {outcome['position']} لیست انتظار هستید.",
+            show_alert=True
+        )
+    elif outcome['status'] == 'not_found':
+        await query.answer("این رویداد دیگر فعال نیست.")
+    else:
+        await query.answer("شما قبلا در این رویداد ثبت‌نام کرده‌اید.")
+
+    await show_event_detail(query, context, user, event_id)
+
+async def cancel_event(query, context, user, event_id):
+    result = await db.execute(db.rpc('cancel_event_registration', {
+        'target_event': event_id,
+        'member_id': user['id']
+    }))
+    outcome = result.data
+
+    if outcome['status'] != 'cancelled':
+        await query.answer("ثبت‌نامی برای لغو وجود ندارد.")
+        return
+
+    await query.answer("ثبت‌نام شما لغو شد.")
+
+    if outcome.get('promoted_telegram_id'):
+        tasks.spawn(
+            broadcast.send_with_retry(
+                context.bot,
+                outcome['promoted_telegram_id'],
+                "یک جای خالی آزاد شد و ثبت‌نام شما در رویداد قطعی شد ✅\n"
+                "برای جزئیات از بخش رویدادها استفاده کنید."
+            ),
+            name=f"event_promotion_{event_id}"
+        )
+
+    await show_event_detail(query, context, user, event_id)
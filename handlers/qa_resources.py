@@ -1,38 +1,39 @@
-import os
+import logging
 from datetime import datetime
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, ConversationHandler, MessageHandler, filters
-from supabase import create_client
-from dotenv import load_dotenv
 
-load_dotenv()
+from services import callbacks, config, counters, db, files, keyboards, pagination, resilience, search_index, storage, user_cache
+from services.cache import MISSING, TTLCache
+from handlers.states import ASK_TITLE, ASK_CONTENT, ASK_CATEGORY, UPLOAD_TITLE, UPLOAD_DESC, UPLOAD_CATEGORY, UPLOAD_FILE
 
-supabase = create_client(
-    os.getenv('VITE_SUPABASE_URL'),
-    os.getenv('VITE_SUPABASE_ANON_KEY')
-)
+logger = logging.getLogger(__name__)
 
-ASK_TITLE, ASK_CONTENT, ASK_CATEGORY = range(3)
-UPLOAD_TITLE, UPLOAD_DESC, UPLOAD_CATEGORY, UPLOAD_FILE = range(4)
+_question_cache = TTLCache(config.QUESTION_CACHE_SIZE, config.QUESTION_CACHE_TTL)
 
 async def show_recent_questions(query, context):
-    questions = supabase.table('questions').select('*, users(first_name, last_name)').order('created_at', desc=True).limit(10).execute()
+    _, direction, cursor = pagination.split(query.data)
+    page = await pagination.fetch_page(
+        db.table('questions').select('id, title, is_answered, created_at'),
+        'created_at', direction=direction, cursor=cursor
+    )
 
-    if not questions.data:
-        keyboard = [[InlineKeyboardButton("🔙 بازگشت", callback_data='qa')]]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        await query.edit_message_text("سوالی موجود نیست.", reply_markup=reply_markup)
+    if not page.rows:
+        await query.edit_message_text("سوالی موجود نیست.", reply_markup=keyboards.back('qa'))
         return
 
     keyboard = []
-    for q in questions.data:
+    for q in page.rows:
         status = "✅" if q['is_answered'] else "⏳"
         keyboard.append([InlineKeyboardButton(
             f"{status} {q['title'][:40]}...",
-            callback_data=f"q_{q['id']}"
+            callback_data=callbacks.QUESTION.data(q['id'])
         )])
 
-    keyboard.append([InlineKeyboardButton("🔙 بازگشت", callback_data='qa')])
+    nav = pagination.nav_row(page, 'qa_recent')
+    if nav:
+        keyboard.append(nav)
+    keyboard.append([keyboards.back_button('qa')])
     reply_markup = InlineKeyboardMarkup(keyboard)
 
     await query.edit_message_text(
@@ -40,50 +41,69 @@ async def show_recent_questions(query, context):
         reply_markup=reply_markup
     )
 
-async def show_question_detail(query, context):
-    question_id = query.data.replace('q_', '')
-    question = supabase.table('questions').select('*, users(first_name, last_name)').eq('id', question_id).execute()
-
-    if not question.data:
-        await query.answer("سوال یافت نشد!")
-        return
-
-    q = question.data[0]
-
-    supabase.table('questions').update({
-        'views_count': q['views_count'] + 1
-    }).eq('id', question_id).execute()
+def _render_question(q):
+    head = f"❓ {q['title']}\n\n" \
+           f"{q['content']}\n\n" \
+           f"دسته: {q['category']}\n" \
+           f"توسط: {q['users']['first_name']} {q['users']['last_name']}\n" \
+           f"تاریخ: {datetime.fromisoformat(q['created_at'].replace('Z', '+00:00')).strftime('%Y/%m/%d')}\n"
 
-    answers = supabase.table('answers').select('*, users(first_name, last_name)').eq('question_id', question_id).order('created_at').execute()
-
-    question_text = f"❓ {q['title']}\n\n" \
-                    f"{q['content']}\n\n" \
-                    f"دسته: {q['category']}\n" \
-                    f"توسط: {q['users']['first_name']} {q['users']['last_name']}\n" \
-                    f"تاریخ: {datetime.fromisoformat(q['created_at'].replace('Z', '+00:00')).strftime('%Y/%m/%d')}\n" \
-                    f"بازدید: {q['views_count'] + 1}\n\n"
-
-    if answers.data:
-        question_text += f"پاسخ‌ها ({len(answers.data)}):\n\n"
-        for ans in answers.data:
+    if q['answers']:
+        tail = f"پاسخ‌ها ({len(q['answers'])}):\n\n"
+        for ans in q['answers']:
             accepted = "✅ " if ans['is_accepted'] else ""
-            question_text += f"{accepted}💬 {ans['users']['first_name']}: {ans['content'][:100]}...\n\n"
+            tail += f"{accepted}💬 {ans['users']['first_name']}: {ans['content'][:100]}...\n\n"
     else:
-        question_text += "هنوز پاسخی ثبت نشده است."
+        tail = "هنوز پاسخی ثبت نشده است."
+
+    return {
+        'head': head,
+        'tail': tail,
+        'views': q['views_count'] + counters.pending(counters.QUESTION_VIEWS, q['id'])
+    }
+
+async def show_question_detail(query, context, question_id):
+    rendered = _question_cache.get(question_id)
+
+    if rendered is MISSING:
+        try:
+            question = await db.execute(
+                db.table('questions')
+                .select('*, users(first_name, last_name), answers(content, is_accepted, created_at, users(first_name))')
+                .eq('id', question_id)
+                .order('created_at', foreign_table='answers')
+            )
+        except db.Unavailable:
+            rendered = _question_cache.stale(question_id)
+            if rendered is MISSING:
+                raise
+        else:
+            if not question.data:
+                await query.answer("سوال یافت نشد!")
+                return
+
+            rendered = _render_question(question.data[0])
+            _question_cache.set(question_id, rendered)
+
+    counters.increment(counters.QUESTION_VIEWS, question_id)
+    rendered['views'] += 1
+
+    question_text = f"{rendered['head']}بازدید: {rendered['views']}\n\n{rendered['tail']}"
 
     keyboard = [
-        [InlineKeyboardButton("پاسخ دادن", callback_data=f"answer_{question_id}")],
-        [InlineKeyboardButton("🔙 بازگشت", callback_data='qa_recent')]
+        [InlineKeyboardButton("پاسخ دادن", callback_data=callbacks.ANSWER.data(question_id))],
+        [keyboards.back_button('qa_recent')]
     ]
     reply_markup = InlineKeyboardMarkup(keyboard)
 
+    await query.answer()
     await query.edit_message_text(question_text, reply_markup=reply_markup)
 
 async def ask_question_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user = update.effective_user
-    user_data = supabase.table('users').select('is_verified').eq('telegram_id', user.id).execute()
+    user_data = await user_cache.get_user(user.id)
 
-    if not user_data.data or not user_data.data[0]['is_verified']:
+    if not user_data or not user_data['is_verified']:
         await update.message.reply_text("شما دسترسی ندارید.")
         return ConversationHandler.END
 
@@ -98,17 +118,9 @@ async def ask_title(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def ask_content(update: Update, context: ContextTypes.DEFAULT_TYPE):
     context.user_data['ask_content'] = update.message.text
 
-    keyboard = [
-        [InlineKeyboardButton("تمرین", callback_data='qcat_homework'),
-         InlineKeyboardButton("مفهومی", callback_data='qcat_concept')],
-        [InlineKeyboardButton("امتحان", callback_data='qcat_exam'),
-         InlineKeyboardButton("پروژه", callback_data='qcat_project')]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
     await update.message.reply_text(
         "دسته‌بندی سوال را انتخاب کنید:",
-        reply_markup=reply_markup
+        reply_markup=keyboards.QUESTION_CATEGORIES.markup
     )
     return ASK_CATEGORY
 
@@ -116,26 +128,20 @@ async def ask_category(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
 
-    category_map = {
-        'qcat_homework': 'homework',
-        'qcat_concept': 'concept',
-        'qcat_exam': 'exam',
-        'qcat_project': 'project'
-    }
-
-    category = category_map.get(query.data, 'concept')
+    category = keyboards.QUESTION_CATEGORIES.value(query.data, 'concept')
 
     user = update.effective_user
-    user_data = supabase.table('users').select('id').eq('telegram_id', user.id).execute()
+    user_data = await user_cache.get_user(user.id)
 
     try:
-        result = supabase.table('questions').insert({
-            'user_id': user_data.data[0]['id'],
+        result = await db.execute(db.table('questions').insert({
+            'user_id': user_data['id'],
             'title': context.user_data['ask_title'],
             'content': context.user_data['ask_content'],
             'category': category,
             'is_answered': False
-        }).execute()
+        }))
+        search_index.add_question(result.data[0])
 
         await query.edit_message_text(
             "سوال شما با موفقیت ثبت شد!\n\n"
@@ -145,7 +151,8 @@ async def ask_category(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
 
     except Exception as e:
-        await query.edit_message_text(f"خطا در ثبت سوال: {str(e)}")
+        logger.error(f"Saving question failed: {e}")
+        await query.edit_message_text(resilience.error_text(e, "خطا در ثبت سوال. لطفا دوباره تلاش کنید."))
 
     return ConversationHandler.END
 
@@ -153,42 +160,40 @@ async def ask_cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text("ثبت سوال لغو شد.")
     return ConversationHandler.END
 
-async def show_resources_by_category(query, context):
-    category = query.data.replace('res_', '')
+async def show_resources_by_category(query, context, category):
+    base, direction, cursor = pagination.split(query.data)
 
-    resources = supabase.table('resources').select('*, users(first_name, last_name)').eq('category', category).order('created_at', desc=True).limit(10).execute()
+    page = await pagination.fetch_page(
+        db.table('resources').select('id, title, created_at').eq('category', category),
+        'created_at', direction=direction, cursor=cursor
+    )
 
-    if not resources.data:
-        keyboard = [[InlineKeyboardButton("🔙 بازگشت", callback_data='resources')]]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        await query.edit_message_text("منبعی در این دسته موجود نیست.", reply_markup=reply_markup)
+    if not page.rows:
+        await query.edit_message_text("منبعی در این دسته موجود نیست.", reply_markup=keyboards.back('resources'))
         return
 
     keyboard = []
-    for res in resources.data:
+    for res in page.rows:
         keyboard.append([InlineKeyboardButton(
             f"📄 {res['title'][:40]}...",
-            callback_data=f"resource_{res['id']}"
+            callback_data=callbacks.RESOURCE.data(res['id'])
         )])
 
-    keyboard.append([InlineKeyboardButton("🔙 بازگشت", callback_data='resources')])
+    nav = pagination.nav_row(page, base)
+    if nav:
+        keyboard.append(nav)
+    keyboard.append([keyboards.back_button('resources')])
     reply_markup = InlineKeyboardMarkup(keyboard)
 
-    category_name = {
-        'book': 'کتاب‌ها',
-        'paper': 'مقالات',
-        'video': 'ویدیوها',
-        'tool': 'ابزارها'
-    }.get(category, 'منابع')
+    category_name = keyboards.RESOURCE_CATEGORY_NAMES.get(category, 'منابع')
 
     await query.edit_message_text(
         f"{category_name}:",
         reply_markup=reply_markup
     )
 
-async def show_resource_detail(query, context):
-    resource_id = query.data.replace('resource_', '')
-    resource = supabase.table('resources').select('*, users(first_name, last_name)').eq('id', resource_id).execute()
+async def show_resource_detail(query, context, resource_id):
+    resource = await db.execute(db.table('resources').select('*, users(first_name, last_name)').eq('id', resource_id))
 
     if not resource.data:
         await query.answer("منبع یافت نشد!")
@@ -196,9 +201,8 @@ async def show_resource_detail(query, context):
 
     res = resource.data[0]
 
-    supabase.table('resources').update({
-        'downloads_count': res['downloads_count'] + 1
-    }).eq('id', resource_id).execute()
+    if not res['file_id']:
+        counters.increment(counters.RESOURCE_DOWNLOADS, resource_id)
 
     resource_text = f"📚 {res['title']}\n\n" \
                     f"{res['description']}\n\n" \
@@ -206,25 +210,53 @@ async def show_resource_detail(query, context):
                     f"نوع فایل: {res['file_type']}\n" \
                     f"آپلود توسط: {res['users']['first_name']} {res['users']['last_name']}\n" \
                     f"تاریخ: {datetime.fromisoformat(res['created_at'].replace('Z', '+00:00')).strftime('%Y/%m/%d')}\n" \
-                    f"دانلودها: {res['downloads_count'] + 1}"
+                    f"دانلودها: {res['downloads_count'] + counters.pending(counters.RESOURCE_DOWNLOADS, resource_id)}"
+
+    if res['file_size']:
+        resource_text += f"\nحجم: {res['file_size'] / (1024 * 1024):.1f} مگابایت"
 
     if res['tags']:
         resource_text += f"\n\nبرچسب‌ها: {', '.join(res['tags'])}"
 
     keyboard = []
-    if res['file_url']:
+    if res['file_id']:
+        keyboard.append([InlineKeyboardButton("دریافت فایل", callback_data=callbacks.RESOURCE_FILE.data(resource_id))])
+
+    download_url = None
+    if res['storage_path']:
+        try:
+            download_url = await storage.signed_url(res['storage_path'])
+        except Exception as e:
+            logger.warning(f"Could not sign storage URL for resource {resource_id}: {e}")
+
+    if download_url:
+        keyboard.append([InlineKeyboardButton("دانلود مستقیم", url=download_url)])
+    elif res['file_url'] and not res['file_id']:
         keyboard.append([InlineKeyboardButton("دانلود فایل", url=res['file_url'])])
 
-    keyboard.append([InlineKeyboardButton("🔙 بازگشت", callback_data=f"res_{res['category']}")])
+    keyboard.append([keyboards.back_button(callbacks.RESOURCE_CATEGORY.data(res['category']))])
     reply_markup = InlineKeyboardMarkup(keyboard)
 
+    await query.answer()
     await query.edit_message_text(resource_text, reply_markup=reply_markup)
 
+async def send_resource_file(query, context, resource_id):
+    resource = await db.execute(db.table('resources').select('title, media_type, file_id').eq('id', resource_id))
+
+    if not resource.data or not resource.data[0]['file_id']:
+        await query.answer("فایل یافت نشد!")
+        return
+
+    res = resource.data[0]
+    await query.answer()
+    await files.send(context.bot, query.message.chat_id, res['media_type'], res['file_id'], caption=f"📚 {res['title']}")
+    counters.increment(counters.RESOURCE_DOWNLOADS, resource_id)
+
 async def upload_resource_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user = update.effective_user
-    user_data = supabase.table('users').select('is_verified').eq('telegram_id', user.id).execute()
+    user_data = await user_cache.get_user(user.id)
 
-    if not user_data.data or not user_data.data[0]['is_verified']:
+    if not user_data or not user_data['is_verified']:
         await update.message.reply_text("شما دسترسی ندارید.")
         return ConversationHandler.END
 
@@ -239,17 +271,9 @@ async def upload_title(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def upload_desc(update: Update, context: ContextTypes.DEFAULT_TYPE):
     context.user_data['upload_desc'] = update.message.text
 
-    keyboard = [
-        [InlineKeyboardButton("کتاب", callback_data='ucat_book'),
-         InlineKeyboardButton("مقاله", callback_data='ucat_paper')],
-        [InlineKeyboardButton("ویدیو", callback_data='ucat_video'),
-         InlineKeyboardButton("ابزار", callback_data='ucat_tool')]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
     await update.message.reply_text(
         "دسته‌بندی منبع را انتخاب کنید:",
-        reply_markup=reply_markup
+        reply_markup=keyboards.UPLOAD_CATEGORIES.markup
     )
     return UPLOAD_CATEGORY
 
@@ -257,33 +281,54 @@ async def upload_category(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
 
-    category_map = {
-        'ucat_book': 'book',
-        'ucat_paper': 'paper',
-        'ucat_video': 'video',
-        'ucat_tool': 'tool'
-    }
+    context.user_data['upload_category'] = keyboards.UPLOAD_CATEGORIES.value(query.data, 'book')
 
-    context.user_data['upload_category'] = category_map.get(query.data, 'book')
-
-    await query.edit_message_text("لینک فایل را وارد کنید:")
+    await query.edit_message_text("فایل منبع را ارسال کنید (سند، ویدیو یا عکس):")
     return UPLOAD_FILE
 
+async def _find_duplicate(attachment):
+    conditions = [f"file_unique_id.eq.{attachment['file_unique_id']}"]
+    if attachment['content_hash']:
+        conditions.append(f"content_hash.eq.{attachment['content_hash']}")
+
+    query = db.table('resources').select('id, title')
+    query.params = query.params.add('or', f"({','.join(conditions)})")
+    result = await db.execute(query.limit(1))
+    return result.data[0] if result.data else None
+
 async def upload_file(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    file_url = update.message.text
+    attachment = files.attachment(update.message)
+
+    if attachment is None:
+        await update.message.reply_text("لطفا خود فایل را به صورت سند، ویدیو یا عکس ارسال کنید.")
+        return UPLOAD_FILE
 
     user = update.effective_user
-    user_data = supabase.table('users').select('id').eq('telegram_id', user.id).execute()
+    user_data = await user_cache.get_user(user.id)
 
     try:
-        result = supabase.table('resources').insert({
+        attachment['content_hash'] = await files.content_hash(context.bot, attachment['file_id'], attachment['file_size'])
+
+        duplicate = await _find_duplicate(attachment)
+        if duplicate:
+            await update.message.reply_text(
+                f"این فایل قبلا با عنوان «{duplicate['title']}» ثبت شده است.",
+                reply_markup=InlineKeyboardMarkup([[
+                    InlineKeyboardButton("مشاهده منبع", callback_data=callbacks.RESOURCE.data(duplicate['id']))
+                ]])
+            )
+            return ConversationHandler.END
+
+        result = await db.execute(db.table('resources').insert({
             'title': context.user_data['upload_title'],
             'description': context.user_data['upload_desc'],
             'category': context.user_data['upload_category'],
-            'file_url': file_url,
-            'file_type': file_url.split('.')[-1] if '.' in file_url else 'unknown',
-            'uploaded_by': user_data.data[0]['id']
-        }).execute()
+            'uploaded_by': user_data['id'],
+            'storage_status': storage.initial_status(attachment),
+            **attachment
+        }))
+        storage.enqueue(result.data[0])
+        search_index.add_resource(result.data[0])
 
         await update.message.reply_text(
             "منبع با موفقیت آپلود شد!\n\n"
@@ -293,7 +338,8 @@ async def upload_file(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
 
     except Exception as e:
-        await update.message.reply_text(f"خطا در آپلود منبع: {str(e)}")
+        logger.error(f"Saving resource failed: {e}")
+        await update.message.reply_text(resilience.error_text(e, "خطا در آپلود منبع. لطفا دوباره تلاش کنید."))
 
     return ConversationHandler.END
 
@@ -0,0 +1,124 @@
+from telegram import (
+    Update,
+    InlineKeyboardButton,
+    InlineKeyboardMarkup,
+    InlineQueryResultArticle,
+    InputTextMessageContent
+)
+from telegram.ext import ContextTypes
+
+from services import callbacks, config, db, files, search_index, user_cache
+
+INLINE_PAGE_SIZE = 20
+
+async def _search(text, limit, offset=0):
+    result = await db.execute(db.rpc('search_content', {
+        'search_query': text,
+        'result_limit': limit,
+        'result_offset': offset
+    }), idempotent=True)
+    return result.data
+
+def _result_button(row):
+    if row['kind'] == 'question':
+        return InlineKeyboardButton(f"❓ {row['title'][:40]}", callback_data=callbacks.QUESTION.data(row['id']))
+    return InlineKeyboardButton(f"📄 {row['title'][:40]}", callback_data=callbacks.RESOURCE.data(row['id']))
+
+async def _render_results(text, offset):
+    rows = await _search(text, config.PAGE_SIZE + 1, offset)
+    has_next = len(rows) > config.PAGE_SIZE
+    rows = rows[:config.PAGE_SIZE]
+
+    if not rows:
+        return f"نتیجه‌ای برای «{text}» یافت نشد.", None
+
+    keyboard = [[_result_button(row)] for row in rows]
+
+    nav = []
+    if offset > 0:
+        nav.append(InlineKeyboardButton("◀️ قبلی", callback_data=callbacks.SEARCH_PAGE.data(max(offset - config.PAGE_SIZE, 0))))
+    if has_next:
+        nav.append(InlineKeyboardButton("بعدی ▶️", callback_data=callbacks.SEARCH_PAGE.data(offset + config.PAGE_SIZE)))
+    if nav:
+        keyboard.append(nav)
+
+    return f"نتایج جستجو برای «{text}»:", InlineKeyboardMarkup(keyboard)
+
+async def search_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    user_data = await user_cache.get_user(update.effective_user.id)
+
+    if not user_data or not user_data['is_verified']:
+        await update.message.reply_text("شما دسترسی ندارید.")
+        return
+
+    text = ' '.join(context.args).strip()
+    if not text:
+        await update.message.reply_text(
+            "عبارت مورد نظر را بعد از دستور وارد کنید.\n"
+            "مثال: /search انتقال حرارت"
+        )
+        return
+
+    context.user_data['search_query'] = text
+    message_text, reply_markup = await _render_results(text, 0)
+    await update.message.reply_text(message_text, reply_markup=reply_markup)
+
+async def show_search_page(query, context, offset):
+    text = context.user_data.get('search_query')
+    if not text:
+        await query.edit_message_text("جستجو منقضی شده است. دوباره از /search استفاده کنید.")
+        return
+
+    message_text, reply_markup = await _render_results(text, offset)
+    await query.edit_message_text(message_text, reply_markup=reply_markup)
+
+def _inline_result(row):
+    description = (row['description'] or row['category'] or '')[:100]
+
+    if row['kind'] == 'question':
+        message = f"❓ {row['title']}\n\n{row['description'] or ''}"
+        title = f"❓ {row['title']}"
+    else:
+        if row.get('file_id'):
+            return files.inline_result(
+                f"r{row['id']}", row['media_type'], row['file_id'], f"📄 {row['title']}",
+                description=description, caption=f"📚 {row['title']}"
+            )
+        message = f"📚 {row['title']}\n\n{row['description'] or ''}"
+        if row['file_url']:
+            message += f"\n\n{row['file_url']}"
+        title = f"📄 {row['title']}"
+
+    return InlineQueryResultArticle(
+        id=f"{row['kind'][0]}{row['id']}",
+        title=title,
+        description=description,
+        input_message_content=InputTextMessageContent(message[:4096])
+    )
+
+async def inline_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    inline_query = update.inline_query
+    user_data = await user_cache.get_user(inline_query.from_user.id)
+
+    if not user_data or not user_data['is_verified']:
+        await inline_query.answer([], cache_time=0, is_personal=True)
+        return
+
+    text = inline_query.query.strip()
+    if not text:
+        await inline_query.answer([], cache_time=config.INLINE_CACHE_TIME, is_personal=True)
+        return
+
+    offset = int(inline_query.offset or 0)
+    if search_index.ready():
+        rows = search_index.search(text, INLINE_PAGE_SIZE + 1, offset)
+    else:
+        rows = await _search(text, INLINE_PAGE_SIZE + 1, offset)
+    next_offset = str(offset + INLINE_PAGE_SIZE) if len(rows) > INLINE_PAGE_SIZE else ''
+
+    await inline_query.answer(
+        [_inline_result(row) for row in rows[:INLINE_PAGE_SIZE]],
+        cache_time=config.INLINE_CACHE_TIME,
+        is_personal=True,
+        next_offset=next_offset
+    )
@@ -0,0 +1,5 @@
+ANNOUNCE_TITLE, ANNOUNCE_CONTENT, ANNOUNCE_CATEGORY, ANNOUNCE_PRIORITY, ANNOUNCE_SCHEDULE = range(5)
+EVENT_TITLE, EVENT_DESC, EVENT_DATE, EVENT_LOCATION, EVENT_CAPACITY = range(5)
+
+ASK_TITLE, ASK_CONTENT, ASK_CATEGORY = range(3)
+UPLOAD_TITLE, UPLOAD_DESC, UPLOAD_CATEGORY, UPLOAD_FILE = range(4)
@@ -1,18 +1,22 @@
-import os
+from services import startup
+
 import logging
 from telegram import Update
 from telegram.ext import (
     Application,
     CommandHandler,
     CallbackQueryHandler,
+    InlineQueryHandler,
     MessageHandler,
     ContextTypes,
     filters,
     ConversationHandler
 )
-from dotenv import load_dotenv
 
-from bot import (
+from services import broadcast, callbacks, config, counters, db, keyboards, notifications, resilience, runner, scheduler, search_index, storage, tasks, user_cache
+from services.router import ADMIN
+
+from Bot import (
     start,
     register_start,
     register_name,
@@ -20,59 +24,25 @@ from bot import (
     register_major,
     register_year,
     register_cancel,
-    button_handler,
+    router,
     REGISTER_NAME,
     REGISTER_STUDENT_ID,
     REGISTER_MAJOR,
     REGISTER_YEAR
 )
 
-from handlers.admin import (
-    verify_users_list,
-    verify_user_detail,
-    approve_user,
-    reject_user,
-    show_stats,
-    announce_start,
-    announce_title,
-    announce_content,
-    announce_category,
-    announce_priority,
-    announce_cancel,
-    create_event_start,
-    event_title,
-    event_desc,
-    event_date,
-    event_location,
-    event_capacity,
-    event_cancel,
+from handlers import lazy
+from handlers.states import (
     ANNOUNCE_TITLE,
     ANNOUNCE_CONTENT,
     ANNOUNCE_CATEGORY,
     ANNOUNCE_PRIORITY,
+    ANNOUNCE_SCHEDULE,
     EVENT_TITLE,
     EVENT_DESC,
     EVENT_DATE,
     EVENT_LOCATION,
-    EVENT_CAPACITY
-)
-
-from handlers.qa_resources import (
-    show_recent_questions,
-    show_question_detail,
-    ask_question_start,
-    ask_title,
-    ask_content,
-    ask_category,
-    ask_cancel,
-    show_resources_by_category,
-    show_resource_detail,
-    upload_resource_start,
-    upload_title,
-    upload_desc,
-    upload_category,
-    upload_file,
-    upload_cancel,
+    EVENT_CAPACITY,
     ASK_TITLE,
     ASK_CONTENT,
     ASK_CATEGORY,
@@ -82,49 +52,77 @@ from handlers.qa_resources import (
     UPLOAD_FILE
 )
 
-load_dotenv()
-
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     level=logging.INFO
 )
 logger = logging.getLogger(__name__)
 
+startup.mark('imports')
+
+async def post_init(application: Application):
+    startup.mark('initialize')
+    await startup.wait('connect', db.connect())
+    await startup.warm(
+        user_cache=user_cache.warm,
+        keyboards=keyboards.warm,
+        broadcasts=lambda: broadcast.resume_pending(application)
+    )
+    counters.start()
+    notifications.start(application)
+    scheduler.start(application)
+    storage.start(application)
+    search_index.start(application)
+    startup.report()
+
+async def post_stop(application: Application):
+    await tasks.cancel_all()
+    await counters.flush()
+    await notifications.flush()
+    await storage.close()
+
+def register_routes():
+    router.add('admin_verify', lazy('admin:verify_users_list'), auth=ADMIN)
+    router.add(callbacks.VERIFY_USER, lazy('admin:verify_user_detail'), auth=ADMIN, answer=False)
+    router.add(callbacks.APPROVE_USER, lazy('admin:approve_user'), auth=ADMIN, answer=False)
+    router.add(callbacks.REJECT_USER, lazy('admin:reject_user'), auth=ADMIN, answer=False)
+    router.add(callbacks.DIGEST_APPROVE, lazy('admin:approve_from_digest'), auth=ADMIN, answer=False)
+    router.add(callbacks.DIGEST_REJECT, lazy('admin:reject_from_digest'), auth=ADMIN, answer=False)
+    router.add(callbacks.VERIFY_TOGGLE, lazy('admin:toggle_pending_user'), auth=ADMIN)
+    router.add('bulk_page', lazy('admin:select_pending_page'), auth=ADMIN)
+    router.add('bulk_clear', lazy('admin:clear_pending_selection'), auth=ADMIN)
+    router.add('bulk_approve', lazy('admin:approve_selected'), auth=ADMIN, answer=False)
+    router.add('bulk_reject', lazy('admin:reject_selected'), auth=ADMIN, answer=False)
+    router.add('bulk_years', lazy('admin:show_pending_years'), auth=ADMIN)
+    router.add(callbacks.BULK_YEAR, lazy('admin:confirm_year_approval'), auth=ADMIN)
+    router.add(callbacks.BULK_YEAR_APPROVE, lazy('admin:approve_year'), auth=ADMIN, answer=False)
+    router.add('admin_stats', lazy('admin:show_stats'), auth=ADMIN)
+    router.add('qa_recent', lazy('qa_resources:show_recent_questions'))
+    router.add(callbacks.QUESTION, lazy('qa_resources:show_question_detail'), answer=False)
+    router.add(callbacks.RESOURCE_CATEGORY, lazy('qa_resources:show_resources_by_category'))
+    router.add(callbacks.RESOURCE, lazy('qa_resources:show_resource_detail'), answer=False)
+    router.add(callbacks.RESOURCE_FILE, lazy('qa_resources:send_resource_file'), answer=False)
+    router.add(callbacks.SEARCH_PAGE, lazy('search:show_search_page'))
+    router.add(callbacks.EVENT, lazy('events:show_event_detail'), with_user=True)
+    router.add(callbacks.EVENT_REGISTER, lazy('events:register_event'), with_user=True, answer=False)
+    router.add(callbacks.EVENT_CANCEL, lazy('events:cancel_event'), with_user=True, answer=False)
+
 async def extended_button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    query = update.callback_query
-
-    if query.data == 'admin_verify':
-        await verify_users_list(query, context)
-    elif query.data.startswith('verify_'):
-        await verify_user_detail(query, context)
-    elif query.data.startswith('approve_'):
-        await approve_user(query, context)
-    elif query.data.startswith('reject_'):
-        await reject_user(query, context)
-    elif query.data == 'admin_stats':
-        await show_stats(query, context)
-    elif query.data == 'qa_recent':
-        await show_recent_questions(query, context)
-    elif query.data.startswith('q_'):
-        await show_question_detail(query, context)
-    elif query.data.startswith('res_'):
-        await show_resources_by_category(query, context)
-    elif query.data.startswith('resource_'):
-        await show_resource_detail(query, context)
-    else:
-        await button_handler(update, context)
+    await router.dispatch(update, context)
 
-def main():
-    token = os.getenv('TELEGRAM_BOT_TOKEN')
-    if not token:
-        logger.error("TELEGRAM_BOT_TOKEN not found in environment variables")
-        print("خطا: TELEGRAM_BOT_TOKEN در فایل .env موجود نیست")
-        print("لطفا توکن ربات تلگرام خود را در فایل .env با کلید TELEGRAM_BOT_TOKEN اضافه کنید")
-        return
+def build_application(token):
+    application = runner.configure(
+        Application.builder()
+        .token(token)
+        .post_init(post_init)
+        .post_stop(post_stop)
+    ).build()
 
-    application = Application.builder().token(token).build()
+    register_routes()
 
     application.add_handler(CommandHandler("start", start))
+    application.add_handler(CommandHandler("search", lazy('search:search_command')))
+    application.add_handler(InlineQueryHandler(lazy('search:inline_search')))
 
     register_handler = ConversationHandler(
         entry_points=[CommandHandler('register', register_start)],
@@ -134,51 +132,65 @@ def main():
             REGISTER_MAJOR: [MessageHandler(filters.TEXT & ~filters.COMMAND, register_major)],
             REGISTER_YEAR: [MessageHandler(filters.TEXT & ~filters.COMMAND, register_year)],
         },
-        fallbacks=[CommandHandler('cancel', register_cancel)]
+        fallbacks=[CommandHandler('cancel', register_cancel)],
+        name='register',
+        persistent=runner.PERSISTENT
     )
 
     announce_handler = ConversationHandler(
-        entry_points=[CommandHandler('announce', announce_start)],
+        entry_points=[CommandHandler('announce', lazy('admin:announce_start'))],
         states={
-            ANNOUNCE_TITLE: [MessageHandler(filters.TEXT & ~filters.COMMAND, announce_title)],
-            ANNOUNCE_CONTENT: [MessageHandler(filters.TEXT & ~filters.COMMAND, announce_content)],
-            ANNOUNCE_CATEGORY: [CallbackQueryHandler(announce_category, pattern='^cat_')],
-            ANNOUNCE_PRIORITY: [CallbackQueryHandler(announce_priority, pattern='^pri_')],
+            ANNOUNCE_TITLE: [MessageHandler(filters.TEXT & ~filters.COMMAND, lazy('admin:announce_title'))],
+            ANNOUNCE_CONTENT: [MessageHandler(filters.TEXT & ~filters.COMMAND, lazy('admin:announce_content'))],
+            ANNOUNCE_CATEGORY: [CallbackQueryHandler(lazy('admin:announce_category'), pattern='^cat_')],
+            ANNOUNCE_PRIORITY: [CallbackQueryHandler(lazy('admin:announce_priority'), pattern='^pri_')],
+            ANNOUNCE_SCHEDULE: [
+                CallbackQueryHandler(lazy('admin:announce_publish_now'), pattern='^sched_now$'),
+                MessageHandler(filters.TEXT & ~filters.COMMAND, lazy('admin:announce_schedule'))
+            ],
         },
-        fallbacks=[CommandHandler('cancel', announce_cancel)]
+        fallbacks=[CommandHandler('cancel', lazy('admin:announce_cancel'))],
+        name='announce',
+        persistent=runner.PERSISTENT
     )
 
     event_handler = ConversationHandler(
-        entry_points=[CommandHandler('createevent', create_event_start)],
+        entry_points=[CommandHandler('createevent', lazy('admin:create_event_start'))],
         states={
-            EVENT_TITLE: [MessageHandler(filters.TEXT & ~filters.COMMAND, event_title)],
-            EVENT_DESC: [MessageHandler(filters.TEXT & ~filters.COMMAND, event_desc)],
-            EVENT_DATE: [MessageHandler(filters.TEXT & ~filters.COMMAND, event_date)],
-            EVENT_LOCATION: [MessageHandler(filters.TEXT & ~filters.COMMAND, event_location)],
-            EVENT_CAPACITY: [MessageHandler(filters.TEXT & ~filters.COMMAND, event_capacity)],
+            EVENT_TITLE: [MessageHandler(filters.TEXT & ~filters.COMMAND, lazy('admin:event_title'))],
+            EVENT_DESC: [MessageHandler(filters.TEXT & ~filters.COMMAND, lazy('admin:event_desc'))],
+            EVENT_DATE: [MessageHandler(filters.TEXT & ~filters.COMMAND, lazy('admin:event_date'))],
+            EVENT_LOCATION: [MessageHandler(filters.TEXT & ~filters.COMMAND, lazy('admin:event_location'))],
+            EVENT_CAPACITY: [MessageHandler(filters.TEXT & ~filters.COMMAND, lazy('admin:event_capacity'))],
         },
-        fallbacks=[CommandHandler('cancel', event_cancel)]
+        fallbacks=[CommandHandler('cancel', lazy('admin:event_cancel'))],
+        name='event',
+        persistent=runner.PERSISTENT
     )
 
     ask_handler = ConversationHandler(
-        entry_points=[CommandHandler('ask', ask_question_start)],
+        entry_points=[CommandHandler('ask', lazy('qa_resources:ask_question_start'))],
         states={
-            ASK_TITLE: [MessageHandler(filters.TEXT & ~filters.COMMAND, ask_title)],
-            ASK_CONTENT: [MessageHandler(filters.TEXT & ~filters.COMMAND, ask_content)],
-            ASK_CATEGORY: [CallbackQueryHandler(ask_category, pattern='^qcat_')],
+            ASK_TITLE: [MessageHandler(filters.TEXT & ~filters.COMMAND, lazy('qa_resources:ask_title'))],
+            ASK_CONTENT: [MessageHandler(filters.TEXT & ~filters.COMMAND, lazy('qa_resources:ask_content'))],
+            ASK_CATEGORY: [CallbackQueryHandler(lazy('qa_resources:ask_category'), pattern='^qcat_')],
         },
-        fallbacks=[CommandHandler('cancel', ask_cancel)]
+        fallbacks=[CommandHandler('cancel', lazy('qa_resources:ask_cancel'))],
+        name='ask',
+        persistent=runner.PERSISTENT
     )
 
     upload_handler = ConversationHandler(
-        entry_points=[CommandHandler('upload', upload_resource_start)],
+        entry_points=[CommandHandler('upload', lazy('qa_resources:upload_resource_start'))],
         states={
-            UPLOAD_TITLE: [MessageHandler(filters.TEXT & ~filters.COMMAND, upload_title)],
-            UPLOAD_DESC: [MessageHandler(filters.TEXT & ~filters.COMMAND, upload_desc)],
-            UPLOAD_CATEGORY: [CallbackQueryHandler(upload_category, pattern='^ucat_')],
-            UPLOAD_FILE: [MessageHandler(filters.TEXT & ~filters.COMMAND, upload_file)],
+            UPLOAD_TITLE: [MessageHandler(filters.TEXT & ~filters.COMMAND, lazy('qa_resources:upload_title'))],
+            UPLOAD_DESC: [MessageHandler(filters.TEXT & ~filters.COMMAND, lazy('qa_resources:upload_desc'))],
+            UPLOAD_CATEGORY: [CallbackQueryHandler(lazy('qa_resources:upload_category'), pattern='^ucat_')],
+            UPLOAD_FILE: [MessageHandler((filters.Document.ALL | filters.VIDEO | filters.PHOTO | filters.TEXT) & ~filters.COMMAND, lazy('qa_resources:upload_file'))],
         },
-        fallbacks=[CommandHandler('cancel', upload_cancel)]
+        fallbacks=[CommandHandler('cancel', lazy('qa_resources:upload_cancel'))],
+        name='upload',
+        persistent=runner.PERSISTENT
     )
 
     application.add_handler(register_handler)
@@ -188,12 +200,28 @@ def main():
     application.add_handler(upload_handler)
 
     application.add_handler(CallbackQueryHandler(extended_button_handler))
+    application.add_error_handler(resilience.handle_error)
+
+    return application
+
+def main():
+    token = config.TELEGRAM_BOT_TOKEN
+    if not token:
+        logger.error("TELEGRAM_BOT_TOKEN not found in environment variables")
+        print("خطا: TELEGRAM_BOT_TOKEN در فایل .env موجود نیست")
+        print("لطفا توکن ربات تلگرام خود را در فایل .env با کلید TELEGRAM_BOT_TOKEN اضافه کنید")
+        return
+
+    application = build_application(token)
+    db.connect()
+    startup.mark('build')
 
     logger.info("ربات با موفقیت راه‌اندازی شد")
     print("ربات انجمن مهندسی شیمی راه‌اندازی شد...")
     print("برای توقف ربات از Ctrl+C استفاده کنید")
 
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    runner.run(application)
+    db.shutdown()
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,184 @@
+import time
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from telegram.error import BadRequest, Forbidden, RetryAfter, TelegramError
+
+from services import config, db, tasks
+from services.ratelimit import RateLimiter, telegram_limiter
+
+logger = logging.getLogger(__name__)
+
+_running = set()
+broadcast_limiter = RateLimiter(config.BROADCAST_RATE_LIMIT)
+
+
+async def send_with_retry(bot, chat_id, text, **kwargs):
+    last_error = None
+    for attempt in range(1, config.BROADCAST_MAX_ATTEMPTS + 1):
+        await telegram_limiter.acquire()
+        try:
+            await bot.send_message(chat_id=chat_id, text=text, **kwargs)
+            return attempt, None
+        except RetryAfter as e:
+            telegram_limiter.pause(e.retry_after)
+            last_error = e
+        except (Forbidden, BadRequest) as e:
+            return attempt, str(e)
+        except TelegramError as e:
+            last_error = e
+            await asyncio.sleep(min(2 ** attempt, 30))
+    return config.BROADCAST_MAX_ATTEMPTS, str(last_error)
+
+
+async def start_broadcast(application, text, recipients, notify_chat_id=None, announcement_id=None):
+    recipients = list(dict.fromkeys(recipients))
+
+    result = await db.execute(db.table('broadcasts').insert({
+        'announcement_id': announcement_id,
+        'text': text,
+        'notify_chat_id': notify_chat_id,
+        'status': 'pending',
+        'total_count': len(recipients)
+    }))
+    broadcast = result.data[0]
+
+    for i in range(0, len(recipients), config.BROADCAST_BATCH_SIZE):
+        await db.execute(db.table('broadcast_deliveries').insert([
+            {'broadcast_id': broadcast['id'], 'telegram_id': telegram_id}
+            for telegram_id in recipients[i:i + config.BROADCAST_BATCH_SIZE]
+        ]))
+
+    launch(application, broadcast)
+    return broadcast
+
+
+async def resume_pending(application):
+    try:
+        result = await db.execute(db.table('broadcasts').select('*').in_('status', ['pending', 'running']))
+    except Exception as e:
+        logger.error(f"Could not load unfinished broadcasts: {e}")
+        return
+
+    for broadcast in result.data:
+        launch(application, broadcast)
+
+    if result.data:
+        logger.info(f"Resumed {len(result.data)} unfinished broadcast(s)")
+    return len(result.data)
+
+
+def launch(application, broadcast):
+    if broadcast['id'] in _running:
+        return
+    _running.add(broadcast['id'])
+    tasks.spawn(
+        _run_broadcast(application.bot, broadcast),
+        name=f"broadcast_{broadcast['id']}"
+    )
+
+
+def _progress_text(broadcast, sent, failed, finished=False):
+    header = "✅ ارسال اعلان به پایان رسید" if finished else "📤 در حال ارسال اعلان..."
+    return f"{header}\n\n" \
+           f"پیشرفت: {sent + failed}/{broadcast['total_count']}\n" \
+           f"موفق: {sent}\n" \
+           f"ناموفق: {failed}"
+
+
+async def _report(bot, broadcast, message, sent, failed, finished=False):
+    if not broadcast.get('notify_chat_id'):
+        return None
+
+    text = _progress_text(broadcast, sent, failed, finished)
+    try:
+        if message is None:
+            return await bot.send_message(chat_id=broadcast['notify_chat_id'], text=text)
+        await bot.edit_message_text(chat_id=message.chat_id, message_id=message.message_id, text=text)
+    except TelegramError as e:
+        logger.debug(f"Broadcast progress report failed: {e}")
+    return message
+
+
+async def fan_out(bot, messages):
+    semaphore = asyncio.Semaphore(config.BROADCAST_CONCURRENCY)
+
+    async def deliver(chat_id, text):
+        async with semaphore:
+            await broadcast_limiter.acquire()
+            attempts, error = await send_with_retry(bot, chat_id, text)
+            return chat_id, attempts, error
+
+    return await asyncio.gather(*(deliver(chat_id, text) for chat_id, text in messages))
+
+
+async def _send_batch(bot, broadcast, recipients):
+    return await fan_out(bot, [(telegram_id, broadcast['text']) for telegram_id in recipients])
+
+
+async def _run_broadcast(bot, broadcast):
+    broadcast_id = broadcast['id']
+    sent = broadcast.get('sent_count') or 0
+    failed = broadcast.get('failed_count') or 0
+
+    try:
+        await db.execute(db.table('broadcasts').update({'status': 'running'}).eq('id', broadcast_id))
+        message = await _report(bot, broadcast, None, sent, failed)
+        last_report = time.monotonic()
+
+        while True:
+            pending = await db.execute(
+                db.table('broadcast_deliveries')
+                .select('telegram_id')
+                .eq('broadcast_id', broadcast_id)
+                .eq('status', 'pending')
+                .limit(config.BROADCAST_BATCH_SIZE)
+            )
+            if not pending.data:
+                break
+
+            results = await _send_batch(bot, broadcast, [row['telegram_id'] for row in pending.data])
+            now = datetime.now(timezone.utc).isoformat()
+
+            delivered = [telegram_id for telegram_id, attempts, error in results if error is None]
+            if delivered:
+                await db.execute(
+                    db.table('broadcast_deliveries')
+                    .update({'status': 'sent', 'updated_at': now})
+                    .eq('broadcast_id', broadcast_id)
+                    .in_('telegram_id', delivered)
+                )
+
+            for telegram_id, attempts, error in results:
+                if error is not None:
+                    await db.execute(
+                        db.table('broadcast_deliveries')
+                        .update({'status': 'failed', 'attempts': attempts, 'error': error, 'updated_at': now})
+                        .eq('broadcast_id', broadcast_id)
+                        .eq('telegram_id', telegram_id)
+                    )
+
+            sent += len(delivered)
+            failed += len(results) - len(delivered)
+            await db.execute(db.table('broadcasts').update({
+                'sent_count': sent,
+                'failed_count': failed
+            }).eq('id', broadcast_id))
+
+            if time.monotonic() - last_report >= config.BROADCAST_PROGRESS_INTERVAL:
+                message = await _report(bot, broadcast, message, sent, failed)
+                last_report = time.monotonic()
+
+        await db.execute(db.table('broadcasts').update({
+            'status': 'done',
+            'finished_at': datetime.now(timezone.utc).isoformat()
+        }).eq('id', broadcast_id))
+        await _report(bot, broadcast, message, sent, failed, finished=True)
+        logger.info(f"Broadcast {broadcast_id} finished: {sent} sent, {failed} failed")
+
+    except Exception as e:
+        logger.error(f"Broadcast {broadcast_id} stopped: {e}")
+
+    finally:
+        _running.discard(broadcast_id)
@@ -0,0 +1,20 @@
+from services.router import INT, TEXT, UUID, Callback
+
+ANNOUNCEMENT = Callback('ann_', UUID)
+EVENT = Callback('event_', UUID)
+EVENT_REGISTER = Callback('evreg_', UUID)
+EVENT_CANCEL = Callback('evcancel_', UUID)
+QUESTION = Callback('q_', UUID)
+ANSWER = Callback('answer_', UUID)
+RESOURCE = Callback('resource_', UUID)
+RESOURCE_CATEGORY = Callback('res_', TEXT)
+RESOURCE_FILE = Callback('resfile_', UUID)
+SEARCH_PAGE = Callback('search_page_', INT)
+VERIFY_USER = Callback('verify_', UUID)
+APPROVE_USER = Callback('approve_', UUID)
+REJECT_USER = Callback('reject_', UUID)
+DIGEST_APPROVE = Callback('dapprove_', UUID)
+DIGEST_REJECT = Callback('dreject_', UUID)
+VERIFY_TOGGLE = Callback('vsel_', UUID)
+BULK_YEAR = Callback('bulk_year_', INT)
+BULK_YEAR_APPROVE = Callback('bulk_yearok_', INT)
@@ -0,0 +1,87 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _flag(name, default):
+    return os.getenv(name, default).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
+
+SUPABASE_URL = os.getenv('VITE_SUPABASE_URL')
+SUPABASE_KEY = os.getenv('VITE_SUPABASE_ANON_KEY')
+SUPABASE_SERVICE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY', '')
+
+DB_MAX_WORKERS = int(os.getenv('DB_MAX_WORKERS', '16'))
+SUPABASE_TIMEOUT = float(os.getenv('SUPABASE_TIMEOUT', '10'))
+SUPABASE_MAX_CONNECTIONS = int(os.getenv('SUPABASE_MAX_CONNECTIONS', '20'))
+SUPABASE_MAX_KEEPALIVE = int(os.getenv('SUPABASE_MAX_KEEPALIVE', '10'))
+SUPABASE_KEEPALIVE_EXPIRY = float(os.getenv('SUPABASE_KEEPALIVE_EXPIRY', '30'))
+SUPABASE_HTTP2 = _flag('SUPABASE_HTTP2', 'true')
+SUPABASE_DEADLINE = float(os.getenv('SUPABASE_DEADLINE', '5'))
+SUPABASE_RETRIES = int(os.getenv('SUPABASE_RETRIES', '2'))
+SUPABASE_RETRY_BASE = float(os.getenv('SUPABASE_RETRY_BASE', '0.1'))
+SUPABASE_RETRY_MAX_DELAY = float(os.getenv('SUPABASE_RETRY_MAX_DELAY', '1'))
+SUPABASE_BREAKER_THRESHOLD = int(os.getenv('SUPABASE_BREAKER_THRESHOLD', '5'))
+SUPABASE_BREAKER_RESET = float(os.getenv('SUPABASE_BREAKER_RESET', '15'))
+
+USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', '5000'))
+USER_CACHE_TTL = float(os.getenv('USER_CACHE_TTL', '60'))
+USER_CACHE_WARM_SIZE = int(os.getenv('USER_CACHE_WARM_SIZE', '500'))
+
+TELEGRAM_RATE_LIMIT = float(os.getenv('TELEGRAM_RATE_LIMIT', '25'))
+BROADCAST_CONCURRENCY = int(os.getenv('BROADCAST_CONCURRENCY', '10'))
+BROADCAST_MAX_ATTEMPTS = int(os.getenv('BROADCAST_MAX_ATTEMPTS', '5'))
+BROADCAST_BATCH_SIZE = int(os.getenv('BROADCAST_BATCH_SIZE', '500'))
+BROADCAST_PROGRESS_INTERVAL = float(os.getenv('BROADCAST_PROGRESS_INTERVAL', '5'))
+
+PAGE_SIZE = int(os.getenv('PAGE_SIZE', '8'))
+STATS_CACHE_TTL = float(os.getenv('STATS_CACHE_TTL', '30'))
+COUNTER_FLUSH_INTERVAL = float(os.getenv('COUNTER_FLUSH_INTERVAL', '5'))
+QUESTION_CACHE_SIZE = int(os.getenv('QUESTION_CACHE_SIZE', '500'))
+QUESTION_CACHE_TTL = float(os.getenv('QUESTION_CACHE_TTL', '300'))
+INLINE_CACHE_TIME = int(os.getenv('INLINE_CACHE_TIME', '30'))
+SEARCH_INDEX_REFRESH_INTERVAL = float(os.getenv('SEARCH_INDEX_REFRESH_INTERVAL', '30'))
+SEARCH_INDEX_REBUILD_INTERVAL = float(os.getenv('SEARCH_INDEX_REBUILD_INTERVAL', '3600'))
+UPLOAD_HASH_MAX_SIZE = int(os.getenv('UPLOAD_HASH_MAX_SIZE', str(20 * 1024 * 1024)))
+
+BOT_MODE = os.getenv('BOT_MODE', 'polling').strip().lower()
+TELEGRAM_API_BASE_URL = os.getenv('TELEGRAM_API_BASE_URL', '')
+WEBHOOK_URL = os.getenv('WEBHOOK_URL', '')
+WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', '/telegram')
+WEBHOOK_LISTEN = os.getenv('WEBHOOK_LISTEN', '0.0.0.0')
+WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT', '8443'))
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET', '')
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv('WEBHOOK_MAX_CONNECTIONS', '40'))
+WEBHOOK_MAX_PENDING_UPDATES = int(os.getenv('WEBHOOK_MAX_PENDING_UPDATES', '1000'))
+UPDATE_WORKERS = int(os.getenv('UPDATE_WORKERS', '32'))
+
+PERSISTENCE_BACKEND = os.getenv('PERSISTENCE_BACKEND', 'sqlite').strip().lower()
+PERSISTENCE_PATH = os.getenv('PERSISTENCE_PATH', 'bot_state.sqlite3')
+PERSISTENCE_INTERVAL = float(os.getenv('PERSISTENCE_INTERVAL', '10'))
+
+METRICS_ENABLED = _flag('METRICS_ENABLED', 'true')
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.getenv('METRICS_PORT', '9100'))
+TELEGRAM_POOL_SIZE = int(os.getenv('TELEGRAM_POOL_SIZE', '256'))
+
+BROADCAST_RATE_LIMIT = float(os.getenv('BROADCAST_RATE_LIMIT', '20'))
+SCHEDULE_TIMEZONE = os.getenv('SCHEDULE_TIMEZONE', 'Asia/Tehran')
+SCHEDULER_INTERVAL = float(os.getenv('SCHEDULER_INTERVAL', '60'))
+SCHEDULER_BATCH_SIZE = int(os.getenv('SCHEDULER_BATCH_SIZE', '20'))
+
+ADMIN_DIGEST_INTERVAL = float(os.getenv('ADMIN_DIGEST_INTERVAL', '60'))
+ADMIN_ROSTER_TTL = float(os.getenv('ADMIN_ROSTER_TTL', '300'))
+
+STORAGE_ENABLED = _flag('STORAGE_ENABLED', 'false')
+STORAGE_BUCKET = os.getenv('STORAGE_BUCKET', 'resources')
+STORAGE_CHUNK_SIZE = int(os.getenv('STORAGE_CHUNK_SIZE', str(6 * 1024 * 1024)))
+STORAGE_CONCURRENCY = int(os.getenv('STORAGE_CONCURRENCY', '3'))
+STORAGE_MAX_ATTEMPTS = int(os.getenv('STORAGE_MAX_ATTEMPTS', '5'))
+STORAGE_SWEEP_INTERVAL = float(os.getenv('STORAGE_SWEEP_INTERVAL', '60'))
+STORAGE_TIMEOUT = float(os.getenv('STORAGE_TIMEOUT', '60'))
+STORAGE_SOURCE_HOSTS = {host.strip().lower() for host in os.getenv('STORAGE_SOURCE_HOSTS', '').split(',') if host.strip()}
+SIGNED_URL_TTL = int(os.getenv('SIGNED_URL_TTL', '3600'))
+SIGNED_URL_CACHE_SIZE = int(os.getenv('SIGNED_URL_CACHE_SIZE', '1000'))
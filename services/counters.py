@@ -0,0 +1,54 @@
+import time
+import logging
+from collections import defaultdict
+
+from services import config, db, tasks
+
+logger = logging.getLogger(__name__)
+
+QUESTION_VIEWS = 'question_views'
+RESOURCE_DOWNLOADS = 'resource_downloads'
+USER_ACTIVITY = 'user_activity'
+
+
+def _new_buffer():
+    return {QUESTION_VIEWS: defaultdict(int), RESOURCE_DOWNLOADS: defaultdict(int), USER_ACTIVITY: {}}
+
+
+_buffer = _new_buffer()
+
+
+def increment(kind, row_id, amount=1):
+    _buffer[kind][row_id] += amount
+
+
+def touch(telegram_id):
+    _buffer[USER_ACTIVITY][telegram_id] = time.time()
+
+
+def pending(kind, row_id):
+    return _buffer[kind].get(row_id, 0)
+
+
+async def flush():
+    global _buffer
+    batch, _buffer = _buffer, _new_buffer()
+    if not any(batch.values()):
+        return
+
+    try:
+        await db.execute(db.rpc('apply_counter_deltas', {
+            kind: dict(deltas) for kind, deltas in batch.items()
+        }))
+    except Exception as e:
+        for kind, deltas in batch.items():
+            for row_id, amount in deltas.items():
+                if kind == USER_ACTIVITY:
+                    _buffer[kind].setdefault(row_id, amount)
+                else:
+                    _buffer[kind][row_id] += amount
+        logger.error(f"Counter flush failed, will retry: {e}")
+
+
+def start():
+    tasks.spawn(tasks.every(config.COUNTER_FLUSH_INTERVAL, flush), name='counter_flush')
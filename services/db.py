@@ -0,0 +1,154 @@
+import time
+import asyncio
+import logging
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+from services import config, metrics
+from services.resilience import OPEN, CircuitBreaker, Unavailable, backoff, is_transient
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_client = None
+_client_lock = threading.Lock()
+_connecting = None
+
+breaker = CircuitBreaker('supabase', config.SUPABASE_BREAKER_THRESHOLD, config.SUPABASE_BREAKER_RESET)
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=config.DB_MAX_WORKERS,
+            thread_name_prefix='supabase'
+        )
+    return _executor
+
+
+def _http2_enabled():
+    if not config.SUPABASE_HTTP2:
+        return False
+    if importlib.util.find_spec('h2') is None:
+        logger.warning("SUPABASE_HTTP2 is enabled but the h2 package is not installed, falling back to HTTP/1.1")
+        return False
+    return True
+
+
+def _create_client():
+    from postgrest.utils import SyncClient
+    from supabase import create_client
+    from supabase.lib.client_options import ClientOptions
+
+    client = create_client(
+        config.SUPABASE_URL,
+        config.SUPABASE_KEY,
+        options=ClientOptions(postgrest_client_timeout=config.SUPABASE_TIMEOUT)
+    )
+
+    postgrest = client.postgrest
+    default_session = postgrest.session
+    postgrest.session = SyncClient(
+        base_url=default_session.base_url,
+        headers=default_session.headers,
+        timeout=httpx.Timeout(config.SUPABASE_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=config.SUPABASE_MAX_CONNECTIONS,
+            max_keepalive_connections=config.SUPABASE_MAX_KEEPALIVE,
+            keepalive_expiry=config.SUPABASE_KEEPALIVE_EXPIRY
+        ),
+        http2=_http2_enabled()
+    )
+    default_session.close()
+
+    return client
+
+
+def get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _create_client()
+    return _client
+
+
+def connect():
+    global _connecting
+    if _connecting is None:
+        _connecting = get_executor().submit(get_client)
+    return _connecting
+
+
+def set_client(client):
+    global _client
+    _client = client
+
+
+def table(name):
+    return get_client().table(name)
+
+
+def rpc(fn, params=None):
+    return get_client().rpc(fn, params or {})
+
+
+async def _attempt(loop, query, timeout):
+    started = time.perf_counter()
+    outcome = 'error'
+    try:
+        result = await asyncio.wait_for(loop.run_in_executor(get_executor(), query.execute), timeout)
+        outcome = 'ok'
+        return result
+    except asyncio.TimeoutError:
+        outcome = 'timeout'
+        raise
+    finally:
+        metrics.observe_supabase(query, outcome, time.perf_counter() - started)
+
+
+async def execute(query, idempotent=None, deadline=None):
+    loop = asyncio.get_running_loop()
+    if idempotent is None:
+        idempotent = getattr(query, 'http_method', None) in ('GET', 'HEAD')
+    attempts = 1 + (config.SUPABASE_RETRIES if idempotent else 0)
+    expires_at = loop.time() + (deadline or config.SUPABASE_DEADLINE)
+
+    if not breaker.allow():
+        metrics.observe_supabase(query, 'rejected', 0.0)
+        raise Unavailable("Supabase circuit breaker is open")
+
+    for attempt in range(1, attempts + 1):
+        try:
+            result = await _attempt(loop, query, expires_at - loop.time())
+        except Exception as e:
+            if not is_transient(e):
+                breaker.succeeded()
+                raise
+            delay = backoff(attempt, config.SUPABASE_RETRY_BASE, config.SUPABASE_RETRY_MAX_DELAY)
+            if attempt == attempts or loop.time() + delay >= expires_at:
+                breaker.failed()
+                raise Unavailable(f"Supabase request failed after {attempt} attempt(s): {e!r}") from e
+            metrics.observe_supabase_retry(query)
+            await asyncio.sleep(delay)
+            if breaker.state == OPEN:
+                metrics.observe_supabase(query, 'rejected', 0.0)
+                raise Unavailable("Supabase circuit breaker is open") from e
+        else:
+            breaker.succeeded()
+            return result
+
+
+def shutdown():
+    global _executor, _client, _connecting
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+    if _client is not None:
+        _client.postgrest.session.close()
+        _client = None
+    _connecting = None
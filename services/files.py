@@ -0,0 +1,63 @@
+import asyncio
+import hashlib
+import mimetypes
+
+from telegram import InlineQueryResultCachedDocument, InlineQueryResultCachedPhoto, InlineQueryResultCachedVideo
+
+from services import config
+
+DOCUMENT = 'document'
+VIDEO = 'video'
+PHOTO = 'photo'
+
+_SENDERS = {DOCUMENT: 'send_document', VIDEO: 'send_video', PHOTO: 'send_photo'}
+
+
+def _file_type(file_name, mime_type, media_type):
+    if file_name and '.' in file_name:
+        return file_name.rsplit('.', 1)[-1].lower()
+    extension = mimetypes.guess_extension(mime_type) if mime_type else None
+    return extension.lstrip('.') if extension else media_type
+
+
+def attachment(message):
+    if message.document:
+        media, media_type = message.document, DOCUMENT
+    elif message.video:
+        media, media_type = message.video, VIDEO
+    elif message.photo:
+        media, media_type = message.photo[-1], PHOTO
+    else:
+        return None
+
+    mime_type = getattr(media, 'mime_type', None) or ('image/jpeg' if media_type == PHOTO else None)
+    return {
+        'media_type': media_type,
+        'file_id': media.file_id,
+        'file_unique_id': media.file_unique_id,
+        'file_size': media.file_size,
+        'mime_type': mime_type,
+        'file_type': _file_type(getattr(media, 'file_name', None), mime_type, media_type)
+    }
+
+
+async def content_hash(bot, file_id, file_size):
+    if not file_size or file_size > config.UPLOAD_HASH_MAX_SIZE:
+        return None
+
+    telegram_file = await bot.get_file(file_id)
+    data = await telegram_file.download_as_bytearray()
+    return await asyncio.get_running_loop().run_in_executor(None, lambda: hashlib.sha256(data).hexdigest())
+
+
+async def send(bot, chat_id, media_type, file_id, caption=None):
+    method = getattr(bot, _SENDERS.get(media_type, _SENDERS[DOCUMENT]))
+    return await method(chat_id, file_id, caption=caption)
+
+
+def inline_result(result_id, media_type, file_id, title, description=None, caption=None):
+    if media_type == VIDEO:
+        return InlineQueryResultCachedVideo(result_id, file_id, title, description=description, caption=caption)
+    if media_type == PHOTO:
+        return InlineQueryResultCachedPhoto(result_id, file_id, title=title, description=description, caption=caption)
+    return InlineQueryResultCachedDocument(result_id, title, file_id, description=description, caption=caption)
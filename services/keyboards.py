@@ -0,0 +1,149 @@
+from functools import lru_cache
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from services import callbacks
+from services.router import ADMIN_ROLES
+
+BACK = "🔙 بازگشت"
+BACK_TARGETS = ('back_main', 'admin_panel', 'admin_verify', 'events', 'qa', 'resources')
+
+MAIN_MENU_TEXT = (
+    "سلام {first_name}!\n\n"
+    "به ربات انجمن مهندسی شیمی خوش آمدید.\n"
+    "لطفا یکی از گزینه‌های زیر را انتخاب کنید:"
+)
+
+PRIORITY_ICONS = {
+    'urgent': '🔴',
+    'high': '🟠',
+    'medium': '🟡',
+    'low': '🟢'
+}
+
+ROLE_NAMES = {
+    'member': 'عضو',
+    'admin': 'مدیر',
+    'superadmin': 'مدیر ارشد'
+}
+
+RESOURCE_CATEGORY_NAMES = {
+    'book': 'کتاب‌ها',
+    'paper': 'مقالات',
+    'video': 'ویدیوها',
+    'tool': 'ابزارها'
+}
+
+
+class Picker:
+    def __init__(self, prefix, choices, columns=2):
+        self.prefix = prefix
+        self.values = {f"{prefix}{value}": value for value, _ in choices}
+        buttons = [InlineKeyboardButton(label, callback_data=f"{prefix}{value}") for value, label in choices]
+        self.markup = InlineKeyboardMarkup([buttons[i:i + columns] for i in range(0, len(buttons), columns)])
+
+    def value(self, callback_data, default):
+        return self.values.get(callback_data, default)
+
+
+ANNOUNCE_CATEGORIES = Picker('cat_', [
+    ('news', 'خبر'),
+    ('event', 'رویداد'),
+    ('exam', 'امتحان'),
+    ('project', 'پروژه'),
+    ('general', 'عمومی')
+])
+
+ANNOUNCE_PRIORITIES = Picker('pri_', [
+    ('urgent', '🔴 فوری'),
+    ('high', '🟠 بالا'),
+    ('medium', '🟡 متوسط'),
+    ('low', '🟢 پایین')
+])
+
+QUESTION_CATEGORIES = Picker('qcat_', [
+    ('homework', 'تمرین'),
+    ('concept', 'مفهومی'),
+    ('exam', 'امتحان'),
+    ('project', 'پروژه')
+])
+
+UPLOAD_CATEGORIES = Picker('ucat_', [
+    ('book', 'کتاب'),
+    ('paper', 'مقاله'),
+    ('video', 'ویدیو'),
+    ('tool', 'ابزار')
+])
+
+ANNOUNCE_SCHEDULE = InlineKeyboardMarkup([
+    [InlineKeyboardButton("📢 انتشار فوری", callback_data='sched_now')]
+])
+
+
+@lru_cache(maxsize=None)
+def back_button(callback_data):
+    return InlineKeyboardButton(BACK, callback_data=callback_data)
+
+
+@lru_cache(maxsize=256)
+def back(callback_data):
+    return InlineKeyboardMarkup([[back_button(callback_data)]])
+
+
+RESOURCES_MENU = InlineKeyboardMarkup([
+    [InlineKeyboardButton(RESOURCE_CATEGORY_NAMES['book'], callback_data=callbacks.RESOURCE_CATEGORY.data('book')),
+     InlineKeyboardButton(RESOURCE_CATEGORY_NAMES['paper'], callback_data=callbacks.RESOURCE_CATEGORY.data('paper'))],
+    [InlineKeyboardButton(RESOURCE_CATEGORY_NAMES['video'], callback_data=callbacks.RESOURCE_CATEGORY.data('video')),
+     InlineKeyboardButton(RESOURCE_CATEGORY_NAMES['tool'], callback_data=callbacks.RESOURCE_CATEGORY.data('tool'))],
+    [back_button('back_main')]
+])
+
+QA_MENU = InlineKeyboardMarkup([
+    [InlineKeyboardButton("سوالات اخیر", callback_data='qa_recent')],
+    [InlineKeyboardButton("پرسش سوال جدید", callback_data='qa_ask')],
+    [InlineKeyboardButton("سوالات من", callback_data='qa_mine')],
+    [back_button('back_main')]
+])
+
+
+def is_admin(user):
+    return user['role'] in ADMIN_ROLES
+
+
+@lru_cache(maxsize=2)
+def main_menu(admin):
+    keyboard = [
+        [InlineKeyboardButton("اعلان‌ها", callback_data='announcements'),
+         InlineKeyboardButton("رویدادها", callback_data='events')],
+        [InlineKeyboardButton("منابع", callback_data='resources'),
+         InlineKeyboardButton("پرسش و پاسخ", callback_data='qa')],
+        [InlineKeyboardButton("پروفایل من", callback_data='profile')]
+    ]
+
+    if admin:
+        keyboard.append([InlineKeyboardButton("پنل مدیریت", callback_data='admin_panel')])
+
+    return InlineKeyboardMarkup(keyboard)
+
+
+def main_menu_for(user):
+    return MAIN_MENU_TEXT.format(first_name=user['first_name']), main_menu(is_admin(user))
+
+
+@lru_cache(maxsize=64)
+def admin_panel(pending_count):
+    return InlineKeyboardMarkup([
+        [InlineKeyboardButton(f"تایید اعضا ({pending_count})", callback_data='admin_verify')],
+        [InlineKeyboardButton("ارسال اعلان", callback_data='admin_announce')],
+        [InlineKeyboardButton("مدیریت رویدادها", callback_data='admin_events')],
+        [InlineKeyboardButton("آمار ربات", callback_data='admin_stats')],
+        [back_button('back_main')]
+    ])
+
+
+def warm():
+    for admin in (False, True):
+        main_menu(admin)
+    for target in BACK_TARGETS:
+        back(target)
+    return main_menu.cache_info().currsize + back.cache_info().currsize
@@ -0,0 +1,262 @@
+import time
+import bisect
+import logging
+import functools
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from telegram.ext import ConversationHandler
+from telegram.request import HTTPXRequest
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_registry = []
+_collectors = []
+_server = None
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        _registry.append(self)
+
+    def inc(self, *labels, amount=1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def set(self, value, *labels):
+        self._values[labels] = value
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(list(self._values.items())):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        _registry.append(self)
+
+    def set(self, value, *labels):
+        self._values[labels] = value
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        for labels, value in sorted(list(self._values.items())):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        _registry.append(self)
+
+    def observe(self, value, *labels):
+        entry = self._values.get(labels)
+        if entry is None:
+            entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def count(self, *labels):
+        entry = self._values.get(labels)
+        return entry[2] if entry else 0
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in sorted(list(self._values.items())):
+            cumulative = 0
+            for bound, bucket in zip(self.buckets + ('+Inf',), counts):
+                cumulative += bucket
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, ('le', bound))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+HANDLER_LATENCY = Histogram('bot_handler_duration_seconds', 'Handler callback latency', ['handler'])
+HANDLER_ERRORS = Counter('bot_handler_errors_total', 'Exceptions raised by handler callbacks', ['handler'])
+CALLBACK_LATENCY = Histogram('bot_callback_duration_seconds', 'Callback query latency by route', ['route'])
+SUPABASE_LATENCY = Histogram('bot_supabase_duration_seconds', 'Supabase request latency by table or rpc', ['table'])
+SUPABASE_CALLS = Counter('bot_supabase_requests_total', 'Supabase requests by table or rpc and outcome', ['table', 'outcome'])
+SUPABASE_RETRIES = Counter('bot_supabase_retries_total', 'Supabase reads retried after a transient failure', ['table'])
+BREAKER_STATE = Gauge('bot_circuit_breaker_state', 'Circuit breaker state (0 closed, 1 half-open, 2 open)', ['breaker'])
+TELEGRAM_LATENCY = Histogram('bot_telegram_api_duration_seconds', 'Telegram Bot API request latency', ['method'])
+TELEGRAM_ERRORS = Counter('bot_telegram_api_errors_total', 'Failed Telegram Bot API requests', ['method'])
+UPDATE_WORKERS = Gauge('bot_update_workers', 'Updates processed concurrently at most')
+UPDATE_QUEUE = Gauge('bot_update_queue', 'Updates waiting for a worker or being processed', ['state'])
+UPDATE_QUEUE_PEAK = Gauge('bot_update_queue_max_waiting', 'Most updates waiting for a worker at once')
+UPDATES_PROCESSED = Counter('bot_updates_processed_total', 'Updates handed to a worker')
+UPDATE_WAIT = Counter('bot_update_wait_seconds_total', 'Time updates spent waiting for a worker')
+UPDATE_WAIT_MAX = Gauge('bot_update_wait_max_seconds', 'Longest time an update waited for a worker')
+CACHE_ENTRIES = Gauge('bot_cache_entries', 'Entries held by an in-memory cache', ['cache'])
+CACHE_HITS = Counter('bot_cache_hits_total', 'Cache lookups answered from memory', ['cache'])
+CACHE_MISSES = Counter('bot_cache_misses_total', 'Cache lookups that went to the database', ['cache'])
+CACHE_EVICTIONS = Counter('bot_cache_evictions_total', 'Entries dropped to stay within the cache size', ['cache'])
+
+
+def collector(callback):
+    _collectors.append(callback)
+    return callback
+
+
+def render():
+    for callback in list(_collectors):
+        callback()
+    lines = []
+    for metric in list(_registry):
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+def instrument(name, callback):
+    if getattr(callback, 'instrumented', False):
+        return callback
+
+    @functools.wraps(callback)
+    async def wrapper(update, context):
+        started = time.perf_counter()
+        try:
+            return await callback(update, context)
+        except Exception:
+            HANDLER_ERRORS.inc(name)
+            raise
+        finally:
+            HANDLER_LATENCY.observe(time.perf_counter() - started, name)
+
+    wrapper.instrumented = True
+    return wrapper
+
+
+def _instrument_handler(handler):
+    if isinstance(handler, ConversationHandler):
+        for inner in handler.entry_points + handler.fallbacks:
+            _instrument_handler(inner)
+        for handlers in handler.states.values():
+            for inner in handlers:
+                _instrument_handler(inner)
+    elif getattr(handler, 'callback', None) is not None:
+        handler.callback = instrument(handler.callback.__name__, handler.callback)
+
+
+def instrument_handlers(application):
+    for handlers in application.handlers.values():
+        for handler in handlers:
+            _instrument_handler(handler)
+
+
+def _table(query):
+    path = getattr(query, 'path', None)
+    return path.lstrip('/') if isinstance(path, str) and path else 'unknown'
+
+
+def observe_supabase(query, outcome, elapsed):
+    table = _table(query)
+    SUPABASE_CALLS.inc(table, outcome)
+    SUPABASE_LATENCY.observe(elapsed, table)
+
+
+def observe_supabase_retry(query):
+    SUPABASE_RETRIES.inc(_table(query))
+
+
+def observe_update_processor(stats):
+    UPDATE_WORKERS.set(stats['workers'])
+    UPDATE_QUEUE.set(stats['waiting'], 'waiting')
+    UPDATE_QUEUE.set(stats['active'], 'active')
+    UPDATE_QUEUE_PEAK.set(stats['max_waiting'])
+    UPDATES_PROCESSED.set(stats['processed'])
+    UPDATE_WAIT.set(stats['total_wait_ms'] / 1000)
+    UPDATE_WAIT_MAX.set(stats['max_wait_ms'] / 1000)
+
+
+def observe_cache(name, stats):
+    CACHE_ENTRIES.set(stats['size'], name)
+    CACHE_HITS.set(stats['hits'], name)
+    CACHE_MISSES.set(stats['misses'], name)
+    CACHE_EVICTIONS.set(stats['evictions'], name)
+
+
+class InstrumentedRequest(HTTPXRequest):
+    async def do_request(self, url, method, *args, **kwargs):
+        api_method = url.rsplit('/', 1)[-1]
+        started = time.perf_counter()
+        try:
+            code, payload = await super().do_request(url, method, *args, **kwargs)
+        except Exception:
+            TELEGRAM_ERRORS.inc(api_method)
+            raise
+        finally:
+            TELEGRAM_LATENCY.observe(time.perf_counter() - started, api_method)
+        if code >= 400:
+            TELEGRAM_ERRORS.inc(api_method)
+        return code, payload
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(host, port):
+    global _server
+    if _server is None:
+        _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, name='metrics', daemon=True).start()
+        logger.info(f"Metrics available on http://{host}:{_server.server_port}/metrics")
+    return _server
+
+
+def stop_server():
+    global _server
+    if _server is not None:
+        _server.shutdown()
+        _server.server_close()
+        _server = None
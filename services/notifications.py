@@ -0,0 +1,84 @@
+import asyncio
+import logging
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from services import broadcast, callbacks, config, db, tasks
+from services.cache import MISSING, TTLCache
+from services.router import ADMIN_ROLES
+
+logger = logging.getLogger(__name__)
+
+DIGEST_SIZE = 20
+
+_roster = TTLCache(1, config.ADMIN_ROSTER_TTL)
+_pending = []
+_bot = None
+
+
+async def admin_chat_ids():
+    admins = _roster.get('admins')
+    if admins is MISSING:
+        result = await db.execute(db.table('users').select('telegram_id').in_('role', list(ADMIN_ROLES)))
+        admins = [row['telegram_id'] for row in result.data]
+        _roster.set('admins', admins)
+    return admins
+
+
+def registration(user):
+    _pending.append(user)
+
+
+def digest(registrations):
+    text = f"📝 درخواست‌های عضویت جدید ({len(registrations)}):\n\n"
+    keyboard = []
+    for i, user in enumerate(registrations, 1):
+        name = f"{user['first_name']} {user['last_name']}".strip()
+        text += f"{i}. {name}\n" \
+                f"   شماره دانشجویی: {user['student_id']} | رشته: {user['major']} | ورودی: {user['year']}\n" \
+                f"   تلگرام: @{user['username'] or 'ندارد'}\n"
+        keyboard.append([
+            InlineKeyboardButton(f"✅ {i}. {name[:30]}", callback_data=callbacks.DIGEST_APPROVE.data(user['id'])),
+            InlineKeyboardButton(f"❌ رد {i}", callback_data=callbacks.DIGEST_REJECT.data(user['id']))
+        ])
+    return text, InlineKeyboardMarkup(keyboard)
+
+
+def without_user(reply_markup, user_id):
+    handled = {callbacks.DIGEST_APPROVE.data(user_id), callbacks.DIGEST_REJECT.data(user_id)}
+    rows = [
+        row for row in reply_markup.inline_keyboard
+        if not any(button.callback_data in handled for button in row)
+    ]
+    return InlineKeyboardMarkup(rows) if rows else None
+
+
+async def _send(chat_id, text, reply_markup):
+    attempts, error = await broadcast.send_with_retry(_bot, chat_id, text, reply_markup=reply_markup)
+    if error:
+        logger.warning(f"Registration digest to {chat_id} failed after {attempts} attempt(s): {error}")
+
+
+async def flush():
+    global _pending
+    batch, _pending = _pending, []
+    if not batch or _bot is None:
+        _pending = batch + _pending
+        return
+
+    try:
+        admins = await admin_chat_ids()
+    except Exception as e:
+        _pending = batch + _pending
+        logger.error(f"Could not load admin roster, will retry: {e}")
+        return
+
+    for i in range(0, len(batch), DIGEST_SIZE):
+        text, reply_markup = digest(batch[i:i + DIGEST_SIZE])
+        await asyncio.gather(*(_send(chat_id, text, reply_markup) for chat_id in admins))
+
+
+def start(application):
+    global _bot
+    _bot = application.bot
+    tasks.spawn(tasks.every(config.ADMIN_DIGEST_INTERVAL, flush), name='registration_digest')
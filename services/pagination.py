@@ -0,0 +1,107 @@
+import re
+import uuid
+import base64
+from datetime import datetime, timedelta, timezone
+
+from telegram import InlineKeyboardButton
+
+from services import config, db
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+SEPARATOR = '|'
+
+_FRACTION = re.compile(r'\.(\d+)')
+
+
+class Page:
+    def __init__(self, rows, sort_key, has_prev, has_next):
+        self.rows = rows
+        self.sort_key = sort_key
+        self.has_prev = has_prev
+        self.has_next = has_next
+
+    def first_cursor(self):
+        return encode_cursor(self.rows[0], self.sort_key)
+
+    def last_cursor(self):
+        return encode_cursor(self.rows[-1], self.sort_key)
+
+
+def parse_timestamp(value):
+    value = value.replace('Z', '+00:00')
+    value = _FRACTION.sub(lambda m: '.' + m.group(1)[:6].ljust(6, '0'), value, count=1)
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _to_base36(number):
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+    encoded = ''
+    while True:
+        number, remainder = divmod(number, 36)
+        encoded = digits[remainder] + encoded
+        if number == 0:
+            return encoded
+
+
+def encode_cursor(row, sort_key):
+    delta = parse_timestamp(row[sort_key]) - EPOCH
+    micros = (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+    row_id = base64.urlsafe_b64encode(uuid.UUID(row['id']).bytes).rstrip(b'=').decode()
+    return f"{_to_base36(micros)}.{row_id}"
+
+
+def decode_cursor(cursor):
+    try:
+        micros, row_id = cursor.split('.', 1)
+        timestamp = EPOCH + timedelta(microseconds=int(micros, 36))
+        row_id = uuid.UUID(bytes=base64.urlsafe_b64decode(row_id + '=' * (-len(row_id) % 4)))
+        return timestamp.isoformat(), str(row_id)
+    except ValueError:
+        return None
+
+
+def split(callback_data):
+    base, _, payload = callback_data.partition(SEPARATOR)
+    if not payload:
+        return base, 'n', None
+    return base, payload[0], payload[1:]
+
+
+async def fetch_page(query, sort_key, descending=True, direction='n', cursor=None, page_size=None):
+    page_size = page_size or config.PAGE_SIZE
+    forward = direction != 'p'
+    position = decode_cursor(cursor) if cursor else None
+    if position is None:
+        forward = True
+
+    order_desc = descending if forward else not descending
+    direction_suffix = '.desc' if order_desc else ''
+    if position is not None:
+        timestamp, row_id = position
+        op = 'lt' if order_desc else 'gt'
+        query.params = query.params.add(
+            'or',
+            f'({sort_key}.{op}."{timestamp}",and({sort_key}.eq."{timestamp}",id.{op}.{row_id}))'
+        )
+    query.params = query.params.add('order', f"{sort_key}{direction_suffix},id{direction_suffix}")
+
+    result = await db.execute(query.limit(page_size + 1))
+    rows = result.data[:page_size]
+    more = len(result.data) > page_size
+
+    if forward:
+        return Page(rows, sort_key, has_prev=position is not None, has_next=more)
+    rows.reverse()
+    return Page(rows, sort_key, has_prev=more, has_next=True)
+
+
+def nav_row(page, callback_base):
+    row = []
+    if page.rows and page.has_prev:
+        row.append(InlineKeyboardButton("◀️ قبلی", callback_data=f"{callback_base}{SEPARATOR}p{page.first_cursor()}"))
+    if page.rows and page.has_next:
+        row.append(InlineKeyboardButton("بعدی ▶️", callback_data=f"{callback_base}{SEPARATOR}n{page.last_cursor()}"))
+    return row
@@ -0,0 +1,140 @@
+import json
+import pickle
+import asyncio
+import logging
+import sqlite3
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from telegram.ext import BasePersistence, PersistenceInput
+
+logger = logging.getLogger(__name__)
+
+USER_DATA = 'user_data'
+CHAT_DATA = 'chat_data'
+BOT_DATA = 'bot_data'
+CONVERSATION = 'conversation:'
+
+DELETED = object()
+
+
+class SQLitePersistence(BasePersistence):
+    def __init__(self, path, update_interval=10):
+        super().__init__(
+            store_data=PersistenceInput(bot_data=True, chat_data=True, user_data=True, callback_data=False),
+            update_interval=update_interval
+        )
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='persistence')
+        self._connection = None
+        self._pending = {}
+        self._commit_task = None
+
+    def _connect(self):
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS state ('
+                'kind TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, '
+                'PRIMARY KEY (kind, key))'
+            )
+            self._connection.commit()
+        return self._connection
+
+    def _load(self, kind):
+        rows = self._connect().execute('SELECT key, value FROM state WHERE kind = ?', (kind,)).fetchall()
+        return [(key, pickle.loads(value)) for key, value in rows]
+
+    def _write(self, batch):
+        connection = self._connect()
+        with connection:
+            connection.executemany(
+                'INSERT OR REPLACE INTO state (kind, key, value) VALUES (?, ?, ?)',
+                [(kind, key, value) for (kind, key), value in batch.items() if value is not DELETED]
+            )
+            connection.executemany(
+                'DELETE FROM state WHERE kind = ? AND key = ?',
+                [(kind, key) for (kind, key), value in batch.items() if value is DELETED]
+            )
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _stage(self, kind, key, value):
+        self._pending[(kind, key)] = DELETED if value is DELETED else pickle.dumps(value)
+        if self._commit_task is None:
+            self._commit_task = asyncio.get_running_loop().create_task(self._commit())
+
+    async def _commit(self):
+        await asyncio.sleep(0)
+        batch, self._pending = self._pending, {}
+        self._commit_task = None
+        if not batch:
+            return
+        try:
+            await self._run(self._write, batch)
+        except Exception as e:
+            for entry, value in batch.items():
+                self._pending.setdefault(entry, value)
+            logger.error(f"Persisting {len(batch)} state entries failed: {e}")
+
+    async def get_user_data(self):
+        rows = await self._run(self._load, USER_DATA)
+        return defaultdict(dict, {int(key): value for key, value in rows})
+
+    async def get_chat_data(self):
+        rows = await self._run(self._load, CHAT_DATA)
+        return defaultdict(dict, {int(key): value for key, value in rows})
+
+    async def get_bot_data(self):
+        rows = await self._run(self._load, BOT_DATA)
+        return rows[0][1] if rows else {}
+
+    async def get_callback_data(self):
+        return None
+
+    async def get_conversations(self, name):
+        rows = await self._run(self._load, CONVERSATION + name)
+        return {tuple(json.loads(key)): state for key, state in rows}
+
+    async def update_conversation(self, name, key, new_state):
+        self._stage(CONVERSATION + name, json.dumps(list(key)), DELETED if new_state is None else new_state)
+
+    async def update_user_data(self, user_id, data):
+        self._stage(USER_DATA, str(user_id), data)
+
+    async def update_chat_data(self, chat_id, data):
+        self._stage(CHAT_DATA, str(chat_id), data)
+
+    async def update_bot_data(self, data):
+        self._stage(BOT_DATA, '', data)
+
+    async def update_callback_data(self, data):
+        pass
+
+    async def drop_user_data(self, user_id):
+        self._stage(USER_DATA, str(user_id), DELETED)
+
+    async def drop_chat_data(self, chat_id):
+        self._stage(CHAT_DATA, str(chat_id), DELETED)
+
+    async def refresh_user_data(self, user_id, user_data):
+        pass
+
+    async def refresh_chat_data(self, chat_id, chat_data):
+        pass
+
+    async def refresh_bot_data(self, bot_data):
+        pass
+
+    async def flush(self):
+        if self._commit_task is not None:
+            await self._commit_task
+        if self._pending:
+            await self._commit()
+        if self._connection is not None:
+            await self._run(self._connection.close)
+            self._connection = None
+        self._executor.shutdown(wait=True)
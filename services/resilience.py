@@ -0,0 +1,97 @@
+import time
+import random
+import asyncio
+import logging
+
+import httpx
+from telegram import Update
+from telegram.error import TelegramError
+
+from services import metrics
+
+logger = logging.getLogger(__name__)
+
+CLOSED, HALF_OPEN, OPEN = range(3)
+STATE_NAMES = {CLOSED: 'closed', HALF_OPEN: 'half-open', OPEN: 'open'}
+
+TRANSIENT_CODES = ('08', '40001', '53', '57', 'PGRST000', 'PGRST001', 'PGRST002', 'PGRST003')
+
+UNAVAILABLE_TEXT = "سرویس موقتا در دسترس نیست. لطفا چند لحظه دیگر دوباره تلاش کنید."
+ERROR_TEXT = "خطایی رخ داد. لطفا دوباره تلاش کنید."
+
+
+class Unavailable(Exception):
+    pass
+
+
+def is_transient(error):
+    if isinstance(error, (Unavailable, asyncio.TimeoutError, httpx.TransportError)):
+        return True
+    from postgrest.exceptions import APIError
+    if isinstance(error, APIError):
+        code = str(error.code or '')
+        return (len(code) == 3 and code.startswith('5')) or code.startswith(TRANSIENT_CODES)
+    return False
+
+
+def backoff(attempt, base, cap):
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def error_text(error, text=ERROR_TEXT):
+    return UNAVAILABLE_TEXT if isinstance(error, Unavailable) else text
+
+
+class CircuitBreaker:
+    def __init__(self, name, threshold, reset_timeout):
+        self.name = name
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self._retry_at = 0.0
+        metrics.BREAKER_STATE.set(CLOSED, name)
+
+    def _transition(self, state):
+        if state != self.state:
+            logger.warning(f"Circuit breaker {self.name} is now {STATE_NAMES[state]}")
+            self.state = state
+            metrics.BREAKER_STATE.set(state, self.name)
+
+    def allow(self):
+        if self.state == CLOSED:
+            return True
+        now = time.monotonic()
+        if now < self._retry_at:
+            return False
+        self._retry_at = now + self.reset_timeout
+        self._transition(HALF_OPEN)
+        return True
+
+    def succeeded(self):
+        self.failures = 0
+        self._transition(CLOSED)
+
+    def failed(self):
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.threshold:
+            self._retry_at = time.monotonic() + self.reset_timeout
+            self._transition(OPEN)
+
+
+async def handle_error(update, context):
+    error = context.error
+    if isinstance(error, Unavailable):
+        logger.warning(f"Update could not be served: {error}")
+    else:
+        logger.error("Unhandled error while processing an update", exc_info=error)
+
+    if not isinstance(update, Update):
+        return
+    try:
+        if update.callback_query:
+            await update.callback_query.answer(error_text(error), show_alert=True)
+        elif update.effective_message:
+            await update.effective_message.reply_text(error_text(error))
+    except TelegramError:
+        pass
@@ -0,0 +1,167 @@
+import time
+import uuid
+import base64
+
+from services import metrics, user_cache
+
+PUBLIC, VERIFIED, ADMIN = range(3)
+ADMIN_ROLES = ('admin', 'superadmin')
+MAX_CALLBACK_BYTES = 64
+SEPARATOR = '|'
+
+DENIED = {
+    VERIFIED: "شما دسترسی ندارید.",
+    ADMIN: "شما دسترسی به پنل مدیریت ندارید."
+}
+
+
+class UUID:
+    @staticmethod
+    def encode(value):
+        return base64.urlsafe_b64encode(uuid.UUID(str(value)).bytes).rstrip(b'=').decode()
+
+    @staticmethod
+    def decode(raw):
+        if len(raw) == 36:
+            return str(uuid.UUID(raw))
+        return str(uuid.UUID(bytes=base64.urlsafe_b64decode(raw + '=' * (-len(raw) % 4))))
+
+
+class INT:
+    @staticmethod
+    def encode(value):
+        return str(int(value))
+
+    @staticmethod
+    def decode(raw):
+        return int(raw)
+
+
+class TEXT:
+    @staticmethod
+    def encode(value):
+        value = str(value)
+        if SEPARATOR in value:
+            raise ValueError(f"Callback payload may not contain {SEPARATOR!r}: {value!r}")
+        return value
+
+    @staticmethod
+    def decode(raw):
+        return raw
+
+
+class Callback:
+    def __init__(self, prefix, payload=None):
+        self.prefix = prefix
+        self.payload = payload
+
+    def data(self, value=None):
+        data = self.prefix if self.payload is None else f"{self.prefix}{self.payload.encode(value)}"
+        if len(data.encode()) > MAX_CALLBACK_BYTES:
+            raise ValueError(f"Callback data exceeds {MAX_CALLBACK_BYTES} bytes: {data!r}")
+        return data
+
+
+class Route:
+    __slots__ = ('callback', 'handler', 'auth', 'with_user', 'answer')
+
+    def __init__(self, callback, handler, auth, with_user, answer):
+        self.callback = callback
+        self.handler = handler
+        self.auth = auth
+        self.with_user = with_user
+        self.answer = answer
+
+
+def is_allowed(user, auth):
+    if auth == PUBLIC:
+        return True
+    if not user or not user['is_verified']:
+        return False
+    return auth != ADMIN or user['role'] in ADMIN_ROLES
+
+
+class CallbackRouter:
+    def __init__(self):
+        self._exact = {}
+        self._trie = {}
+
+    def add(self, callback, handler, auth=VERIFIED, with_user=False, answer=True):
+        if isinstance(callback, str):
+            callback = Callback(callback)
+        route = Route(callback, handler, auth, with_user, answer)
+
+        if callback.payload is None:
+            if callback.prefix in self._exact:
+                raise ValueError(f"Duplicate callback route: {callback.prefix!r}")
+            self._exact[callback.prefix] = route
+            return route
+
+        node = self._trie
+        for char in callback.prefix:
+            node = node.setdefault(char, {})
+        if None in node:
+            raise ValueError(f"Duplicate callback prefix: {callback.prefix!r}")
+        node[None] = route
+        return route
+
+    def resolve(self, data):
+        base = data.partition(SEPARATOR)[0]
+        route = self._exact.get(base)
+        if route is not None:
+            return route, None
+
+        node = self._trie
+        match = None
+        for index, char in enumerate(base):
+            node = node.get(char)
+            if node is None:
+                break
+            if None in node:
+                match = node[None], index + 1
+
+        if match is None:
+            return None, None
+
+        route, length = match
+        try:
+            return route, route.callback.payload.decode(base[length:])
+        except ValueError:
+            return None, None
+
+    async def dispatch(self, update, context):
+        query = update.callback_query
+        route, payload = self.resolve(query.data or '')
+
+        if route is None:
+            metrics.CALLBACK_LATENCY.observe(0.0, 'unrouted')
+            await query.answer()
+            return
+
+        started = time.perf_counter()
+        try:
+            await self._dispatch(route, payload, update, context)
+        finally:
+            metrics.CALLBACK_LATENCY.observe(time.perf_counter() - started, route.callback.prefix)
+
+    async def _dispatch(self, route, payload, update, context):
+        query = update.callback_query
+
+        user = None
+        if route.auth != PUBLIC or route.with_user:
+            user = await user_cache.get_user(update.effective_user.id)
+
+        if not is_allowed(user, route.auth):
+            await query.answer()
+            await query.edit_message_text(DENIED[route.auth])
+            return
+
+        if route.answer:
+            await query.answer()
+
+        args = []
+        if route.with_user:
+            args.append(user)
+        if route.callback.payload is not None:
+            args.append(payload)
+        await route.handler(query, context, *args)
@@ -0,0 +1,45 @@
+import functools
+
+from telegram import Update
+
+from services import config, metrics, user_cache
+from services.update_processor import PerUserUpdateProcessor
+
+PERSISTENT = config.PERSISTENCE_BACKEND == 'sqlite'
+
+
+def configure(builder):
+    builder = builder.concurrent_updates(PerUserUpdateProcessor(config.UPDATE_WORKERS))
+    if config.METRICS_ENABLED:
+        builder = builder.request(metrics.InstrumentedRequest(connection_pool_size=config.TELEGRAM_POOL_SIZE))
+    if PERSISTENT:
+        from services.persistence import SQLitePersistence
+        builder = builder.persistence(SQLitePersistence(config.PERSISTENCE_PATH, config.PERSISTENCE_INTERVAL))
+    if config.TELEGRAM_API_BASE_URL:
+        base_url = config.TELEGRAM_API_BASE_URL.rstrip('/')
+        builder = builder.base_url(f"{base_url}/bot").base_file_url(f"{base_url}/file/bot")
+    if config.BOT_MODE == 'webhook':
+        builder = builder.updater(None)
+    return builder
+
+
+def _collect(application):
+    processor = application.update_processor
+    if hasattr(processor, 'stats'):
+        metrics.observe_update_processor(processor.stats())
+    metrics.observe_cache('user', user_cache.stats())
+
+
+def run(application):
+    if config.METRICS_ENABLED:
+        metrics.instrument_handlers(application)
+        metrics.collector(functools.partial(_collect, application))
+        metrics.start_server(config.METRICS_HOST, config.METRICS_PORT)
+    try:
+        if config.BOT_MODE == 'webhook':
+            from services import webhook
+            webhook.run(application)
+        else:
+            application.run_polling(allowed_updates=Update.ALL_TYPES)
+    finally:
+        metrics.stop_server()
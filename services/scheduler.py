@@ -0,0 +1,102 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+from services import broadcast, config, db, keyboards, pagination, tasks
+
+logger = logging.getLogger(__name__)
+
+INPUT_FORMAT = '%Y/%m/%d %H:%M'
+
+_wakeup = None
+
+
+def parse_time(text):
+    local = datetime.strptime(text.strip(), INPUT_FORMAT).replace(tzinfo=ZoneInfo(config.SCHEDULE_TIMEZONE))
+    return local.astimezone(timezone.utc)
+
+
+def format_time(moment):
+    return moment.astimezone(ZoneInfo(config.SCHEDULE_TIMEZONE)).strftime(INPUT_FORMAT)
+
+
+def announcement_text(announcement):
+    priority_icon = keyboards.PRIORITY_ICONS.get(announcement['priority'], '⚪')
+    return f"{priority_icon} اعلان جدید\n\n" \
+           f"📌 {announcement['title']}\n\n" \
+           f"{announcement['content']}"
+
+
+async def render_pending():
+    result = await db.execute(
+        db.table('announcements').select('id, title, content, priority')
+        .eq('is_published', False)
+        .is_('broadcast_text', 'null')
+    )
+    for announcement in result.data:
+        await db.execute(db.table('announcements').update({
+            'broadcast_text': announcement_text(announcement)
+        }).eq('id', announcement['id']))
+    return len(result.data)
+
+
+async def publish(application, announcement, notify_chat_id=None):
+    verified_users = await db.execute(db.table('users').select('telegram_id').eq('is_verified', True))
+    return await broadcast.start_broadcast(
+        application,
+        text=announcement_text(announcement),
+        recipients=[user['telegram_id'] for user in verified_users.data],
+        notify_chat_id=notify_chat_id,
+        announcement_id=announcement['id']
+    )
+
+
+async def publish_due(application):
+    result = await db.execute(db.rpc('claim_due_announcements', {'batch_size': config.SCHEDULER_BATCH_SIZE}))
+    claimed = result.data['broadcasts']
+
+    for row in claimed:
+        broadcast.launch(application, row)
+
+    if claimed:
+        logger.info(f"Published {len(claimed)} scheduled announcement(s)")
+
+    delay = config.SCHEDULER_INTERVAL
+    if result.data['next_due']:
+        next_due = pagination.parse_timestamp(result.data['next_due'])
+        delay = min(delay, max((next_due - datetime.now(timezone.utc)).total_seconds(), 0))
+    return delay
+
+
+async def _loop(application):
+    try:
+        rendered = await render_pending()
+        if rendered:
+            logger.info(f"Rendered {rendered} announcement(s) saved without broadcast text")
+    except Exception as e:
+        logger.error(f"Rendering pending announcements failed: {e}")
+
+    while True:
+        try:
+            delay = await publish_due(application)
+        except Exception as e:
+            logger.error(f"Announcement scheduler tick failed: {e}")
+            delay = config.SCHEDULER_INTERVAL
+
+        _wakeup.clear()
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+
+
+def wake():
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+def start(application):
+    global _wakeup
+    _wakeup = asyncio.Event()
+    tasks.spawn(_loop(application), name='announcement_scheduler')
@@ -0,0 +1,200 @@
+import re
+import bisect
+import heapq
+import asyncio
+import logging
+
+from services import config, db, pagination, tasks
+
+logger = logging.getLogger(__name__)
+
+TITLE_WEIGHT = 2
+BODY_WEIGHT = 1
+BODY_LIMIT = 500
+FETCH_SIZE = 500
+
+_TRANSLATE = str.maketrans({
+    'ي': 'ی', 'ى': 'ی', 'ك': 'ک', 'ة': 'ه', 'أ': 'ا', 'إ': 'ا', 'آ': 'ا', '\u200c': ' ',
+    **{persian: str(digit) for digit, persian in enumerate('۰۱۲۳۴۵۶۷۸۹')},
+    **{arabic: str(digit) for digit, arabic in enumerate('٠١٢٣٤٥٦٧٨٩')}
+})
+_DIACRITICS = re.compile('[\u064b-\u065f\u0670\u0640]')
+_WORD = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return _WORD.findall(_DIACRITICS.sub('', (text or '').lower().translate(_TRANSLATE)))
+
+
+class PrefixIndex:
+    def __init__(self):
+        self.entries = {}
+        self._postings = {}
+        self._tokens = []
+        self._entry_tokens = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, key, entry, title, body):
+        self.remove(key)
+        weights = {token: BODY_WEIGHT for token in tokenize(body)}
+        weights.update((token, TITLE_WEIGHT) for token in tokenize(title))
+
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                bisect.insort(self._tokens, token)
+            postings[key] = weight
+        self.entries[key] = entry
+        self._entry_tokens[key] = list(weights)
+
+    def remove(self, key):
+        for token in self._entry_tokens.pop(key, ()):
+            postings = self._postings[token]
+            postings.pop(key, None)
+            if not postings:
+                del self._postings[token]
+                del self._tokens[bisect.bisect_left(self._tokens, token)]
+        self.entries.pop(key, None)
+
+    def _prefix_matches(self, prefix):
+        matches = {}
+        position = bisect.bisect_left(self._tokens, prefix)
+        while position < len(self._tokens) and self._tokens[position].startswith(prefix):
+            for key, weight in self._postings[self._tokens[position]].items():
+                if weight > matches.get(key, 0):
+                    matches[key] = weight
+            position += 1
+        return matches
+
+    def search(self, text, limit, offset=0):
+        terms = sorted(set(tokenize(text)), key=len, reverse=True)
+        if not terms:
+            return []
+
+        scores = None
+        for term in terms:
+            matches = self._prefix_matches(term)
+            if scores is None:
+                scores = matches
+            else:
+                scores = {key: score + matches[key] for key, score in scores.items() if key in matches}
+            if not scores:
+                return []
+
+        ranked = heapq.nlargest(
+            offset + limit, scores,
+            key=lambda key: (scores[key], self.entries[key]['created_at'])
+        )
+        return [self.entries[key] for key in ranked[offset:]]
+
+
+def _resource_entry(row):
+    entry = {
+        'kind': 'resource',
+        'id': row['id'],
+        'title': row['title'],
+        'category': row['category'],
+        'description': (row['description'] or '')[:BODY_LIMIT],
+        'file_url': row['file_url'],
+        'file_id': row['file_id'],
+        'media_type': row['media_type'],
+        'created_at': pagination.parse_timestamp(row['created_at']).timestamp()
+    }
+    body = ' '.join([row['description'] or '', *(row['tags'] or [])])
+    return f"r{row['id']}", entry, row['title'], body[:BODY_LIMIT]
+
+
+def _question_entry(row):
+    entry = {
+        'kind': 'question',
+        'id': row['id'],
+        'title': row['title'],
+        'category': row['category'],
+        'description': row['content'][:BODY_LIMIT],
+        'file_url': None,
+        'file_id': None,
+        'media_type': None,
+        'created_at': pagination.parse_timestamp(row['created_at']).timestamp()
+    }
+    return f"q{row['id']}", entry, row['title'], row['content'][:BODY_LIMIT]
+
+
+SOURCES = {
+    'resource': ('resources', 'id, title, description, category, tags, file_url, file_id, media_type, created_at', _resource_entry),
+    'question': ('questions', 'id, title, content, category, created_at', _question_entry)
+}
+
+_index = PrefixIndex()
+_cursors = {}
+_ready = False
+
+
+def ready():
+    return _ready
+
+
+def search(text, limit, offset=0):
+    return _index.search(text, limit, offset)
+
+
+def add_resource(row):
+    _index.add(*_resource_entry(row))
+
+
+def add_question(row):
+    _index.add(*_question_entry(row))
+
+
+async def _load(index, cursors, kind):
+    table, columns, entry = SOURCES[kind]
+    loaded = 0
+    while True:
+        page = await pagination.fetch_page(
+            db.table(table).select(columns), 'created_at',
+            descending=False, cursor=cursors.get(kind), page_size=FETCH_SIZE
+        )
+        for row in page.rows:
+            index.add(*entry(row))
+        if page.rows:
+            cursors[kind] = page.last_cursor()
+        loaded += len(page.rows)
+        if not page.has_next:
+            return loaded
+
+
+async def refresh():
+    added = await asyncio.gather(*(_load(_index, _cursors, kind) for kind in SOURCES))
+    if any(added):
+        logger.info(f"Search index picked up {sum(added)} new row(s), {len(_index)} indexed")
+
+
+async def rebuild():
+    global _index, _cursors, _ready
+    index, cursors = PrefixIndex(), {}
+    await asyncio.gather(*(_load(index, cursors, kind) for kind in SOURCES))
+    _index, _cursors, _ready = index, cursors, True
+    logger.info(f"Search index built with {len(index)} entries")
+
+
+async def _run():
+    while True:
+        try:
+            await rebuild()
+        except Exception as e:
+            logger.error(f"Building the search index failed: {e}")
+            await asyncio.sleep(config.SEARCH_INDEX_REFRESH_INTERVAL)
+            continue
+
+        for _ in range(max(int(config.SEARCH_INDEX_REBUILD_INTERVAL // config.SEARCH_INDEX_REFRESH_INTERVAL), 1)):
+            await asyncio.sleep(config.SEARCH_INDEX_REFRESH_INTERVAL)
+            try:
+                await refresh()
+            except Exception as e:
+                logger.error(f"Refreshing the search index failed: {e}")
+
+
+def start(application):
+    tasks.spawn(_run(), name='search_index')
@@ -0,0 +1,48 @@
+import time
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+_started = time.perf_counter()
+_last = _started
+_phases = []
+
+
+def mark(phase):
+    global _last
+    now = time.perf_counter()
+    _phases.append((phase, now - _last))
+    _last = now
+
+
+async def _timed(name, step):
+    started = time.perf_counter()
+    try:
+        result = step()
+        if asyncio.iscoroutine(result):
+            result = await result
+        detail = f" ({result})" if result is not None else ''
+        return f"{name} {(time.perf_counter() - started) * 1000:.0f} ms{detail}"
+    except Exception as e:
+        logger.warning(f"Startup step {name} failed: {e}")
+        return f"{name} failed"
+
+
+async def wait(phase, future):
+    try:
+        await asyncio.wrap_future(future)
+    except Exception as e:
+        logger.warning(f"Startup step {phase} failed: {e}")
+    mark(phase)
+
+
+async def warm(**steps):
+    results = await asyncio.gather(*(_timed(name, step) for name, step in steps.items()))
+    mark('warm-up')
+    logger.info(f"Warm-up: {', '.join(results)}")
+
+
+def report():
+    breakdown = ', '.join(f"{phase} {elapsed * 1000:.0f} ms" for phase, elapsed in _phases)
+    logger.info(f"Startup took {(_last - _started) * 1000:.0f} ms: {breakdown}")
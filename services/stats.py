@@ -0,0 +1,23 @@
+from services import config, db
+from services.cache import MISSING, TTLCache
+
+_snapshot = TTLCache(1, config.STATS_CACHE_TTL)
+
+
+async def get_stats():
+    stats = _snapshot.get('stats')
+    if stats is MISSING:
+        try:
+            result = await db.execute(db.rpc('bot_stats'), idempotent=True)
+        except db.Unavailable:
+            stats = _snapshot.stale('stats')
+            if stats is MISSING:
+                raise
+            return stats
+        stats = result.data
+        _snapshot.set('stats', stats)
+    return stats
+
+
+def invalidate():
+    _snapshot.clear()
@@ -0,0 +1,292 @@
+import socket
+import base64
+import asyncio
+import logging
+import ipaddress
+from urllib.parse import quote, urlsplit
+
+import httpx
+
+from services import config, db, tasks
+from services.cache import MISSING, TTLCache
+
+logger = logging.getLogger(__name__)
+
+TUS_VERSION = '1.0.0'
+
+PENDING = 'pending'
+UPLOADING = 'uploading'
+STORED = 'stored'
+FAILED = 'failed'
+TOO_LARGE = 'too_large'
+
+BOT_API_DOWNLOAD_LIMIT = 20 * 1024 * 1024
+
+RESOURCE_COLUMNS = 'id, category, storage_status, file_type, mime_type, file_id, file_url, file_size, storage_upload_url'
+
+_signed_urls = TTLCache(config.SIGNED_URL_CACHE_SIZE, config.SIGNED_URL_TTL / 2)
+_active = set()
+_storage_client = None
+_source_client = None
+_slots = None
+_bot = None
+
+
+def _clients():
+    global _storage_client, _source_client
+    if _storage_client is None:
+        key = config.SUPABASE_SERVICE_KEY or config.SUPABASE_KEY
+        _storage_client = httpx.AsyncClient(
+            headers={'apikey': key, 'Authorization': f"Bearer {key}"},
+            timeout=httpx.Timeout(config.STORAGE_TIMEOUT)
+        )
+        _source_client = httpx.AsyncClient(timeout=httpx.Timeout(config.STORAGE_TIMEOUT))
+    return _storage_client, _source_client
+
+
+def _storage_url(path):
+    return f"{config.SUPABASE_URL.rstrip('/')}/storage/v1/{path}"
+
+
+def object_path(resource):
+    return f"{resource['category']}/{resource['id']}.{resource['file_type'] or 'bin'}"
+
+
+def _metadata(**fields):
+    return ','.join(f"{key} {base64.b64encode(str(value).encode()).decode()}" for key, value in fields.items())
+
+
+async def _create_upload(resource, length):
+    storage, _ = _clients()
+    response = await storage.post(_storage_url('upload/resumable'), headers={
+        'Tus-Resumable': TUS_VERSION,
+        'Upload-Length': str(length),
+        'Upload-Metadata': _metadata(
+            bucketName=config.STORAGE_BUCKET,
+            objectName=object_path(resource),
+            contentType=resource['mime_type'] or 'application/octet-stream'
+        ),
+        'x-upsert': 'true'
+    })
+    response.raise_for_status()
+    return str(response.url.join(response.headers['Location']))
+
+
+async def _upload_progress(upload_url):
+    storage, _ = _clients()
+    response = await storage.head(upload_url, headers={'Tus-Resumable': TUS_VERSION})
+    if response.status_code in (404, 410):
+        return None, None
+    response.raise_for_status()
+    return int(response.headers['Upload-Offset']), int(response.headers['Upload-Length'])
+
+
+class _Chunks:
+    def __init__(self, pieces, skip):
+        self._pieces = pieces
+        self._skip = skip
+        self._leftover = b''
+
+    async def _next(self):
+        while True:
+            try:
+                data = await self._pieces.__anext__()
+            except StopAsyncIteration:
+                raise ValueError("source ended before the declared length") from None
+            if self._skip < len(data):
+                data, self._skip = data[self._skip:], 0
+                return data
+            self._skip -= len(data)
+
+    async def take(self, size):
+        while size > 0:
+            data = self._leftover or await self._next()
+            piece, self._leftover = data[:size], data[size:]
+            size -= len(piece)
+            yield piece
+
+
+async def _write_chunk(upload_url, offset, content, size):
+    storage, _ = _clients()
+    response = await storage.patch(upload_url, content=content, headers={
+        'Tus-Resumable': TUS_VERSION,
+        'Upload-Offset': str(offset),
+        'Content-Length': str(size),
+        'Content-Type': 'application/offset+octet-stream'
+    })
+    response.raise_for_status()
+    return int(response.headers['Upload-Offset'])
+
+
+class UnsafeSource(ValueError):
+    pass
+
+
+async def _check_source(url):
+    parts = urlsplit(url)
+    host = (parts.hostname or '').lower()
+    if parts.scheme not in ('http', 'https') or not host:
+        raise UnsafeSource(f"unsupported source URL {url!r}")
+    if config.STORAGE_SOURCE_HOSTS:
+        if host not in config.STORAGE_SOURCE_HOSTS:
+            raise UnsafeSource(f"source host {host} is not in STORAGE_SOURCE_HOSTS")
+        return
+
+    port = parts.port or (443 if parts.scheme == 'https' else 80)
+    for *_, address in await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM):
+        ip = ipaddress.ip_address(address[0])
+        if not ip.is_global or ip.is_multicast:
+            raise UnsafeSource(f"source host {host} resolves to non-public address {ip}")
+
+
+def _downloadable(resource):
+    return not resource['file_id'] or (resource['file_size'] or 0) <= BOT_API_DOWNLOAD_LIMIT
+
+
+def initial_status(resource):
+    if not config.STORAGE_ENABLED:
+        return None
+    return PENDING if _downloadable(resource) else TOO_LARGE
+
+
+async def _source_url(resource):
+    if resource['file_id']:
+        telegram_file = await _bot.get_file(resource['file_id'])
+        return telegram_file.file_path
+    await _check_source(resource['file_url'])
+    return resource['file_url']
+
+
+def _content_length(response, offset):
+    if response.status_code == 206:
+        return int(response.headers['Content-Range'].rsplit('/', 1)[-1]), 0
+    if 'Content-Length' in response.headers:
+        return int(response.headers['Content-Length']), offset
+    return None, offset
+
+
+async def _stream(resource, upload_url, offset, length):
+    _, source_client = _clients()
+    source = await _source_url(resource)
+    headers = {'Range': f"bytes={offset}-"} if offset else {}
+
+    async with source_client.stream('GET', source, headers=headers) as response:
+        response.raise_for_status()
+        source_length, skip = _content_length(response, offset)
+        length = length or source_length
+
+        if upload_url is None:
+            if length is None:
+                raise ValueError("source does not report its size")
+            upload_url = await _create_upload(resource, length)
+            await db.execute(db.table('resources').update({
+                'storage_status': UPLOADING,
+                'storage_upload_url': upload_url
+            }).eq('id', resource['id']))
+            resource['storage_upload_url'] = upload_url
+
+        chunks = _Chunks(response.aiter_bytes(), skip)
+        while offset < length:
+            size = min(config.STORAGE_CHUNK_SIZE, length - offset)
+            offset = await _write_chunk(upload_url, offset, chunks.take(size), size)
+
+    return offset, length
+
+
+async def _transfer(resource):
+    upload_url = resource['storage_upload_url']
+    offset, length = await _upload_progress(upload_url) if upload_url else (None, None)
+    if offset is None:
+        upload_url, offset, length = None, 0, None
+
+    if length is None or offset < length:
+        offset, length = await _stream(resource, upload_url, offset, length)
+
+    if offset != length:
+        raise ValueError(f"upload stopped at {offset} of {length} bytes")
+
+    await db.execute(db.table('resources').update({
+        'storage_status': STORED,
+        'storage_path': object_path(resource),
+        'storage_upload_url': None
+    }).eq('id', resource['id']))
+    return offset
+
+
+async def _offload(resource):
+    try:
+        if not _downloadable(resource):
+            await db.execute(db.table('resources').update({
+                'storage_status': TOO_LARGE,
+                'storage_upload_url': None
+            }).eq('id', resource['id']))
+            logger.warning(f"Resource {resource['id']} is larger than the Bot API download limit; keeping it on Telegram")
+            return
+
+        async with _slots:
+            for attempt in range(1, config.STORAGE_MAX_ATTEMPTS + 1):
+                try:
+                    size = await _transfer(resource)
+                    logger.info(f"Offloaded resource {resource['id']} to storage ({size} bytes)")
+                    return
+                except UnsafeSource as e:
+                    logger.warning(f"Not offloading resource {resource['id']}: {e}")
+                    break
+                except Exception as e:
+                    logger.warning(f"Offloading resource {resource['id']} failed (attempt {attempt}): {e}")
+                    if attempt < config.STORAGE_MAX_ATTEMPTS:
+                        await asyncio.sleep(min(2 ** attempt, 30))
+
+            await db.execute(db.table('resources').update({'storage_status': FAILED}).eq('id', resource['id']))
+            logger.error(f"Giving up on offloading resource {resource['id']}")
+    finally:
+        _active.discard(resource['id'])
+
+
+def enqueue(resource):
+    if _bot is None or resource['storage_status'] not in (PENDING, UPLOADING) or resource['id'] in _active:
+        return
+    _active.add(resource['id'])
+    tasks.spawn(_offload(resource), name=f"offload_{resource['id']}")
+
+
+async def sweep():
+    result = await db.execute(
+        db.table('resources').select(RESOURCE_COLUMNS)
+        .in_('storage_status', [PENDING, UPLOADING])
+        .order('created_at')
+        .limit(config.STORAGE_CONCURRENCY * 4)
+    )
+    for resource in result.data:
+        enqueue(resource)
+
+
+async def signed_url(path):
+    url = _signed_urls.get(path)
+    if url is MISSING:
+        storage, _ = _clients()
+        response = await storage.post(
+            _storage_url(f"object/sign/{config.STORAGE_BUCKET}/{quote(path)}"),
+            json={'expiresIn': config.SIGNED_URL_TTL}
+        )
+        response.raise_for_status()
+        url = _storage_url(response.json()['signedURL'].lstrip('/'))
+        _signed_urls.set(path, url)
+    return url
+
+
+def start(application):
+    global _bot, _slots
+    if not config.STORAGE_ENABLED:
+        return
+    _bot = application.bot
+    _slots = asyncio.Semaphore(config.STORAGE_CONCURRENCY)
+    tasks.spawn(sweep(), name='storage_resume')
+    tasks.spawn(tasks.every(config.STORAGE_SWEEP_INTERVAL, sweep), name='storage_sweep')
+
+
+async def close():
+    global _storage_client, _source_client
+    if _storage_client is not None:
+        await asyncio.gather(_storage_client.aclose(), _source_client.aclose())
+        _storage_client = _source_client = None
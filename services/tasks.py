@@ -0,0 +1,35 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+_tasks = set()
+
+
+def spawn(coroutine, name=None):
+    task = asyncio.create_task(coroutine, name=name)
+    _tasks.add(task)
+    task.add_done_callback(_task_done)
+    return task
+
+
+def _task_done(task):
+    _tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Background task {task.get_name()} failed: {task.exception()}")
+
+
+async def every(interval, func):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await func()
+        except Exception as e:
+            logger.error(f"Periodic task {func.__name__} failed: {e}")
+
+
+async def cancel_all():
+    pending = list(_tasks)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
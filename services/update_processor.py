@@ -0,0 +1,96 @@
+import sys
+import time
+import asyncio
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+
+def ordering_key(update):
+    if isinstance(update, Update):
+        if update.effective_user:
+            return update.effective_user.id
+        if update.effective_chat:
+            return update.effective_chat.id
+    return None
+
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    def __init__(self, workers):
+        super().__init__(sys.maxsize)
+        self.workers = workers
+        self._slots = asyncio.BoundedSemaphore(workers)
+        self._locks = {}
+        self.waiting = 0
+        self.active = 0
+        self.max_waiting = 0
+        self.processed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _lock_for(self, key):
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        return entry[0]
+
+    def _release_lock_ref(self, key):
+        entry = self._locks[key]
+        entry[1] -= 1
+        if entry[1] == 0:
+            del self._locks[key]
+
+    async def do_process_update(self, update, coroutine):
+        key = ordering_key(update)
+        received = time.monotonic()
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        started = False
+
+        lock = self._lock_for(key) if key is not None else None
+        try:
+            if lock is not None:
+                await lock.acquire()
+            try:
+                async with self._slots:
+                    self._record_start(received)
+                    started = True
+                    try:
+                        await coroutine
+                    finally:
+                        self.active -= 1
+            finally:
+                if lock is not None:
+                    lock.release()
+        finally:
+            if not started:
+                self.waiting -= 1
+            if key is not None:
+                self._release_lock_ref(key)
+
+    def _record_start(self, received):
+        wait = time.monotonic() - received
+        self.waiting -= 1
+        self.active += 1
+        self.processed += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    def stats(self):
+        return {
+            'workers': self.workers,
+            'waiting': self.waiting,
+            'active': self.active,
+            'max_waiting': self.max_waiting,
+            'processed': self.processed,
+            'avg_wait_ms': self.total_wait / self.processed * 1000 if self.processed else 0.0,
+            'total_wait_ms': self.total_wait * 1000,
+            'max_wait_ms': self.max_wait * 1000
+        }
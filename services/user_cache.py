@@ -0,0 +1,49 @@
+from services import config, counters, db
+from services.cache import MISSING, TTLCache
+
+_cache = TTLCache(config.USER_CACHE_SIZE, config.USER_CACHE_TTL)
+
+
+async def get_user(telegram_id):
+    counters.touch(telegram_id)
+    user = _cache.get(telegram_id)
+    if user is not MISSING:
+        return user
+
+    try:
+        result = await db.execute(db.table('users').select('*').eq('telegram_id', telegram_id))
+    except db.Unavailable:
+        user = _cache.stale(telegram_id)
+        if user is MISSING:
+            raise
+        return user
+
+    user = result.data[0] if result.data else None
+    _cache.set(telegram_id, user)
+    return user
+
+
+async def warm():
+    if config.USER_CACHE_WARM_SIZE <= 0:
+        return 0
+
+    result = await db.execute(
+        db.table('users').select('*')
+        .order('last_activity', desc=True)
+        .limit(min(config.USER_CACHE_WARM_SIZE, config.USER_CACHE_SIZE))
+    )
+    for user in result.data:
+        _cache.set(user['telegram_id'], user)
+    return len(result.data)
+
+
+def invalidate(telegram_id):
+    _cache.pop(telegram_id)
+
+
+def clear():
+    _cache.clear()
+
+
+def stats():
+    return _cache.stats()
@@ -0,0 +1,88 @@
+import asyncio
+import logging
+import secrets
+
+from telegram import Update
+
+from services import config
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+
+
+def create_app(application, secret_token):
+    from starlette.applications import Starlette
+    from starlette.requests import Request
+    from starlette.responses import PlainTextResponse, Response
+    from starlette.routing import Route
+
+    async def telegram(request: Request):
+        if not secrets.compare_digest(request.headers.get(SECRET_HEADER, ''), secret_token):
+            return Response(status_code=403)
+
+        if application.update_queue.qsize() >= config.WEBHOOK_MAX_PENDING_UPDATES:
+            return Response(status_code=503)
+
+        try:
+            update = Update.de_json(await request.json(), application.bot)
+        except ValueError:
+            return Response(status_code=400)
+
+        await application.update_queue.put(update)
+        return Response()
+
+    async def health(request: Request):
+        return PlainTextResponse(f"ok {application.update_queue.qsize()}")
+
+    return Starlette(routes=[
+        Route(config.WEBHOOK_PATH, telegram, methods=['POST']),
+        Route('/healthz', health, methods=['GET'])
+    ])
+
+
+def create_server(application, secret_token):
+    import uvicorn
+
+    return uvicorn.Server(uvicorn.Config(
+        create_app(application, secret_token),
+        host=config.WEBHOOK_LISTEN,
+        port=config.WEBHOOK_PORT,
+        log_level='warning',
+        use_colors=False
+    ))
+
+
+async def serve(application, server=None):
+    secret_token = config.WEBHOOK_SECRET or secrets.token_urlsafe(32)
+    server = server or create_server(application, secret_token)
+
+    async with application:
+        if application.post_init:
+            await application.post_init(application)
+
+        if config.WEBHOOK_URL:
+            await application.bot.set_webhook(
+                url=f"{config.WEBHOOK_URL.rstrip('/')}{config.WEBHOOK_PATH}",
+                secret_token=secret_token,
+                max_connections=config.WEBHOOK_MAX_CONNECTIONS,
+                allowed_updates=Update.ALL_TYPES
+            )
+        else:
+            logger.warning("WEBHOOK_URL is not set, skipping setWebhook")
+
+        await application.start()
+        logger.info(f"Webhook server listening on {config.WEBHOOK_LISTEN}:{config.WEBHOOK_PORT}{config.WEBHOOK_PATH}")
+        try:
+            await server.serve()
+        finally:
+            await application.stop()
+            if application.post_stop:
+                await application.post_stop(application)
+
+    if application.post_shutdown:
+        await application.post_shutdown(application)
+
+
+def run(application):
+    asyncio.run(serve(application))
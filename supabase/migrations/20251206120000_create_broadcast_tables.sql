@@ -0,0 +1,77 @@
+/*
+  # Broadcast delivery tracking
+
+  1. New Tables
+    - `broadcasts`
+      - `id` (uuid, primary key)
+      - `announcement_id` (uuid, foreign key to announcements)
+      - `text` (text) - Message body sent to every recipient
+      - `notify_chat_id` (bigint) - Telegram chat that receives progress reports
+      - `status` (text) - pending, running, done
+      - `total_count` (integer)
+      - `sent_count` (integer)
+      - `failed_count` (integer)
+      - `created_at` (timestamptz)
+      - `finished_at` (timestamptz)
+
+    - `broadcast_deliveries`
+      - `broadcast_id` (uuid, foreign key to broadcasts)
+      - `telegram_id` (bigint) - Recipient chat
+      - `status` (text) - pending, sent, failed
+      - `attempts` (integer)
+      - `error` (text) - Last delivery error, if any
+      - `updated_at` (timestamptz)
+
+  2. Security
+    - Enable RLS on both tables
+    - Admin-only access
+*/
+
+CREATE TABLE IF NOT EXISTS broadcasts (
+  id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+  announcement_id uuid REFERENCES announcements(id) ON DELETE SET NULL,
+  text text NOT NULL,
+  notify_chat_id bigint,
+  status text DEFAULT 'pending' CHECK (status IN ('pending', 'running', 'done')),
+  total_count integer DEFAULT 0,
+  sent_count integer DEFAULT 0,
+  failed_count integer DEFAULT 0,
+  created_at timestamptz DEFAULT now(),
+  finished_at timestamptz
+);
+
+CREATE TABLE IF NOT EXISTS broadcast_deliveries (
+  broadcast_id uuid REFERENCES broadcasts(id) ON DELETE CASCADE,
+  telegram_id bigint NOT NULL,
+  status text DEFAULT 'pending' CHECK (status IN ('pending', 'sent', 'failed')),
+  attempts integer DEFAULT 0,
+  error text,
+  updated_at timestamptz DEFAULT now(),
+  PRIMARY KEY (broadcast_id, telegram_id)
+);
+
+ALTER TABLE broadcasts ENABLE ROW LEVEL SECURITY;
+ALTER TABLE broadcast_deliveries ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Admins can manage broadcasts"
+  ON broadcasts FOR ALL
+  USING (
+    EXISTS (
+      SELECT 1 FROM users
+      WHERE users.telegram_id = (current_setting('app.telegram_id', true))::bigint
+      AND users.role IN ('admin', 'superadmin')
+    )
+  );
+
+CREATE POLICY "Admins can manage broadcast deliveries"
+  ON broadcast_deliveries FOR ALL
+  USING (
+    EXISTS (
+      SELECT 1 FROM users
+      WHERE users.telegram_id = (current_setting('app.telegram_id', true))::bigint
+      AND users.role IN ('admin', 'superadmin')
+    )
+  );
+
+CREATE INDEX IF NOT EXISTS idx_broadcasts_status ON broadcasts(status);
+CREATE INDEX IF NOT EXISTS idx_broadcast_deliveries_pending ON broadcast_deliveries(broadcast_id, status);
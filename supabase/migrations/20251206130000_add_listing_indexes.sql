@@ -0,0 +1,12 @@
+/*
+  # Indexes for keyset-paginated listings
+
+  1. Indexes
+    - `users(is_verified, joined_at, id)` for the pending members list
+    - `questions(created_at DESC, id DESC)` for recent questions across categories
+    - `events(is_active, event_date, id)` for upcoming events
+*/
+
+CREATE INDEX IF NOT EXISTS idx_users_pending ON users(is_verified, joined_at, id);
+CREATE INDEX IF NOT EXISTS idx_questions_created_at ON questions(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_events_active_date ON events(is_active, event_date, id);
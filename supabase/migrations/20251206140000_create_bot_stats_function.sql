@@ -0,0 +1,34 @@
+/*
+  # Aggregate statistics function
+
+  1. New Functions
+    - `bot_stats()` returns every counter shown on the admin stats screen
+      and the pending-members badge as a single jsonb object, so the bot
+      needs one round-trip instead of one count query per table.
+*/
+
+CREATE OR REPLACE FUNCTION bot_stats()
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  WITH user_counts AS (
+    SELECT
+      count(*) AS total_users,
+      count(*) FILTER (WHERE is_verified) AS verified_users,
+      count(*) FILTER (WHERE NOT is_verified) AS pending_users
+    FROM users
+  )
+  SELECT jsonb_build_object(
+    'total_users', user_counts.total_users,
+    'verified_users', user_counts.verified_users,
+    'pending_users', user_counts.pending_users,
+    'announcements', (SELECT count(*) FROM announcements),
+    'events', (SELECT count(*) FROM events),
+    'questions', (SELECT count(*) FROM questions),
+    'resources', (SELECT count(*) FROM resources)
+  )
+  FROM user_counts;
+$$;
@@ -0,0 +1,30 @@
+/*
+  # Batched view and download counters
+
+  1. New Functions
+    - `apply_counter_deltas(question_views, resource_downloads)` adds the
+      summed per-row deltas collected by the bot in a single call. Both
+      arguments are jsonb objects mapping row id to increment. The
+      increments are applied server-side, so concurrent flushes never
+      overwrite each other.
+*/
+
+CREATE OR REPLACE FUNCTION apply_counter_deltas(
+  question_views jsonb DEFAULT '{}'::jsonb,
+  resource_downloads jsonb DEFAULT '{}'::jsonb
+)
+RETURNS void
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  UPDATE questions
+  SET views_count = questions.views_count + deltas.value::integer
+  FROM jsonb_each_text(question_views) AS deltas
+  WHERE questions.id = deltas.key::uuid;
+
+  UPDATE resources
+  SET downloads_count = resources.downloads_count + deltas.value::integer
+  FROM jsonb_each_text(resource_downloads) AS deltas
+  WHERE resources.id = deltas.key::uuid;
+$$;
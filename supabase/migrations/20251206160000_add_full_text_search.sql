@@ -0,0 +1,98 @@
+/*
+  # Full-text search over questions and resources
+
+  1. Changes
+    - `questions.search_vector` (tsvector, generated) - weighted title + content
+    - `resources.search_vector` (tsvector, generated) - weighted title + tags + description
+    - The `simple` configuration is used so Persian and English words are
+      indexed as-is; a trigram index on titles covers partial words.
+
+  2. New Functions
+    - `search_content(search_query, result_limit, result_offset)` returns
+      ranked questions and resources matching the query in one call.
+
+  3. Indexes
+    - GIN on both `search_vector` columns
+    - Trigram GIN on both `title` columns
+*/
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE OR REPLACE FUNCTION immutable_array_to_string(text[])
+RETURNS text
+LANGUAGE sql
+IMMUTABLE
+AS $$
+  SELECT array_to_string($1, ' ');
+$$;
+
+ALTER TABLE questions ADD COLUMN IF NOT EXISTS search_vector tsvector
+  GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(content, '')), 'B')
+  ) STORED;
+
+ALTER TABLE resources ADD COLUMN IF NOT EXISTS search_vector tsvector
+  GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(immutable_array_to_string(tags), '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+  ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_questions_search ON questions USING gin(search_vector);
+CREATE INDEX IF NOT EXISTS idx_resources_search ON resources USING gin(search_vector);
+CREATE INDEX IF NOT EXISTS idx_questions_title_trgm ON questions USING gin(title gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_resources_title_trgm ON resources USING gin(title gin_trgm_ops);
+
+CREATE OR REPLACE FUNCTION search_content(
+  search_query text,
+  result_limit integer DEFAULT 10,
+  result_offset integer DEFAULT 0
+)
+RETURNS TABLE (
+  kind text,
+  id uuid,
+  title text,
+  category text,
+  description text,
+  file_url text,
+  rank real
+)
+LANGUAGE sql
+STABLE
+AS $$
+  WITH query AS (
+    SELECT websearch_to_tsquery('simple', search_query) AS tsq
+  )
+  SELECT results.*
+  FROM (
+    SELECT
+      'question'::text,
+      questions.id,
+      questions.title,
+      questions.category,
+      questions.content,
+      NULL::text,
+      ts_rank(questions.search_vector, query.tsq) + similarity(questions.title, search_query)
+    FROM questions, query
+    WHERE questions.search_vector @@ query.tsq
+       OR questions.title % search_query
+
+    UNION ALL
+
+    SELECT
+      'resource'::text,
+      resources.id,
+      resources.title,
+      resources.category,
+      resources.description,
+      resources.file_url,
+      ts_rank(resources.search_vector, query.tsq) + similarity(resources.title, search_query)
+    FROM resources, query
+    WHERE resources.search_vector @@ query.tsq
+       OR resources.title % search_query
+  ) AS results (kind, id, title, category, description, file_url, rank)
+  ORDER BY results.rank DESC, results.id
+  LIMIT result_limit
+  OFFSET result_offset;
+$$;
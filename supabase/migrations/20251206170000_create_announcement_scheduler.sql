@@ -0,0 +1,64 @@
+/*
+  # Scheduled announcement publishing
+
+  1. Indexes
+    - `announcements(scheduled_for) WHERE NOT is_published`, a partial
+      index over the queue of announcements waiting to be published
+
+  2. New Functions
+    - `claim_due_announcements(batch_size)` marks up to `batch_size` due
+      announcements as published and returns them together with the
+      creator's telegram id, plus the time the next one becomes due.
+      Rows are claimed with `FOR UPDATE SKIP LOCKED`, so two bot
+      instances never publish the same announcement twice.
+*/
+
+CREATE INDEX IF NOT EXISTS idx_announcements_scheduled
+  ON announcements(scheduled_for)
+  WHERE NOT is_published;
+
+CREATE OR REPLACE FUNCTION claim_due_announcements(batch_size integer DEFAULT 20)
+RETURNS jsonb
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  claimed jsonb;
+  next_due timestamptz;
+BEGIN
+  WITH due AS (
+    SELECT id
+    FROM announcements
+    WHERE NOT is_published AND scheduled_for <= now()
+    ORDER BY scheduled_for
+    LIMIT batch_size
+    FOR UPDATE SKIP LOCKED
+  ),
+  published AS (
+    UPDATE announcements
+    SET is_published = true
+    FROM due
+    WHERE announcements.id = due.id
+    RETURNING announcements.id, announcements.title, announcements.content, announcements.priority,
+              announcements.scheduled_for, announcements.created_by
+  )
+  SELECT coalesce(
+    jsonb_agg(
+      to_jsonb(published) || jsonb_build_object('notify_chat_id', users.telegram_id)
+      ORDER BY published.scheduled_for
+    ),
+    '[]'::jsonb
+  )
+  INTO claimed
+  FROM published
+  LEFT JOIN users ON users.id = published.created_by;
+
+  SELECT min(scheduled_for)
+  INTO next_due
+  FROM announcements
+  WHERE NOT is_published AND scheduled_for IS NOT NULL;
+
+  RETURN jsonb_build_object('announcements', claimed, 'next_due', next_due);
+END;
+$$;
@@ -0,0 +1,151 @@
+/*
+  # Atomic event registration with a waitlist
+
+  1. Changes
+    - `event_registrations.status` also accepts `waitlisted`
+    - Partial index on waitlisted registrations in arrival order
+
+  2. New Functions
+    - `register_for_event(target_event, member_id)` locks the event row,
+      then either takes a seat (incrementing `registered_count`) or puts
+      the member on the waitlist. Concurrent taps on the same event are
+      serialized by the row lock, so the event is never oversold.
+    - `cancel_event_registration(target_event, member_id)` releases the
+      member's seat or waitlist spot. A released seat goes to the oldest
+      waitlisted member, whose telegram id is returned so the bot can
+      notify them.
+*/
+
+ALTER TABLE event_registrations DROP CONSTRAINT IF EXISTS event_registrations_status_check;
+ALTER TABLE event_registrations ADD CONSTRAINT event_registrations_status_check
+  CHECK (status IN ('registered', 'waitlisted', 'attended', 'cancelled'));
+
+CREATE INDEX IF NOT EXISTS idx_event_registrations_waitlist
+  ON event_registrations(event_id, registered_at)
+  WHERE status = 'waitlisted';
+
+CREATE OR REPLACE FUNCTION register_for_event(target_event uuid, member_id uuid)
+RETURNS jsonb
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  event_row events%ROWTYPE;
+  current_status text;
+  new_status text;
+  waitlist_position bigint;
+BEGIN
+  SELECT * INTO event_row
+  FROM events
+  WHERE id = target_event AND is_active
+  FOR UPDATE;
+
+  IF NOT FOUND THEN
+    RETURN jsonb_build_object('status', 'not_found');
+  END IF;
+
+  SELECT status INTO current_status
+  FROM event_registrations
+  WHERE event_id = target_event AND user_id = member_id;
+
+  IF current_status IN ('registered', 'waitlisted', 'attended') THEN
+    RETURN jsonb_build_object(
+      'status', 'already_' || current_status,
+      'registered_count', event_row.registered_count,
+      'capacity', event_row.capacity
+    );
+  END IF;
+
+  IF event_row.capacity IS NULL OR event_row.registered_count < event_row.capacity THEN
+    new_status := 'registered';
+    UPDATE events
+    SET registered_count = registered_count + 1
+    WHERE id = target_event
+    RETURNING registered_count INTO event_row.registered_count;
+  ELSE
+    new_status := 'waitlisted';
+  END IF;
+
+  INSERT INTO event_registrations (event_id, user_id, status, registered_at)
+  VALUES (target_event, member_id, new_status, now())
+  ON CONFLICT (event_id, user_id)
+  DO UPDATE SET status = EXCLUDED.status, registered_at = EXCLUDED.registered_at;
+
+  IF new_status = 'waitlisted' THEN
+    SELECT count(*) INTO waitlist_position
+    FROM event_registrations
+    WHERE event_id = target_event AND status = 'waitlisted';
+  END IF;
+
+  RETURN jsonb_build_object(
+    'status', new_status,
+    'registered_count', event_row.registered_count,
+    'capacity', event_row.capacity,
+    'position', waitlist_position
+  );
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION cancel_event_registration(target_event uuid, member_id uuid)
+RETURNS jsonb
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  event_row events%ROWTYPE;
+  current_status text;
+  promoted_id uuid;
+  promoted_telegram_id bigint;
+BEGIN
+  SELECT * INTO event_row
+  FROM events
+  WHERE id = target_event
+  FOR UPDATE;
+
+  IF NOT FOUND THEN
+    RETURN jsonb_build_object('status', 'not_found');
+  END IF;
+
+  SELECT status INTO current_status
+  FROM event_registrations
+  WHERE event_id = target_event AND user_id = member_id;
+
+  IF current_status IS NULL OR current_status NOT IN ('registered', 'waitlisted') THEN
+    RETURN jsonb_build_object('status', 'not_registered');
+  END IF;
+
+  UPDATE event_registrations
+  SET status = 'cancelled'
+  WHERE event_id = target_event AND user_id = member_id;
+
+  IF current_status = 'registered' THEN
+    SELECT user_id INTO promoted_id
+    FROM event_registrations
+    WHERE event_id = target_event AND status = 'waitlisted'
+    ORDER BY registered_at
+    LIMIT 1;
+
+    IF promoted_id IS NULL THEN
+      UPDATE events
+      SET registered_count = greatest(registered_count - 1, 0)
+      WHERE id = target_event
+      RETURNING registered_count INTO event_row.registered_count;
+    ELSE
+      UPDATE event_registrations
+      SET status = 'registered'
+      WHERE event_id = target_event AND user_id = promoted_id;
+
+      SELECT telegram_id INTO promoted_telegram_id FROM users WHERE id = promoted_id;
+    END IF;
+  END IF;
+
+  RETURN jsonb_build_object(
+    'status', 'cancelled',
+    'registered_count', event_row.registered_count,
+    'capacity', event_row.capacity,
+    'promoted_telegram_id', promoted_telegram_id
+  );
+END;
+$$;
@@ -0,0 +1,27 @@
+/*
+  # Pending members grouped by entry year
+
+  1. Indexes
+    - Partial index on `users(year)` covering unverified members only
+
+  2. New Functions
+    - `pending_registrations_by_year()` returns one row per entry year with
+      the number of members still waiting for approval. The bulk moderation
+      menu uses it instead of downloading the whole pending list.
+*/
+
+CREATE INDEX IF NOT EXISTS idx_users_pending_year ON users(year) WHERE NOT is_verified;
+
+CREATE OR REPLACE FUNCTION pending_registrations_by_year()
+RETURNS TABLE (year integer, pending bigint)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT users.year, count(*)
+  FROM users
+  WHERE NOT users.is_verified AND users.year IS NOT NULL
+  GROUP BY users.year
+  ORDER BY users.year DESC;
+$$;
@@ -0,0 +1,26 @@
+/*
+  # Telegram-hosted resource files
+
+  1. Modified Tables
+    - `resources`
+      - `media_type` (text) - `document`, `video` or `photo`; selects the send method
+      - `file_id` (text) - Telegram file id used to resend the file without re-uploading
+      - `file_unique_id` (text) - Telegram's stable identifier for the same file
+      - `file_size` (bigint)
+      - `mime_type` (text)
+      - `content_hash` (text) - SHA-256 of the file contents, when small enough to fetch
+
+  2. Indexes
+    - Unique partial indexes on `file_unique_id` and `content_hash` so the same
+      file cannot be stored twice even when two uploads race
+*/
+
+ALTER TABLE resources ADD COLUMN IF NOT EXISTS media_type text;
+ALTER TABLE resources ADD COLUMN IF NOT EXISTS file_id text;
+ALTER TABLE resources ADD COLUMN IF NOT EXISTS file_unique_id text;
+ALTER TABLE resources ADD COLUMN IF NOT EXISTS file_size bigint;
+ALTER TABLE resources ADD COLUMN IF NOT EXISTS mime_type text;
+ALTER TABLE resources ADD COLUMN IF NOT EXISTS content_hash text;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_resources_file_unique_id ON resources(file_unique_id) WHERE file_unique_id IS NOT NULL;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_resources_content_hash ON resources(content_hash) WHERE content_hash IS NOT NULL;
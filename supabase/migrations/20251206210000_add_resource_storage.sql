@@ -0,0 +1,36 @@
+/*
+  # Object storage offload for resources
+
+  1. Modified Tables
+    - `resources`
+      - `storage_status` (text) - pending, uploading, stored, failed; NULL when the
+        file stays on Telegram only
+      - `storage_path` (text) - object key inside the `resources` bucket
+      - `storage_upload_url` (text) - resumable (TUS) upload in progress, kept so an
+        interrupted transfer continues from the last stored chunk
+
+  2. Storage
+    - Private `resources` bucket; files are served through short-lived signed URLs
+
+  3. Data
+    - Existing resources that only point at an external link are queued for offload
+
+  4. Indexes
+    - Partial index on unfinished transfers for the background sweep
+*/
+
+ALTER TABLE resources ADD COLUMN IF NOT EXISTS storage_status text
+  CHECK (storage_status IN ('pending', 'uploading', 'stored', 'failed'));
+ALTER TABLE resources ADD COLUMN IF NOT EXISTS storage_path text;
+ALTER TABLE resources ADD COLUMN IF NOT EXISTS storage_upload_url text;
+
+INSERT INTO storage.buckets (id, name, public)
+VALUES ('resources', 'resources', false)
+ON CONFLICT (id) DO NOTHING;
+
+UPDATE resources
+SET storage_status = 'pending'
+WHERE file_url IS NOT NULL AND file_id IS NULL AND storage_status IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_resources_storage_pending ON resources(created_at)
+  WHERE storage_status IN ('pending', 'uploading');
@@ -0,0 +1,91 @@
+/*
+  # Create the broadcast together with the announcement claim
+
+  1. Modified Tables
+    - `announcements`
+      - `broadcast_text` (text) - message sent to members, rendered by the bot
+        when the announcement is saved so immediate and scheduled
+        announcements share one layout
+
+  2. Changed Functions
+    - `claim_due_announcements(batch_size)` now creates, in the same
+      transaction that marks due announcements as published, one pending
+      `broadcasts` row per announcement together with its
+      `broadcast_deliveries` snapshot of verified members. It returns the
+      created broadcasts instead of the announcements, plus the time the
+      next announcement becomes due.
+
+      Previously the claim committed before the bot inserted the
+      broadcast, so a failed recipient query or a crash in between left
+      the announcement published but never delivered. Now a claimed
+      announcement always has a broadcast that `resume_pending` picks up
+      after a restart, and `FOR UPDATE SKIP LOCKED` still keeps two bot
+      instances from claiming the same row.
+
+      Announcements without a rendered `broadcast_text` are left for the
+      bot, which fills them in when its scheduler starts.
+*/
+
+ALTER TABLE announcements ADD COLUMN IF NOT EXISTS broadcast_text text;
+
+CREATE OR REPLACE FUNCTION claim_due_announcements(batch_size integer DEFAULT 20)
+RETURNS jsonb
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  created jsonb;
+  next_due timestamptz;
+BEGIN
+  WITH due AS (
+    SELECT id
+    FROM announcements
+    WHERE NOT is_published AND scheduled_for <= now() AND broadcast_text IS NOT NULL
+    ORDER BY scheduled_for
+    LIMIT batch_size
+    FOR UPDATE SKIP LOCKED
+  ),
+  published AS (
+    UPDATE announcements
+    SET is_published = true
+    FROM due
+    WHERE announcements.id = due.id
+    RETURNING announcements.id, announcements.broadcast_text, announcements.created_by
+  ),
+  recipients AS (
+    SELECT count(*)::integer AS total
+    FROM users
+    WHERE is_verified
+  ),
+  inserted AS (
+    INSERT INTO broadcasts (announcement_id, text, notify_chat_id, status, total_count)
+    SELECT
+      published.id,
+      published.broadcast_text,
+      users.telegram_id,
+      'pending',
+      recipients.total
+    FROM published
+    CROSS JOIN recipients
+    LEFT JOIN users ON users.id = published.created_by
+    RETURNING *
+  )
+  SELECT coalesce(jsonb_agg(to_jsonb(inserted)), '[]'::jsonb)
+  INTO created
+  FROM inserted;
+
+  INSERT INTO broadcast_deliveries (broadcast_id, telegram_id)
+  SELECT claimed.id, users.telegram_id
+  FROM jsonb_to_recordset(created) AS claimed(id uuid)
+  CROSS JOIN users
+  WHERE users.is_verified;
+
+  SELECT min(scheduled_for)
+  INTO next_due
+  FROM announcements
+  WHERE NOT is_published AND scheduled_for IS NOT NULL AND broadcast_text IS NOT NULL;
+
+  RETURN jsonb_build_object('broadcasts', created, 'next_due', next_due);
+END;
+$$;
@@ -0,0 +1,73 @@
+/*
+  # Return Telegram file columns from search_content
+
+  1. Changed Functions
+    - `search_content(search_query, result_limit, result_offset)` now also
+      returns `file_id` and `media_type` (NULL for questions), so rows from
+      the RPC fallback have the same shape as rows from the in-memory
+      search index and resources with a Telegram file are sent as cached
+      media from either path.
+
+      The result columns change, so the function is dropped and recreated.
+*/
+
+DROP FUNCTION IF EXISTS search_content(text, integer, integer);
+
+CREATE FUNCTION search_content(
+  search_query text,
+  result_limit integer DEFAULT 10,
+  result_offset integer DEFAULT 0
+)
+RETURNS TABLE (
+  kind text,
+  id uuid,
+  title text,
+  category text,
+  description text,
+  file_url text,
+  file_id text,
+  media_type text,
+  rank real
+)
+LANGUAGE sql
+STABLE
+AS $$
+  WITH query AS (
+    SELECT websearch_to_tsquery('simple', search_query) AS tsq
+  )
+  SELECT results.*
+  FROM (
+    SELECT
+      'question'::text,
+      questions.id,
+      questions.title,
+      questions.category,
+      questions.content,
+      NULL::text,
+      NULL::text,
+      NULL::text,
+      ts_rank(questions.search_vector, query.tsq) + similarity(questions.title, search_query)
+    FROM questions, query
+    WHERE questions.search_vector @@ query.tsq
+       OR questions.title % search_query
+
+    UNION ALL
+
+    SELECT
+      'resource'::text,
+      resources.id,
+      resources.title,
+      resources.category,
+      resources.description,
+      resources.file_url,
+      resources.file_id,
+      resources.media_type,
+      ts_rank(resources.search_vector, query.tsq) + similarity(resources.title, search_query)
+    FROM resources, query
+    WHERE resources.search_vector @@ query.tsq
+       OR resources.title % search_query
+  ) AS results (kind, id, title, category, description, file_url, file_id, media_type, rank)
+  ORDER BY results.rank DESC, results.id
+  LIMIT result_limit
+  OFFSET result_offset;
+$$;
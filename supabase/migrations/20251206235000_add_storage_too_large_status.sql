@@ -0,0 +1,22 @@
+/*
+  # Keep files above the Bot API download limit on Telegram
+
+  1. Modified Tables
+    - `resources`
+      - `storage_status` also accepts `too_large`: the file has a Telegram
+        `file_id` but is bigger than the 20 MB the Bot API `getFile` method
+        serves, so it cannot be offloaded and is sent by `file_id` only
+
+  2. Data
+    - Unfinished transfers of such files are marked `too_large`
+*/
+
+ALTER TABLE resources DROP CONSTRAINT IF EXISTS resources_storage_status_check;
+ALTER TABLE resources ADD CONSTRAINT resources_storage_status_check
+  CHECK (storage_status IN ('pending', 'uploading', 'stored', 'failed', 'too_large'));
+
+UPDATE resources
+SET storage_status = 'too_large', storage_upload_url = NULL
+WHERE storage_status IN ('pending', 'uploading')
+  AND file_id IS NOT NULL
+  AND file_size > 20 * 1024 * 1024;
@@ -0,0 +1,46 @@
+/*
+  # Record member activity with the batched counter flush
+
+  1. Changed Functions
+    - `apply_counter_deltas(question_views, resource_downloads, user_activity)`
+      also takes `user_activity`, a jsonb object mapping telegram id to the
+      unix time the bot last handled that member, and moves
+      `users.last_activity` forward. Nothing wrote the column before, so it
+      kept its insert-time default.
+
+      The signature changes, so the function is dropped and recreated.
+
+  2. Indexes
+    - `users(last_activity DESC)` for loading the most recently active
+      members into the cache at startup
+*/
+
+DROP FUNCTION IF EXISTS apply_counter_deltas(jsonb, jsonb);
+
+CREATE FUNCTION apply_counter_deltas(
+  question_views jsonb DEFAULT '{}'::jsonb,
+  resource_downloads jsonb DEFAULT '{}'::jsonb,
+  user_activity jsonb DEFAULT '{}'::jsonb
+)
+RETURNS void
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  UPDATE questions
+  SET views_count = questions.views_count + deltas.value::integer
+  FROM jsonb_each_text(question_views) AS deltas
+  WHERE questions.id = deltas.key::uuid;
+
+  UPDATE resources
+  SET downloads_count = resources.downloads_count + deltas.value::integer
+  FROM jsonb_each_text(resource_downloads) AS deltas
+  WHERE resources.id = deltas.key::uuid;
+
+  UPDATE users
+  SET last_activity = greatest(users.last_activity, to_timestamp(seen.value::double precision))
+  FROM jsonb_each_text(user_activity) AS seen
+  WHERE users.telegram_id = seen.key::bigint;
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_users_last_activity ON users(last_activity DESC);